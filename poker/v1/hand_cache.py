@@ -0,0 +1,218 @@
+'''
+Remembers the results of scoring hands, so hands that were already scored
+don't have to be scored again
+
+Hands are remembered by their canonical hand (see
+poker_functions.canonical_hand), so a hand also counts as scored if another
+hand with the same ranks in different suits was. Each cache only remembers a
+limited number of hands, forgetting the one that was used longest ago when it
+runs out of room, and counts its hits, misses and evictions so they can be
+checked with cache_stats()
+'''
+
+from collections import OrderedDict
+
+import poker_functions
+
+
+# The number of hands each cache remembers by default
+DEFAULT_SIZE = 65536
+
+
+class HandCache:
+	'''
+	A limited size cache of results, by canonical hand, that forgets the least
+	recently used result first
+	'''
+
+	def __init__(self, function, max_size: int = DEFAULT_SIZE):
+		'''
+		Parameters:
+			function (callable): scores a hand mask; its result is cached
+			max_size (int): the most results to remember
+		'''
+		self.function = function
+		self.max_size = max_size
+		self.results = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, canonical: int):
+		'''
+		Gets the result for the given canonical hand mask, scoring it if it
+		isn't remembered
+
+		Parameters:
+			canonical (int): a canonical hand mask
+
+		Returns:
+			the result of the function for the hand
+
+		Doctests:
+>>> cache = HandCache(bin, 2)
+>>> cache.get(1), cache.get(2), cache.get(1), cache.get(3)
+('0b1', '0b10', '0b1', '0b11')
+>>> cache.stats()
+{'hits': 1, 'misses': 3, 'evictions': 1, 'size': 2, 'max_size': 2}
+		'''
+		result = self.results.get(canonical)
+		if result is not None:
+			self.hits += 1
+			self.results.move_to_end(canonical)
+			return result
+
+		self.misses += 1
+		result = self.function(canonical)
+		self.results[canonical] = result
+		if len(self.results) > self.max_size:
+			self.results.popitem(last=False)
+			self.evictions += 1
+		return result
+
+	def stats(self) -> dict:
+		'''
+		Gets the counters of this cache
+
+		Returns:
+			(dict): the number of hits, misses and evictions, and the current
+				and max number of remembered results
+		'''
+		return { 'hits': self.hits, 'misses': self.misses,
+			'evictions': self.evictions, 'size': len(self.results),
+			'max_size': self.max_size }
+
+	def clear(self):
+		'''
+		Forgets every result and resets the counters
+		'''
+		self.results.clear()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+
+# The caches for each function
+rank_cache = HandCache(poker_functions.find_hand_rank)
+value_cache = HandCache(poker_functions.hand_value)
+bad_cards_cache = HandCache(
+	lambda canonical: tuple(poker_functions.choose_bad_cards(canonical)))
+
+# The strategy table choose_bad_cards was using when bad_cards_cache was
+# filled (see poker_functions.strategy_table), since loading or unloading one
+# changes the answers
+bad_cards_table = None
+
+
+def find_hand_rank(hand) -> int:
+	'''
+	Same as poker_functions.find_hand_rank, but cached
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand mask
+
+	Returns:
+		(int): the rank of the hand
+
+	Doctests:
+>>> find_hand_rank({0: [(1, 0), (5, 0)], 1: [(1, 1)], 2: [(1, 2)], 3: [(1, 3)]})
+7
+	'''
+	return rank_cache.get(poker_functions.canonical_hand(hand)[0])
+
+
+def hand_value(hand) -> tuple:
+	'''
+	Same as poker_functions.hand_value, but cached
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand mask
+
+	Returns:
+		(int, int): the highest card, and the strength of the hand
+
+	Doctests:
+>>> hand_value({0: [(10, 0), (11, 0), (12, 0), (13, 0)], 1: [(1, 1)], 2: [], 3: []})
+(1, 5168314)
+	'''
+	return value_cache.get(poker_functions.canonical_hand(hand)[0])
+
+
+def choose_bad_cards(hand) -> list:
+	'''
+	Same as poker_functions.choose_bad_cards, but cached
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand mask
+
+	Returns:
+		(list): the cards to be replaced, as tuples for a hand or as card codes
+			for a hand mask, in the same order as in the hand
+
+	Doctests:
+>>> choose_bad_cards({0: [(1, 0), (2, 0)], 1: [(1, 1), (3, 1)], 2: [(4, 2)], 3: []})
+[(2, 0), (3, 1), (4, 2)]
+
+>>> choose_bad_cards({0: [(4, 0)], 1: [], 2: [(1, 2), (2, 2)], 3: [(1, 3), (3, 3)]})
+[(4, 0), (2, 2), (3, 3)]
+
+>>> class KeepAll:
+...     def lookup(self, hand):
+...         return []
+>>> poker_functions.strategy_table = KeepAll()
+>>> choose_bad_cards({0: [(4, 0)], 1: [], 2: [(1, 2), (2, 2)], 3: [(1, 3), (3, 3)]})
+[]
+>>> poker_functions.strategy_table = None
+	'''
+	global bad_cards_table
+
+	# Answers cached with another strategy table are out of date
+	if poker_functions.strategy_table is not bad_cards_table:
+		bad_cards_cache.clear()
+		bad_cards_table = poker_functions.strategy_table
+
+	canonical, suit_map = poker_functions.canonical_hand(hand)
+	canonical_bad_cards = bad_cards_cache.get(canonical)
+	if not canonical_bad_cards:
+		return []
+
+	# Turn the suits of the bad cards back into the suits of the hand
+	old_suits = [0] * 4
+	for old_suit, new_suit in enumerate(suit_map):
+		old_suits[new_suit] = old_suit
+	bad_cards = set()
+	for code in canonical_bad_cards:
+		bad_cards.add((code % 13 + 1, old_suits[code // 13]))
+
+	if isinstance(hand, int):
+		return sorted(map(poker_functions.card_to_code, bad_cards))
+
+	# Keep the order the cards have in the hand
+	found = []
+	for suit in hand.values():
+		for card in suit:
+			if card in bad_cards:
+				found.append(card)
+	return found
+
+
+def cache_stats() -> dict:
+	'''
+	Gets the counters of every cache
+
+	Returns:
+		(dict{str: dict}): the stats of each cache, by the name of its
+			function
+	'''
+	return { 'find_hand_rank': rank_cache.stats(),
+		'hand_value': value_cache.stats(),
+		'choose_bad_cards': bad_cards_cache.stats() }
+
+
+def clear_caches():
+	'''
+	Forgets every result and resets the counters of every cache
+	'''
+	rank_cache.clear()
+	value_cache.clear()
+	bad_cards_cache.clear()
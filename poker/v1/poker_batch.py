@@ -0,0 +1,141 @@
+'''
+Scores many hands at once using NumPy
+
+Hands here are rows of card codes (see poker_functions.card_to_code), so a
+batch of N hands is an (N, 5) array. Every hand is scored using the same
+hand table as poker_functions.hand_lookup, so the results always match
+poker_functions.find_hand_rank and poker_functions.hand_value
+'''
+
+import numpy as np
+
+import poker_functions
+
+
+# The rank weight of each card code
+code_weights = np.array(
+	[poker_functions.rank_weights[code % 13 + 1] for code in range(52)],
+	dtype=np.int64)
+
+# The hand table, split into sorted arrays so it can be searched all at once
+table_weights = np.array(sorted(poker_functions.hand_table), dtype=np.int64)
+table_strengths = np.array(
+	[poker_functions.hand_table[weight][0] for weight in table_weights],
+	dtype=np.int64)
+table_flush_strengths = np.array(
+	[poker_functions.hand_table[weight][1] for weight in table_weights],
+	dtype=np.int64)
+
+# The type of the array evaluate_batch returns
+result_dtype = np.dtype([('category', np.int8), ('strength', np.int64)])
+
+
+def masks_to_array(masks) -> np.ndarray:
+	'''
+	Unpacks hand masks into rows of card codes
+
+	Parameters:
+		masks (list[int]): hand masks with 5 cards each
+
+	Returns:
+		(ndarray): an (N, 5) array of card codes, lowest code first
+
+	Doctests:
+>>> masks_to_array([0b11111, (1 << 51) | 0b1111])
+array([[ 0,  1,  2,  3,  4],
+       [ 0,  1,  2,  3, 51]], dtype=int8)
+	'''
+	hands = np.zeros((len(masks), 5), dtype=np.int8)
+	for row, mask in enumerate(masks):
+		hands[row] = poker_functions.mask_to_codes(mask)
+	return hands
+
+
+def evaluate_batch(hands: np.ndarray) -> np.ndarray:
+	'''
+	Scores every hand in the given array
+
+	Parameters:
+		hands (ndarray): an (N, 5) array of card codes, one hand per row;
+			no card can be in a hand twice
+
+	Returns:
+		(ndarray): an array of N records, one per hand, with the fields:
+			category: the rank of the hand, like find_hand_rank
+			strength: the strength of the hand, like hand_value
+
+	Doctests:
+>>> result = evaluate_batch(np.array([ \
+[0, 1, 2, 3, 4], \
+[0, 13, 26, 39, 4], \
+[9, 10, 11, 12, 13]]))
+>>> result['category']
+array([8, 7, 4], dtype=int8)
+>>> bool((result['strength'][:-1] > result['strength'][1:]).all())
+True
+
+>>> evaluate_batch(np.array([[0, 0, 1, 2, 3]]))
+Traceback (most recent call last):
+	...
+ValueError: hands must have 5 different cards each
+	'''
+	hands = np.asarray(hands)
+	if hands.ndim != 2 or hands.shape[1] != 5:
+		raise ValueError(f"hands must have the shape (N, 5), not {hands.shape}")
+
+	# A card that's in a hand twice is next to itself once the hand is sorted
+	sorted_hands = np.sort(hands, axis=1)
+	if (sorted_hands[:, 1:] == sorted_hands[:, :-1]).any():
+		raise ValueError("hands must have 5 different cards each")
+
+	# Add up the rank weights of each hand
+	weights = code_weights[hands].sum(axis=1)
+
+	# A hand is a flush if every card has the same suit as the first one
+	hand_suits = hands // 13
+	is_flush = (hand_suits == hand_suits[:, :1]).all(axis=1)
+
+	# Find every hand in the hand table at once
+	entries = np.searchsorted(table_weights, weights)
+	entries = np.minimum(entries, len(table_weights) - 1)
+	if not (table_weights[entries] == weights).all():
+		raise ValueError("hands must have 5 different cards each")
+
+	result = np.empty(len(hands), dtype=result_dtype)
+	result['strength'] = np.where(is_flush, table_flush_strengths[entries],
+			table_strengths[entries])
+	result['category'] = result['strength'] >> 20
+	return result
+
+
+def shuffle_batch(count: int, rng=None, deck=None) -> np.ndarray:
+	'''
+	Shuffles many decks at once
+
+	Parameters:
+		count (int): the number of decks to shuffle
+		rng (numpy.random.Generator | int): the random number generator to
+			shuffle with, or a seed for one, so runs can be repeated
+		deck (list[int]): the card codes in each deck; defaults to a full deck
+
+	Returns:
+		(ndarray): a (count, cards in the deck) array of card codes, one
+			shuffled deck per row. Like poker_functions.deal, the last card in
+			a row is the top of that deck
+
+	Doctests:
+>>> decks = shuffle_batch(3, 1)
+>>> decks.shape
+(3, 52)
+>>> bool((np.sort(decks, axis=1) == np.arange(52)).all())
+True
+>>> bool((decks == shuffle_batch(3, 1)).all())
+True
+	'''
+	rng = np.random.default_rng(rng)
+	if deck is None:
+		deck = range(52)
+	decks = np.tile(np.array(deck, dtype=np.int8), (count, 1))
+
+	# Every row gets its own Fisher-Yates shuffle
+	return rng.permuted(decks, axis=1, out=decks)
@@ -0,0 +1,439 @@
+'''
+Times the functions that a round of poker spends most of its time in, so a
+change that makes them slower can be caught
+
+Every benchmark calls one function over and over with arguments made ahead
+of time from a fixed seed, so every run times the same work. Every call is
+timed on its own, so slow calls show up in the 99th percentile instead of
+being averaged away, and the calls are made in batches that each get fresh
+arguments. The results are the calls per second over every call, the 50th
+and 99th percentile of the time per call, and the most memory a batch
+allocated, and can be saved as JSON and compared against a saved run:
+
+	python poker_benchmark.py --output baseline.json
+	python poker_benchmark.py --baseline baseline.json --threshold 0.1
+'''
+
+import argparse
+import json
+import platform
+import random
+from time import perf_counter_ns
+import tracemalloc
+
+import poker_betting
+import poker_functions
+import poker_game
+import poker_hand_generator
+
+
+# The version of the JSON results, changed if its layout or meaning ever
+# changes (version 1 took the percentiles over the average of each batch)
+RESULTS_VERSION = 2
+
+# How much slower a benchmark can get than the baseline before it counts as
+# a regression, as a fraction of the baseline's calls per second
+DEFAULT_THRESHOLD = 0.10
+
+
+# Every generator in poker_hand_generator, by the name used in its benchmark
+generators = {
+	'generate_two_pair': poker_hand_generator.generate_two_pair,
+	'generate_three_of_a_kind':
+		lambda: poker_hand_generator.generate_N_of_a_kind(3),
+	'generate_four_of_a_kind':
+		lambda: poker_hand_generator.generate_N_of_a_kind(4),
+	'generate_straight': poker_hand_generator.generate_straight,
+	'generate_flush': poker_hand_generator.generate_flush,
+	'generate_full_house': poker_hand_generator.generate_full_house,
+	'generate_straight_flush': poker_hand_generator.generate_straight_flush,
+}
+
+
+def hand_mix(count: int, rng: random.Random) -> list:
+	'''
+	Makes hands like the ones a game sees: half of them dealt from a shuffled
+	deck, which are mostly high cards and pairs, and half of them made by the
+	generators in poker_hand_generator, so every hand rank is timed
+
+	Parameters:
+		count (int): the number of hands
+		rng (random.Random): the random number generator to make them with
+
+	Returns:
+		(list[dict{int: list[tuple(int, int)]}]): the hands
+
+	Doctests:
+>>> hands = hand_mix(10, random.Random(1))
+>>> len(hands), all(sum(map(len, hand.values())) == 5 for hand in hands)
+(10, True)
+>>> hands == hand_mix(10, random.Random(1))
+True
+>>> state = random.getstate()
+>>> _ = hand_mix(10, random.Random(2))
+>>> random.getstate() == state
+True
+	'''
+	# The generators use the random module, so it's seeded from rng, and put
+	# back afterwards so nothing else using it is changed
+	saved_state = random.getstate()
+	random.seed(rng.random())
+	generator_list = list(generators.values())
+
+	hands = []
+	try:
+		for index in range(count):
+			if index % 2:
+				hands.append(generator_list[index // 2 % len(generator_list)]())
+			else:
+				deck = poker_functions.shuffle(poker_functions.create_deck(),
+						rng)
+				hands.append(poker_functions.deal_hands(1, deck)[0])
+	finally:
+		random.setstate(saved_state)
+	return hands
+
+
+def deck_arguments(count: int, rng: random.Random) -> list:
+	'''
+	Makes a shuffled deck for each call
+
+	Parameters:
+		count (int): the number of calls
+		rng (random.Random): the random number generator to make them with
+
+	Returns:
+		(list[tuple(list[tuple(int, int)])]): the arguments of each call
+	'''
+	return [(poker_functions.shuffle(poker_functions.create_deck(), rng),)
+			for _ in range(count)]
+
+
+def replace_arguments(count: int, rng: random.Random) -> list:
+	'''
+	Makes a card to replace, a hand holding it, and a deck for each call
+
+	Parameters:
+		count (int): the number of calls
+		rng (random.Random): the random number generator to make them with
+
+	Returns:
+		(list[tuple(tuple(int, int), dict, list)]): the arguments of each call
+	'''
+	arguments = []
+	for _ in range(count):
+		deck = poker_functions.shuffle(poker_functions.create_deck(), rng)
+		hand = poker_functions.deal_hands(1, deck)[0]
+		card = rng.choice([card for suit in hand.values() for card in suit])
+		arguments.append((card, hand, deck))
+	return arguments
+
+
+def hand_arguments(count: int, rng: random.Random) -> list:
+	'''
+	Makes a hand for each call from the mix of hands in hand_mix
+
+	Parameters:
+		count (int): the number of calls
+		rng (random.Random): the random number generator to make them with
+
+	Returns:
+		(list[tuple(dict)]): the arguments of each call
+	'''
+	return [(hand,) for hand in hand_mix(count, rng)]
+
+
+def compare_arguments(count: int, rng: random.Random) -> list:
+	'''
+	Makes 4 hands for each call, dealt from the same deck like a round
+
+	Parameters:
+		count (int): the number of calls
+		rng (random.Random): the random number generator to make them with
+
+	Returns:
+		(list[tuple(list[dict], list[str], callable)]): the arguments of each
+			call
+	'''
+	names = ['P1', 'P2', 'P3', 'P4']
+	return [(poker_functions.deal_hands(4, poker_functions.shuffle(
+		poker_functions.create_deck(), rng)), names, poker_game.null_output)
+		for _ in range(count)]
+
+
+def betting_arguments(count: int, rng: random.Random) -> list:
+	'''
+	Makes the betting money and CPU decision parameters of a table of 5
+	CPUs for each call, after the ante, from hands dealt from the same deck
+
+	Parameters:
+		count (int): the number of calls
+		rng (random.Random): the random number generator to make them with
+
+	Returns:
+		(list[tuple(list[int], list[tuple(int, int, int)])]): the arguments
+			of each call
+	'''
+	arguments = []
+	for _ in range(count):
+		money = [rng.randint(100, 2000) for _ in range(5)]
+		hands = poker_functions.deal_hands(5, poker_functions.shuffle(
+			poker_functions.create_deck(), rng))
+		arguments.append((money,
+			poker_game.cpu_decisions(money, hands, poker_game.MINIMUM_BET)))
+	return arguments
+
+
+def play_betting(money: list, bet_decisions: list, rng: random.Random) -> int:
+	'''
+	Plays the betting of a round between 5 CPUs with poker_betting, on a copy
+	of the betting money
+
+	Parameters:
+		money (list[int]): the betting money of each CPU
+		bet_decisions (list[tuple(int, int, int)]): the decision parameters
+			of each CPU
+		rng (random.Random): the random number generator for raises
+
+	Returns:
+		(int): the bet at the end of the betting
+	'''
+	betting = poker_betting.BettingRound(money.copy(), money, [0] * 5,
+		[True] * 5, bet=poker_game.MINIMUM_BET)
+	return poker_betting.play_cpu_betting(betting, bet_decisions, rng)
+
+
+# Every benchmark, by name, as a function that's given the number of calls
+# and a random number generator, and gives back the function to time and
+# the arguments of each call. Functions that change their arguments get
+# fresh ones for every call
+benchmarks = {
+	'create_deck': lambda count, rng:
+		(poker_functions.create_deck, [()] * count),
+	'shuffle': lambda count, rng:
+		(lambda deck: poker_functions.shuffle(deck, rng),
+		deck_arguments(count, rng)),
+	'deal_hands': lambda count, rng:
+		(lambda deck: poker_functions.deal_hands(4, deck),
+		deck_arguments(count, rng)),
+	'replace_card': lambda count, rng:
+		(poker_functions.replace_card, replace_arguments(count, rng)),
+	'hand_ranks': lambda count, rng:
+		(poker_functions.hand_ranks, hand_arguments(count, rng)),
+	'find_hand_rank': lambda count, rng:
+		(poker_functions.find_hand_rank, hand_arguments(count, rng)),
+	'hand_value': lambda count, rng:
+		(poker_functions.hand_value, hand_arguments(count, rng)),
+	'compare_hands': lambda count, rng:
+		(poker_functions.compare_hands, compare_arguments(count, rng)),
+	'choose_bad_cards': lambda count, rng:
+		(poker_functions.choose_bad_cards, hand_arguments(count, rng)),
+	'betting_round': lambda count, rng:
+		(lambda money, bet_decisions: play_betting(money, bet_decisions, rng),
+		betting_arguments(count, rng)),
+}
+for name, generator in generators.items():
+	benchmarks[name] = lambda count, rng, generator=generator: \
+		(generator, [()] * count)
+
+
+def percentile(samples: list, fraction: float) -> float:
+	'''
+	Finds the sample that the given fraction of the samples are at or below
+
+	Parameters:
+		samples (list[float]): the samples, sorted
+		fraction (float): from 0 to 1
+
+	Returns:
+		(float): the sample at that fraction
+
+	Doctests:
+>>> percentile([1, 2, 3, 4], 0.5), percentile(list(range(100)), 0.99)
+(2, 98)
+	'''
+	index = max(0, min(len(samples) - 1,
+		int(fraction * len(samples) + 0.5) - 1))
+	return samples[index]
+
+
+def run_benchmark(name: str, batches: int = 50, batch_size: int = 200,
+		seed: int = 0) -> dict:
+	'''
+	Runs one benchmark
+
+	Parameters:
+		name (str): the name of the benchmark, from benchmarks
+		batches (int): the number of batches to time
+		batch_size (int): the number of calls in each batch
+		seed (int): the seed the arguments are made from
+
+	Returns:
+		(dict): the results, with:
+			calls: the number of calls timed
+			ops_per_sec: calls per second, from the total time of every call
+			p50_ns, p99_ns: the 50th and 99th percentile of the time of a
+				single call, in nanoseconds. Each includes the time taken to
+				read the timer once, a few tens of nanoseconds
+			peak_bytes: the most memory allocated while running one batch
+
+	Doctests:
+>>> result = run_benchmark('hand_value', batches=3, batch_size=10)
+>>> sorted(result), result['calls']
+(['calls', 'ops_per_sec', 'p50_ns', 'p99_ns', 'peak_bytes'], 30)
+>>> result['p50_ns'] <= result['p99_ns']
+True
+	'''
+	rng = random.Random(seed)
+	make_calls = benchmarks[name]
+
+	samples = []
+	for _ in range(batches):
+		# The arguments are made before the timer starts, so only the
+		# function itself is timed
+		function, arguments = make_calls(batch_size, rng)
+		# Each call ends where the next one starts, so the timer is only read
+		# once for each call
+		end_time = perf_counter_ns()
+		for call_arguments in arguments:
+			start_time = end_time
+			function(*call_arguments)
+			end_time = perf_counter_ns()
+			samples.append(end_time - start_time)
+
+	# Tracing memory slows every allocation down, so it gets its own batch
+	function, arguments = make_calls(batch_size, rng)
+	tracemalloc.start()
+	try:
+		for call_arguments in arguments:
+			function(*call_arguments)
+		peak_bytes = tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+
+	total_ns = sum(samples)
+	samples.sort()
+	return { 'calls': batches * batch_size,
+		'ops_per_sec': batches * batch_size * 1e9 / total_ns,
+		'p50_ns': percentile(samples, 0.5),
+		'p99_ns': percentile(samples, 0.99),
+		'peak_bytes': peak_bytes }
+
+
+def run_benchmarks(names: list = None, batches: int = 50,
+		batch_size: int = 200, seed: int = 0, progress=None) -> dict:
+	'''
+	Runs some or all of the benchmarks
+
+	Parameters:
+		names (list[str]): the benchmarks to run; defaults to every one
+		batches (int): the number of batches to time for each
+		batch_size (int): the number of calls in each batch
+		seed (int): the seed the arguments are made from
+		progress (callable): called with the name and results of each
+			benchmark once it's done, if given
+
+	Returns:
+		(dict): the results, ready to be saved as JSON, with:
+			version: RESULTS_VERSION
+			settings: the batches, batch size and seed
+			python: the version of Python that ran them
+			benchmarks: the results of each benchmark (see run_benchmark)
+	'''
+	if names is None:
+		names = list(benchmarks)
+	results = {}
+	for name in names:
+		results[name] = run_benchmark(name, batches, batch_size, seed)
+		if progress is not None:
+			progress(name, results[name])
+
+	return { 'version': RESULTS_VERSION,
+		'settings': { 'batches': batches, 'batch_size': batch_size,
+			'seed': seed },
+		'python': platform.python_version(),
+		'benchmarks': results }
+
+
+def compare_results(results: dict, baseline: dict,
+		threshold: float = DEFAULT_THRESHOLD) -> list:
+	'''
+	Finds the benchmarks that got slower than the baseline by more than the
+	threshold
+
+	Parameters:
+		results (dict): the results of a run (see run_benchmarks)
+		baseline (dict): the results of an earlier run
+		threshold (float): how much slower a benchmark can get, as a fraction
+			of the baseline's calls per second
+
+	Returns:
+		(list[tuple(str, float)]): the name of each slower benchmark and how
+			much of the baseline's calls per second it lost, worst first.
+			Benchmarks that aren't in both runs are skipped
+
+	Doctests:
+>>> baseline = {'benchmarks': {'a': {'ops_per_sec': 100}, \
+'b': {'ops_per_sec': 100}, 'c': {'ops_per_sec': 100}}}
+>>> results = {'benchmarks': {'a': {'ops_per_sec': 95}, \
+'b': {'ops_per_sec': 50}, 'd': {'ops_per_sec': 1}}}
+>>> compare_results(results, baseline)
+[('b', 0.5)]
+	'''
+	regressions = []
+	for name, result in results['benchmarks'].items():
+		if name not in baseline['benchmarks']:
+			continue
+		base_ops = baseline['benchmarks'][name]['ops_per_sec']
+		loss = 1 - result['ops_per_sec'] / base_ops
+		if loss > threshold:
+			regressions.append((name, loss))
+	return sorted(regressions, key=lambda regression: -regression[1])
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+	parser.add_argument('names', nargs='*', choices=[[]] + list(benchmarks),
+			help='benchmarks to run (default: all of them)')
+	parser.add_argument('--batches', type=int, default=50,
+			help='number of batches to time for each benchmark')
+	parser.add_argument('--batch-size', type=int, default=200,
+			help='number of calls in each batch')
+	parser.add_argument('--seed', type=int, default=0,
+			help='seed the arguments are made from')
+	parser.add_argument('--output', help='save the results as JSON here')
+	parser.add_argument('--baseline', help='JSON results to compare against')
+	parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+			help='how much slower than the baseline counts as a regression')
+	args = parser.parse_args()
+
+	def progress(name: str, result: dict):
+		'''
+		Prints the results of a benchmark
+		'''
+		print(f"{name:<26}{result['ops_per_sec']:>14,.0f} ops/s" +
+				f"{result['p50_ns']:>12,.0f} ns p50" +
+				f"{result['p99_ns']:>12,.0f} ns p99" +
+				f"{result['peak_bytes']:>12,} B peak")
+
+	results = run_benchmarks(args.names or None, args.batches,
+			args.batch_size, args.seed, progress)
+
+	if args.output:
+		with open(args.output, 'w') as file:
+			json.dump(results, file, indent=2)
+
+	if args.baseline:
+		with open(args.baseline) as file:
+			baseline = json.load(file)
+		regressions = compare_results(results, baseline, args.threshold)
+		for name, loss in regressions:
+			print(f"{name} is {loss:.1%} slower than the baseline")
+		if regressions:
+			raise SystemExit(1)
+		print("No regressions")
+
+
+# Main program entry
+if __name__ == '__main__':
+	main()
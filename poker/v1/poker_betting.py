@@ -0,0 +1,278 @@
+'''
+The betting part of a round, without any printing, asking or pausing, so
+servers, simulators and solvers can play betting rounds as fast as they can
+be worked out
+
+A BettingRound keeps the same bookkeeping as poker_game.round_main_loop (the
+bet, what each player still has to call to, and how many players have called
+in a row) and works on the same lists, so it can be given a
+poker_state.TableState's lists and play the round on them. Each turn is one
+call to act, which changes the lists and moves on to the next player that
+hasn't folded. poker_game.round_main_loop plays every round through a
+BettingRound, so a round played here ends exactly the same way as one played
+in the game, given the same actions:
+
+	betting = BettingRound(money, start_money, fold_losses, is_playing)
+	while not betting.is_done():
+		betting.act('call')
+'''
+
+# The actions a player can take, when they can meet the bet and when they
+# can't
+ACTIONS = ('fold', 'call', 'raise')
+FOLD_ONLY = ('fold',)
+
+
+class BettingRound:
+	'''
+	The state of the betting in a round, and the rules for changing it
+	'''
+
+	__slots__ = ('money', 'start_money', 'fold_losses', 'is_playing',
+		'to_call', 'bet', 'call_amount', 'playing_num', 'player')
+
+	def __init__(self, money: list, start_money: list, fold_losses: list,
+			is_playing: list, to_call: list = None, bet: int = 10):
+		'''
+		Parameters:
+			money (list[int]): the betting money each player has; changed as
+				they bet
+			start_money (list[int]): the betting money each player had at the
+				start of the round, before the ante
+			fold_losses (list[int]): what each player lost by folding; filled
+				in as they fold
+			is_playing (list[bool]): whether each player hasn't folded
+			to_call (list[int]): the amount each player still has to call to;
+				a new list is used if not given
+			bet (int): the bet at the start of the betting, usually
+				poker_game.MINIMUM_BET
+
+		Doctests:
+>>> betting = BettingRound([990, 990, 990], [1000] * 3, [0] * 3, [True] * 3)
+>>> betting.player, betting.legal_actions(), betting.pot(), betting.is_done()
+(0, ('fold', 'call', 'raise'), 30, False)
+		'''
+		self.money = money
+		self.start_money = start_money
+		self.fold_losses = fold_losses
+		self.is_playing = is_playing
+		self.to_call = [0] * len(money) if to_call is None else to_call
+		self.bet = bet
+		# The number of turns in a row that didn't change the bet, and the
+		# number of players that haven't folded, so it isn't counted every turn
+		self.call_amount = 0
+		self.playing_num = is_playing.count(True)
+		# The player whose turn it is, found by next_player
+		self.player = -1
+		self.next_player()
+
+	def is_done(self) -> bool:
+		'''
+		Checks whether the betting is over, which is when every player but
+		one has called since the bet last changed, or only one player is left
+
+		Returns:
+			(bool): True if the betting is over
+		'''
+		return self.call_amount >= self.playing_num - 1
+
+	def next_player(self):
+		'''
+		Moves the turn on to the next player that hasn't folded, unless the
+		betting is over
+		'''
+		if self.is_done():
+			return
+		player_num = len(self.is_playing)
+		player = self.player
+		while True:
+			player += 1
+			# If all players played, loop again
+			if player >= player_num:
+				player = 0
+			if self.is_playing[player]:
+				break
+		self.player = player
+
+	def legal_actions(self) -> tuple:
+		'''
+		Gets the actions the player whose turn it is can take. Players that
+		can't meet the bet have to fold
+
+		Returns:
+			(tuple(str)): the actions, out of ACTIONS; empty if the betting is
+				over
+		'''
+		if self.is_done():
+			return ()
+		if self.to_call[self.player] > self.money[self.player]:
+			return FOLD_ONLY
+		return ACTIONS
+
+	def pot(self) -> int:
+		'''
+		Gets what the winner of the round would get if the betting ended now,
+		the same way as poker_game.play_round
+
+		Returns:
+			(int): the money in the pot
+		'''
+		return self.playing_num * self.bet + sum(self.fold_losses)
+
+	def end_turn(self, money: int, bet: int, is_playing: bool):
+		'''
+		Ends the turn of the player whose turn it is, the same way
+		poker_game.round_main_loop does after a turn, and moves on to the
+		next player
+
+		Parameters:
+			money (int): the betting money the player has left
+			bet (int): the bet after the player's turn
+			is_playing (bool): whether the player is still playing
+		'''
+		player = self.player
+		self.money[player] = money
+		self.is_playing[player] = is_playing
+		if not is_playing:
+			self.fold_losses[player] = self.start_money[player] - money
+			self.playing_num -= 1
+			self.next_player()
+			return
+
+		call_add = bet - self.bet
+		self.bet = bet
+		if call_add != 0:
+			self.call_amount = 0
+			# Update the amount each player needs to call to
+			to_call = self.to_call
+			for player_to_call in range(len(to_call)):
+				if player_to_call != player:
+					to_call[player_to_call] += call_add
+		else:
+			self.call_amount += 1
+		self.next_player()
+
+	def act(self, action: str, amount: int = 0, meet_call: bool = True):
+		'''
+		Takes a turn for the player whose turn it is. Taking a turn after the
+		betting is over raises a ValueError
+
+		Parameters:
+			action (str): 'fold', 'call' or 'raise'. Players that can't meet
+				the bet fold whatever the action is
+			amount (int): the amount to raise the bet by
+			meet_call (bool): whether a player that raises meets the bet
+				first, like a CPU does (see poker_game.cpu_main_loop). The main
+				player's raise in poker_game only pays the amount raised by
+				(see poker_game.player_main_loop)
+
+		Doctests:
+>>> money = [990, 990, 990]
+>>> betting = BettingRound(money, [1000] * 3, [0] * 3, [True] * 3)
+>>> betting.act('raise', 20)
+>>> betting.act('fold')
+>>> betting.player, betting.to_call, betting.bet
+(2, [0, 20, 20], 30)
+>>> betting.act('call')
+>>> betting.is_done(), money, betting.pot()
+(True, [970, 990, 970], 70)
+>>> betting.act('call')
+Traceback (most recent call last):
+	...
+ValueError: the betting is over
+		'''
+		if self.is_done():
+			raise ValueError("the betting is over")
+		player = self.player
+		money = self.money[player]
+		to_call = self.to_call[player]
+		if action == 'fold' or to_call > money:
+			self.end_turn(money, self.bet, False)
+		elif action == 'call':
+			self.end_turn(money - to_call, self.bet, True)
+		elif meet_call:
+			self.end_turn(money - to_call - amount, self.bet + amount, True)
+		else:
+			self.end_turn(money - amount, self.bet + amount, True)
+
+
+def cpu_action(money: int, to_call: int, bet: int, bet_decisions: tuple,
+		raise_amount: int) -> tuple:
+	'''
+	Picks a CPU's action, the same way as poker_game.cpu_main_loop
+
+	Parameters:
+		money (int): the betting money available to the CPU
+		to_call (int): the amount the CPU has to call to
+		bet (int): the current bet
+		bet_decisions (tuple(int, int, int)): the parameters for the CPU to
+			make a decision (see poker_game.cpu_decisions)
+		raise_amount (int): the amount the CPU raises by if it raises
+
+	Returns:
+		(tuple(str, int)): the action and the amount to raise by
+
+	Doctests:
+>>> cpu_action(100, 0, 10, (50, 5, 25), 7)
+('raise', 7)
+>>> cpu_action(100, 0, 30, (50, 5, 25), 7)
+('call', 0)
+>>> cpu_action(100, 0, 60, (50, 5, 25), 7), cpu_action(5, 10, 10, \
+(50, 5, 25), 7)
+(('fold', 0), ('fold', 0))
+	'''
+	max_bet, _, min_bet = bet_decisions
+	# If the CPU can't or won't make the call, then fold
+	if to_call > money or bet > max_bet:
+		return ('fold', 0)
+	# If the CPU won't raise, then call
+	if bet > min_bet:
+		return ('call', 0)
+	return ('raise', raise_amount)
+
+
+def play_cpu_betting(betting: BettingRound, bet_decisions: list, rng) -> int:
+	'''
+	Plays the betting of a round between CPUs only, the same way
+	poker_game.round_main_loop does in a headless table (see
+	poker_game.headless_table), but without any of the printing
+
+	Parameters:
+		betting (BettingRound): the betting to play
+		bet_decisions (list[tuple(int, int, int)]): the decision parameters
+			of each CPU (see poker_game.cpu_decisions)
+		rng (random.Random): the random number generator for the amounts the
+			CPUs raise by, the same one the game would use
+
+	Returns:
+		(int): the bet at the end of the betting
+
+	Doctests:
+>>> import poker_functions, poker_game, random
+>>> deck = poker_functions.shuffle(poker_functions.create_deck(), \
+random.Random(3))
+>>> hands = poker_functions.deal_hands(5, deck)
+>>> with poker_game.headless_table(5, seed=4):
+...     game_money = [990] * 5
+...     decisions = poker_game.cpu_decisions(game_money, hands, 10)
+...     game_playing, game_losses = [True] * 5, [0] * 5
+...     game_bet = poker_game.round_main_loop(game_money, [1000] * 5, \
+game_losses, hands, decisions, game_playing, poker_game.NAMES, None)
+>>> betting = BettingRound([990] * 5, [1000] * 5, [0] * 5, [True] * 5)
+>>> play_cpu_betting(betting, decisions, random.Random(4)) == game_bet
+True
+>>> (betting.money, betting.is_playing, betting.fold_losses) == \
+(game_money, game_playing, game_losses)
+True
+	'''
+	money = betting.money
+	to_call = betting.to_call
+	while not betting.is_done():
+		player = betting.player
+		decisions = bet_decisions[player]
+		# The raise amount is picked every turn, like cpu_main_loop, so the
+		# random number generator is used the same way
+		action, amount = cpu_action(money[player], to_call[player],
+			betting.bet, decisions, decisions[1] + rng.randint(0, 3))
+		betting.act(action, amount)
+	return betting.bet
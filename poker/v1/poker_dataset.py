@@ -0,0 +1,276 @@
+'''
+Saves hands labelled with their hand rank to compact binary files, and loads
+them back without reading them into memory
+
+A file is a 32 byte header followed by one 6 byte record per hand: the 5
+card codes of the hand (see poker_functions.card_to_code), then its hand
+rank. Since every record is the same size, record i always starts at byte
+32 + 6 * i, and the file can be loaded with numpy.memmap to look at any
+record without reading the rest. The header holds the number of records and
+a CRC-32 checksum of all of them, so a file that was cut short or changed
+can be caught.
+
+Hands are written a chunk at a time, so a file can be much bigger than
+memory, and many files (shards) can be written at once by separate
+processes:
+
+	python poker_dataset.py data/hands --shards 8 --per-category 100000
+'''
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from time import perf_counter
+import zlib
+
+import numpy as np
+
+import poker_batch
+import poker_functions
+import poker_sampler
+
+
+# The first bytes of a dataset file
+MAGIC = b'PKHANDS1'
+
+# The header and each record of a dataset file
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('record_size', '<u4'),
+	('checksum', '<u4'), ('count', '<u8'), ('reserved', 'S8')])
+RECORD_DTYPE = np.dtype([('cards', 'u1', (5,)), ('category', 'u1')])
+
+# The number of hands made at a time when writing a shard
+CHUNK_SIZE = 100000
+
+
+def to_codes(hands) -> np.ndarray:
+	'''
+	Turns hands into rows of card codes
+
+	Parameters:
+		hands (ndarray | list): an (N, 5) array of card codes, or a list of
+			hands or hand masks
+
+	Returns:
+		(ndarray): an (N, 5) array of card codes, one hand per row
+
+	Doctests:
+>>> to_codes([{0: [(1, 0), (2, 0)], 1: [(1, 1)], 2: [(3, 2)], \
+3: [(13, 3)]}, 0b11111])
+array([[ 0,  1, 13, 28, 51],
+       [ 0,  1,  2,  3,  4]], dtype=uint8)
+	'''
+	if isinstance(hands, np.ndarray):
+		return hands.astype(np.uint8)
+
+	codes = np.zeros((len(hands), 5), dtype=np.uint8)
+	for row, hand in enumerate(hands):
+		if isinstance(hand, dict):
+			codes[row] = [poker_functions.card_to_code(card)
+					for suit in hand.values() for card in suit]
+		else:
+			codes[row] = poker_functions.mask_to_codes(hand)
+	return codes
+
+
+class DatasetWriter:
+	'''
+	Writes labelled hands to a dataset file a chunk at a time
+	'''
+
+	def __init__(self, path: str):
+		'''
+		Parameters:
+			path (str): the file to write
+		'''
+		self.path = path
+		self.file = open(path, 'wb')
+		self.count = 0
+		self.checksum = 0
+		# The header is written again with the count and checksum at the end
+		self.file.write(self.header().tobytes())
+
+	def header(self) -> np.ndarray:
+		'''
+		Makes the header for what's been written so far
+
+		Returns:
+			(ndarray): the header, as a record of HEADER_DTYPE
+		'''
+		return np.array([(MAGIC, RECORD_DTYPE.itemsize, self.checksum,
+			self.count, b'')], dtype=HEADER_DTYPE)
+
+	def write(self, hands, labels=None):
+		'''
+		Writes a chunk of hands to the file
+
+		Parameters:
+			hands (ndarray | list): an (N, 5) array of card codes, or a list
+				of hands or hand masks (see to_codes)
+			labels (ndarray | list[int]): the hand rank of each hand; found
+				with poker_batch.evaluate_batch if not given
+		'''
+		codes = to_codes(hands)
+		if labels is None:
+			labels = poker_batch.evaluate_batch(codes)['category']
+
+		records = np.empty(len(codes), dtype=RECORD_DTYPE)
+		records['cards'] = codes
+		records['category'] = labels
+
+		data = records.tobytes()
+		self.file.write(data)
+		self.checksum = zlib.crc32(data, self.checksum)
+		self.count += len(records)
+
+	def close(self):
+		'''
+		Finishes the header and closes the file
+		'''
+		if self.file.closed:
+			return
+		self.file.seek(0)
+		self.file.write(self.header().tobytes())
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exception):
+		self.close()
+
+
+def read_dataset(path: str, verify: bool = True) -> np.ndarray:
+	'''
+	Memory-maps a dataset file
+
+	Parameters:
+		path (str): the dataset file
+		verify (bool): whether to check the file against its checksum, which
+			reads the whole file once
+
+	Returns:
+		(numpy.memmap): one record of RECORD_DTYPE per hand, with the fields
+			cards (the 5 card codes) and category (the hand rank)
+
+	Doctests:
+>>> import os, tempfile
+>>> path = os.path.join(tempfile.mkdtemp(), 'test.hands')
+>>> with DatasetWriter(path) as writer:
+...     writer.write(np.array([[0, 1, 2, 3, 4], [0, 13, 26, 39, 1]]))
+...     writer.write([0b11111 << 5], [8])
+>>> records = read_dataset(path)
+>>> len(records), records['category'].tolist(), records[2]['cards'].tolist()
+(3, [8, 7, 8], [5, 6, 7, 8, 9])
+>>> os.path.getsize(path)
+50
+	'''
+	header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+	if len(header) != 1 or header['magic'][0] != MAGIC \
+			or header['record_size'][0] != RECORD_DTYPE.itemsize:
+		raise ValueError(f"{path} is not a dataset file")
+	count = int(header['count'][0])
+
+	records = np.memmap(path, dtype=RECORD_DTYPE, mode='r',
+			offset=HEADER_DTYPE.itemsize, shape=(count,))
+	if verify and zlib.crc32(records) != int(header['checksum'][0]):
+		raise ValueError(f"{path} doesn't match its checksum")
+	return records
+
+
+def write_shard(path: str, counts, seed) -> int:
+	'''
+	Writes random hands of every hand rank to a dataset file, picked with
+	poker_sampler and mixed up a chunk at a time
+
+	Parameters:
+		path (str): the file to write
+		counts (int | list[int]): the number of hands of each hand rank,
+			either the same for all of them or by hand rank
+		seed: the seed for picking the hands
+
+	Returns:
+		(int): the number of hands written
+	'''
+	rng = np.random.default_rng(seed)
+	if isinstance(counts, int):
+		counts = [counts] * len(poker_sampler.CATEGORY_COUNTS)
+	counts = np.array(counts)
+
+	with DatasetWriter(path) as writer:
+		# Each chunk takes the same share of every hand rank that's left
+		while counts.sum() > 0:
+			chunk_counts = np.minimum(counts, np.ceil(
+				counts * CHUNK_SIZE / counts.sum()).astype(int))
+			writer.write(*poker_sampler.sample_hands(chunk_counts.tolist(), rng))
+			counts -= chunk_counts
+		return writer.count
+
+
+def write_shards(prefix: str, shard_num: int, counts, seed=0,
+		workers: int = None) -> list:
+	'''
+	Writes random hands to many dataset files at once, each with its own
+	seed, named {prefix}-00000.hands, {prefix}-00001.hands and so on
+
+	Parameters:
+		prefix (str): the start of the path of every file
+		shard_num (int): the number of files
+		counts (int | list[int]): the number of hands of each hand rank in
+			each file (see write_shard)
+		seed: the seed for the files
+		workers (int): the number of processes to use; 1 writes every file in
+			this process. Defaults to the number of CPUs
+
+	Returns:
+		(list[str]): the path of every file written
+
+	Doctests:
+>>> import os, tempfile
+>>> prefix = os.path.join(tempfile.mkdtemp(), 'test')
+>>> paths = write_shards(prefix, 2, 3, seed=1, workers=1)
+>>> [os.path.basename(path) for path in paths]
+['test-00000.hands', 'test-00001.hands']
+>>> sorted(read_dataset(paths[1])['category'].tolist())
+[0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 5, 6, 6, 6, 7, 7, 7, 8, 8, 8]
+	'''
+	if workers is None:
+		workers = cpu_count() or 1
+	paths = [f"{prefix}-{shard:05d}.hands" for shard in range(shard_num)]
+	seeds = [f"{seed}-{shard}" for shard in range(shard_num)]
+	# Seeds for numpy have to be numbers, so each one is made from its text
+	seeds = [zlib.crc32(shard_seed.encode()) for shard_seed in seeds]
+	counts = [counts] * shard_num
+
+	if workers <= 1:
+		list(map(write_shard, paths, counts, seeds))
+	else:
+		with ProcessPoolExecutor(workers) as pool:
+			list(pool.map(write_shard, paths, counts, seeds))
+	return paths
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+	parser.add_argument('prefix', help='the start of the path of every file')
+	parser.add_argument('--shards', type=int, default=1,
+			help='number of files to write')
+	parser.add_argument('--per-category', type=int, default=100000,
+			help='number of hands of each hand rank in each file')
+	parser.add_argument('--seed', default=0, help='seed for the files')
+	parser.add_argument('--workers', type=int, default=None,
+			help='number of processes (default: number of CPUs)')
+	args = parser.parse_args()
+
+	start_time = perf_counter()
+	paths = write_shards(args.prefix, args.shards, args.per_category,
+			args.seed, args.workers)
+	seconds = perf_counter() - start_time
+
+	count = sum(len(read_dataset(path, False)) for path in paths)
+	print(f"Wrote {count:,} hands to {len(paths)} file(s) in {seconds:.2f}s " +
+			f"({count / seconds:,.0f} hands/s)")
+
+
+# Main program entry
+if __name__ == '__main__':
+	main()
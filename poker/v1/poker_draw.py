@@ -0,0 +1,306 @@
+'''
+Finds the cards to replace that give the best hand on average
+
+Every way to keep some of a hand's cards and replace the rest is checked,
+and for each one the exact number of replacement draws that end in each hand
+rank is counted. Instead of scoring every draw (up to C(47, 5) = 1,533,939 of
+them for one way), the draws are counted by the ranks they bring in: any
+draw of the same ranks gives a hand of the same strength unless it makes a
+flush, so each group of ranks is scored once, using the same hand table as
+poker_functions.hand_lookup, and counted as the number of ways to pick those
+ranks from the cards left. The few draws that make a flush are then moved
+to the right hand rank one by one
+'''
+
+from itertools import combinations, combinations_with_replacement
+from math import comb
+
+import numpy as np
+
+import poker_batch
+import poker_functions
+
+
+# What each hand rank is worth, by hand rank
+PAYOUTS = ( 0, 1, 2, 3, 4, 6, 9, 25, 50 )
+
+# The most cards a player can replace in a round
+MAX_DISCARDS = 4
+
+# The rank weight of each rank, by rank - 1, the same as code % 13
+rank_weight_array = np.array(
+	[poker_functions.rank_weights[rank] for rank in poker_functions.ranks],
+	dtype=np.int64)
+
+# comb(n, m) for every n and m from 0 to 4, the most cards of a rank
+comb_table = np.array([[comb(n, m) for m in range(5)] for n in range(5)],
+	dtype=np.int64)
+
+
+def build_draw_ranks() -> list:
+	'''
+	Finds every group of ranks that a draw of 0 to 5 cards can bring in
+
+	Returns:
+		(list[ndarray]): by the number of cards drawn, an array with one row
+			per group and the number of cards of each rank (by rank - 1) in
+			each column
+
+	Doctests:
+>>> [len(groups) for groups in build_draw_ranks()]
+[1, 13, 91, 455, 1820, 6175]
+	'''
+	draw_ranks = []
+	for draw_num in range(6):
+		groups = []
+		for group in combinations_with_replacement(range(13), draw_num):
+			counts = [0] * 13
+			for rank in group:
+				counts[rank] += 1
+			# There are only 4 cards of each rank
+			if max(counts, default=0) <= 4:
+				groups.append(counts)
+		draw_ranks.append(np.array(groups, dtype=np.int64).reshape(-1, 13))
+	return draw_ranks
+
+
+def build_suit_draws() -> list:
+	'''
+	Finds every way to draw 0 to 5 cards from a suit with 0 to 13 cards left
+
+	Returns:
+		(list[list[ndarray]]): by the number of cards left in the suit, then
+			by the number of cards drawn, an array with one row per draw and
+			the positions of the cards drawn in each column
+
+	Doctests:
+>>> suit_draws = build_suit_draws()
+>>> suit_draws[13][5].shape, suit_draws[3][2].tolist()
+((1287, 5), [[0, 1], [0, 2], [1, 2]])
+	'''
+	return [[np.array(list(combinations(range(card_num), draw_num)),
+			dtype=np.int64).reshape(comb(card_num, draw_num), draw_num)
+			for draw_num in range(6)]
+		for card_num in range(14)]
+
+
+# The groups of ranks of every draw, their rank weights, and where to find
+# the number of ways to draw each rank of a group (see count_draws)
+draw_ranks = build_draw_ranks()
+draw_weights = [groups @ rank_weight_array for groups in draw_ranks]
+draw_rank_entries = [np.arange(13) * 5 + groups for groups in draw_ranks]
+
+# The ways to draw cards from a suit
+suit_draws = build_suit_draws()
+
+
+def count_draws(holds: list, rank_counts: np.ndarray, suit_ranks: list) -> list:
+	'''
+	Counts the draws that end in each hand rank after keeping some cards, for
+	every given way to keep the same number of cards
+
+	Parameters:
+		holds (list[list[int]]): the card codes that are kept, for every way
+			to keep them; each way keeps the same number of cards
+		rank_counts (ndarray): the number of cards of each rank (by rank - 1)
+			that can be drawn
+		suit_ranks (list[list[int]]): the ranks (as rank - 1) of the cards
+			that can be drawn, by suit
+
+	Returns:
+		(list[list[int]]): for every way to keep cards, the number of draws
+			that end in each hand rank, by hand rank
+
+	Doctests:
+>>> rank_counts, suit_ranks = unseen_cards(0b1000000001111)
+>>> count_draws([[0, 1, 2, 3], [0, 1, 2, 12]], rank_counts, suit_ranks)
+[[24, 12, 0, 0, 3, 7, 0, 0, 1], [27, 12, 0, 0, 0, 8, 0, 0, 0]]
+	'''
+	draw_num = 5 - len(holds[0])
+	held_weights = np.array([[rank_weight_array[code % 13] for code in held]
+		for held in holds], dtype=np.int64).reshape(len(holds), -1).sum(axis=1)
+
+	# Every group of ranks, counted as the ways to pick them from what's left,
+	# which is the same for every way to keep cards
+	rank_ways = comb_table[rank_counts].ravel()
+	ways = rank_ways[draw_rank_entries[draw_num]].prod(axis=1)
+
+	# Score every group after every way to keep cards at once, as if it
+	# doesn't make a flush, counting each way's hand ranks in its own 9 spots
+	weights = held_weights[:, None] + draw_weights[draw_num][None, :]
+	entries = np.searchsorted(poker_batch.table_weights, weights.ravel())
+	entries = np.minimum(entries, len(poker_batch.table_weights) - 1)
+	hand_ranks = poker_batch.table_strengths[entries] >> 20
+	hand_ranks += np.repeat(np.arange(len(holds)) * 9, len(ways))
+	# Groups that can't be drawn count 0, even if they aren't in the table
+	counts = np.bincount(hand_ranks, weights=np.tile(ways, len(holds)),
+		minlength=9 * len(holds)).astype(np.int64).reshape(len(holds), 9)
+
+	# The draws that do make a flush are moved to the right hand rank; they
+	# can only happen if every card kept has the same suit
+	for hold, held in enumerate(holds):
+		held_suits = {code // 13 for code in held}
+		if len(held_suits) > 1:
+			continue
+		for suit in held_suits or range(4):
+			left = np.array(suit_ranks[suit], dtype=np.int64)
+			drawn = rank_weight_array[left[suit_draws[len(left)][draw_num]]]
+			entries = np.searchsorted(poker_batch.table_weights,
+				held_weights[hold] + drawn.sum(axis=1))
+			counts[hold] -= np.bincount(
+				poker_batch.table_strengths[entries] >> 20, minlength=9)
+			counts[hold] += np.bincount(
+				poker_batch.table_flush_strengths[entries] >> 20, minlength=9)
+	return counts.tolist()
+
+
+def unseen_cards(hand: int, dead: int = 0) -> tuple:
+	'''
+	Finds the cards that could be drawn
+
+	Parameters:
+		hand (int): the hand mask of the hand
+		dead (int): a hand mask of cards that can't be drawn
+
+	Returns:
+		(tuple(ndarray, list[list[int]])): the number of cards of each rank
+			(by rank - 1) that can be drawn, and the ranks (as rank - 1) that
+			can be drawn in each suit
+
+	Doctests:
+>>> rank_counts, suit_ranks = unseen_cards(0b11111, 1 << 13)
+>>> rank_counts.tolist()
+[2, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4]
+>>> suit_ranks[0], len(suit_ranks[1])
+([5, 6, 7, 8, 9, 10, 11, 12], 12)
+	'''
+	rank_counts = np.zeros(13, dtype=np.int64)
+	suit_ranks = [[], [], [], []]
+	for code in range(52):
+		if not (hand | dead) & (1 << code):
+			rank_counts[code % 13] += 1
+			suit_ranks[code // 13].append(code % 13)
+	return (rank_counts, suit_ranks)
+
+
+def draw_options(hand, dead_cards=0, max_discards: int = MAX_DISCARDS) -> list:
+	'''
+	Counts how every way to replace cards in a hand can end
+
+	Parameters:
+		hand (dict | int): a hand or a hand mask with 5 cards
+		dead_cards (dict | int): a hand or a hand mask of cards that are known
+			to not be in the deck
+		max_discards (int): the most cards that can be replaced
+
+	Returns:
+		(list[tuple(list[int], list[int], int)]): for every way to replace
+			cards, the card codes replaced, the number of draws that end in
+			each hand rank, and the number of draws
+
+	Doctests:
+>>> pair = poker_functions.hand_to_mask( \
+{0: [(1, 0), (9, 0)], 1: [(1, 1)], 2: [(5, 2)], 3: [(7, 3)]})
+>>> options = draw_options(pair)
+>>> len(options)
+31
+>>> options[0]
+([], [0, 1, 0, 0, 0, 0, 0, 0, 0], 1)
+>>> discards, counts, total = options[-1]
+>>> discards, total, sum(counts) == total
+([8, 13, 30, 45], 178365, True)
+	'''
+	if isinstance(hand, dict):
+		hand = poker_functions.hand_to_mask(hand)
+	if isinstance(dead_cards, dict):
+		dead_cards = poker_functions.hand_to_mask(dead_cards)
+	codes = poker_functions.mask_to_codes(hand)
+	if len(codes) != 5:
+		raise ValueError("the hand must have 5 cards")
+
+	rank_counts, suit_ranks = unseen_cards(hand, dead_cards)
+	unseen_num = int(rank_counts.sum())
+
+	options = []
+	for discard_num in range(max_discards + 1):
+		# Every way to replace the same number of cards is counted at once
+		discard_options = list(combinations(codes, discard_num))
+		holds = [[code for code in codes if code not in discards]
+				for discards in discard_options]
+		total = comb(unseen_num, discard_num)
+		for discards, counts in zip(discard_options,
+				count_draws(holds, rank_counts, suit_ranks)):
+			options.append((list(discards), counts, total))
+	return options
+
+
+def solve_draw(hand, dead_cards=0, payouts=PAYOUTS,
+		max_discards: int = MAX_DISCARDS) -> dict:
+	'''
+	Finds the cards to replace that are worth the most on average
+
+	Parameters:
+		hand (dict | int): a hand or a hand mask with 5 cards
+		dead_cards (dict | int): a hand or a hand mask of cards that are known
+			to not be in the deck
+		payouts (list[float]): what each hand rank is worth, by hand rank
+		max_discards (int): the most cards that can be replaced
+
+	Returns:
+		(dict): the best way to replace cards, with:
+			discards: the cards to replace, as tuples for a hand or as card
+				codes for a hand mask, in the same order as in the hand.
+				When ways are worth the same, the one that replaces the
+				fewest cards is picked
+			value: what the hand is worth on average after the draw
+			chances: the chance of ending with each hand rank, by hand rank
+
+	Doctests:
+>>> result = solve_draw({0: [(1, 0), (13, 0), (12, 0), (11, 0)], 1: [(2, 1)], \
+2: [], 3: []})
+>>> result['discards'], round(result['value'], 4)
+([(2, 1)], 2.5957)
+>>> round(result['chances'][5] + result['chances'][8], 4)
+0.1915
+
+>>> solve_draw({0: [(1, 0), (13, 0), (12, 0), (11, 0), (10, 0)], 1: [], \
+2: [], 3: []})['discards']
+[]
+	'''
+	best = None
+	for discards, counts, total in draw_options(hand, dead_cards, max_discards):
+		value = sum(map(lambda count, payout: count * payout, counts,
+				payouts)) / total
+		if best is None or value > best[0]:
+			best = (value, discards, counts, total)
+	value, discards, counts, total = best
+
+	# Hands give back tuples, in the order they're in the hand
+	if isinstance(hand, dict):
+		discards = {poker_functions.code_to_card(code) for code in discards}
+		discards = [card for suit in hand.values() for card in suit
+				if card in discards]
+
+	return { 'discards': discards, 'value': value,
+		'chances': [count / total for count in counts] }
+
+
+def best_discards(hand, dead_cards=0) -> list:
+	'''
+	Same as poker_functions.choose_bad_cards, but picks the cards that are
+	worth the most on average (see solve_draw)
+
+	Parameters:
+		hand (dict | int): a hand or a hand mask with 5 cards
+		dead_cards (dict | int): a hand or a hand mask of cards that are known
+			to not be in the deck
+
+	Returns:
+		(list): the cards to be replaced, as tuples for a hand or as card codes
+			for a hand mask
+
+	Doctests:
+>>> best_discards({0: [(1, 0), (9, 0)], 1: [(1, 1)], 2: [(5, 2)], 3: [(7, 3)]})
+[(9, 0), (5, 2), (7, 3)]
+	'''
+	return solve_draw(hand, dead_cards)['discards']
@@ -0,0 +1,237 @@
+'''
+Scores every possible 5 card hand
+
+All C(52, 5) = 2,598,960 hands are numbered in lexicographic order (the same
+order as itertools.combinations(range(52), 5)), so any range of numbers can be
+turned back into its hands and scored on its own. The ranges are split
+between processes, and the results are added up into a count of each hand
+rank and the number of different hand strengths.
+
+Since the right answers are known, this checks that the evaluator is still
+correct, and since it scores every hand, it's also a good way to time it:
+
+	python poker_enumerate.py
+'''
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+from os import cpu_count
+from time import perf_counter
+
+import numpy as np
+
+import poker_batch
+import poker_functions
+
+
+HAND_COUNT = comb(52, 5)
+
+HAND_RANK_NAMES = ( 'High Card', 'One Pair', 'Two Pair', 'Three of a Kind',
+	'Straight', 'Flush', 'Full House', 'Four of a Kind', 'Straight Flush' )
+
+# How many of each hand rank there are, by hand rank
+EXPECTED_COUNTS = ( 1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624,
+	40 )
+
+# How many hands of different strength there are
+EXPECTED_STRENGTHS = 7462
+
+# comb(d, k) for every d from 0 to 51 and k from 0 to 5, for unranking
+combination_table = np.array(
+	[[comb(d, k) for d in range(52)] for k in range(6)], dtype=np.int64)
+
+
+def unrank_hands(start: int, stop: int) -> np.ndarray:
+	'''
+	Finds the hands with the given range of lexicographic numbers
+
+	Parameters:
+		start (int): the number of the first hand
+		stop (int): the number after the last hand
+
+	Returns:
+		(ndarray): a (stop - start, 5) array of card codes, one hand per row
+
+	Doctests:
+>>> unrank_hands(0, 2)
+array([[0, 1, 2, 3, 4],
+       [0, 1, 2, 3, 5]], dtype=int8)
+
+>>> unrank_hands(HAND_COUNT - 1, HAND_COUNT)
+array([[47, 48, 49, 50, 51]], dtype=int8)
+	'''
+	# Counting down from the last hand, the cards mirrored (51 - card) form
+	# the combinatorial number system, where each card can be found by
+	# taking the largest comb(d, k) that fits in what's left of the number
+	left = HAND_COUNT - 1 - np.arange(start, stop, dtype=np.int64)
+	hands = np.empty((len(left), 5), dtype=np.int8)
+	for position in range(5):
+		table = combination_table[5 - position]
+		mirrored = np.searchsorted(table, left, side='right') - 1
+		left -= table[mirrored]
+		hands[:, position] = 51 - mirrored
+	return hands
+
+
+def score_range(start: int, stop: int, scalar: bool = False) -> tuple:
+	'''
+	Scores every hand in a range of lexicographic numbers
+
+	Parameters:
+		start (int): the number of the first hand
+		stop (int): the number after the last hand
+		scalar (bool): if True, score each hand with poker_functions instead
+			of poker_batch
+
+	Returns:
+		(tuple(list[int], ndarray)): the number of hands of each hand rank,
+			and the different strengths found, sorted
+
+	Doctests:
+>>> counts, strengths = score_range(0, 1000)
+>>> counts
+[542, 366, 24, 9, 14, 44, 0, 0, 1]
+>>> len(strengths)
+136
+>>> score_range(0, 1000, True)[0] == counts
+True
+	'''
+	hands = unrank_hands(start, stop)
+
+	if scalar:
+		# One hand at a time, as hand masks
+		masks = (np.int64(1) << hands.astype(np.int64)).sum(axis=1)
+		counts = [0] * 9
+		strengths = set()
+		for mask in masks.tolist():
+			counts[poker_functions.find_hand_rank(mask)] += 1
+			strengths.add(poker_functions.hand_value(mask)[1])
+		return (counts, np.array(sorted(strengths)))
+
+	result = poker_batch.evaluate_batch(hands)
+	counts = np.bincount(result['category'], minlength=9)
+	return (counts.tolist(), np.unique(result['strength']))
+
+
+def enumerate_hands(workers: int = None, chunk_size: int = 100000,
+		scalar: bool = False) -> dict:
+	'''
+	Scores every possible 5 card hand
+
+	Parameters:
+		workers (int): the number of processes to use; 1 scores everything in
+			this process. Defaults to the number of CPUs
+		chunk_size (int): the number of hands scored at a time
+		scalar (bool): if True, score each hand with poker_functions instead
+			of poker_batch
+
+	Returns:
+		(dict): the results, with:
+			counts: the number of hands of each hand rank
+			strengths: the number of different hand strengths
+			hands: the number of hands scored
+			seconds: how long it took
+	'''
+	if workers is None:
+		workers = cpu_count() or 1
+	start_time = perf_counter()
+
+	starts = range(0, HAND_COUNT, chunk_size)
+	stops = [min(start + chunk_size, HAND_COUNT) for start in starts]
+	scalars = [scalar] * len(starts)
+
+	counts = [0] * 9
+	strengths = set()
+
+	def add_result(result: tuple):
+		'''
+		Adds the result of one range to the totals
+		'''
+		for hand_rank, count in enumerate(result[0]):
+			counts[hand_rank] += count
+		strengths.update(result[1].tolist())
+
+	if workers <= 1:
+		for result in map(score_range, starts, stops, scalars):
+			add_result(result)
+	else:
+		with ProcessPoolExecutor(workers) as pool:
+			for result in pool.map(score_range, starts, stops, scalars):
+				add_result(result)
+
+	return { 'counts': counts, 'strengths': len(strengths),
+		'hands': sum(counts), 'seconds': perf_counter() - start_time }
+
+
+def check_results(results: dict) -> list:
+	'''
+	Compares the results of enumerate_hands to the known right answers
+
+	Parameters:
+		results (dict): the results of enumerate_hands
+
+	Returns:
+		(list[str]): a description of everything that's wrong, if anything
+
+	Doctests:
+>>> check_results({'counts': list(EXPECTED_COUNTS), 'strengths': 7462})
+[]
+
+>>> check_results({'counts': [0] + list(EXPECTED_COUNTS[1:]), \
+'strengths': 7461})
+['High Card: expected 1302540, got 0', 'strengths: expected 7462, got 7461']
+	'''
+	problems = []
+	for hand_rank, count in enumerate(results['counts']):
+		if count != EXPECTED_COUNTS[hand_rank]:
+			problems.append(f"{HAND_RANK_NAMES[hand_rank]}: expected " +
+					f"{EXPECTED_COUNTS[hand_rank]}, got {count}")
+	if results['strengths'] != EXPECTED_STRENGTHS:
+		problems.append(f"strengths: expected {EXPECTED_STRENGTHS}, " +
+				f"got {results['strengths']}")
+	return problems
+
+
+def print_results(results: dict):
+	'''
+	Prints the results of enumerate_hands as a table
+
+	Parameters:
+		results (dict): the results of enumerate_hands
+	'''
+	print(f"{'Hand':<16}{'Count':>10}{'Chance':>12}")
+	for hand_rank in reversed(range(9)):
+		count = results['counts'][hand_rank]
+		print(f"{HAND_RANK_NAMES[hand_rank]:<16}{count:>10}" +
+				f"{count / results['hands']:>12.6%}")
+	print(f"{'Total':<16}{results['hands']:>10}")
+	print()
+	print("Different strengths:", results['strengths'])
+	print(f"Time: {results['seconds']:.2f}s " +
+			f"({results['hands'] / results['seconds']:,.0f} hands/s)")
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+	parser.add_argument('--workers', type=int, default=None,
+			help='number of processes (default: number of CPUs)')
+	parser.add_argument('--chunk-size', type=int, default=100000,
+			help='number of hands scored at a time')
+	parser.add_argument('--scalar', action='store_true',
+			help='score one hand at a time with poker_functions')
+	args = parser.parse_args()
+
+	results = enumerate_hands(args.workers, args.chunk_size, args.scalar)
+	print_results(results)
+
+	problems = check_results(results)
+	for problem in problems:
+		print("MISMATCH -", problem)
+	if problems:
+		raise SystemExit(1)
+
+
+# Main program entry
+if __name__ == '__main__':
+	main()
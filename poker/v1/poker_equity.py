@@ -0,0 +1,484 @@
+'''
+Estimates how often a hand wins against some number of opponents
+
+The rest of the deck is dealt out many times, the same way a round deals it
+(a shuffled deck, 5 cards to each player from the top, and optionally a
+redraw for the opponents), and every deal is scored silently with
+poker_functions.rank_hands. The deals are split into batches that run across
+a pool of processes, each batch with its own random number generator, until
+the estimate is good enough or time runs out. The pool is kept for the next
+estimate, until shutdown_pool is called
+'''
+
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import sqrt
+from os import cpu_count
+from random import Random
+from time import monotonic
+
+import poker_functions
+
+
+# 95% confidence
+Z_SCORE = 1.96
+
+# The most hands cached_equity remembers
+EQUITY_CACHE_SIZE = 65536
+
+# The added up results of every batch cached_equity has simulated, by
+# canonical hand mask, number of opponents and whether they draw. The hand
+# that was used longest ago is forgotten first, like hand_cache.HandCache
+equity_cache = OrderedDict()
+
+# The pool of processes equity runs batches on, kept between calls since
+# starting the processes can take longer than the batches, and its number of
+# processes
+equity_pool = None
+equity_pool_workers = 0
+
+
+def to_mask(cards) -> int:
+	'''
+	Packs a hand, hand mask or list of cards into a hand mask
+
+	Parameters:
+		cards (dict | int | list): a hand, a hand mask, or a list of cards as
+			tuples or card codes
+
+	Returns:
+		(int): the hand mask of the cards
+
+	Doctests:
+>>> to_mask({0: [(1, 0)], 1: [], 2: [], 3: [(13, 3)]})
+2251799813685249
+
+>>> to_mask([(1, 0), 51])
+2251799813685249
+
+>>> to_mask(5)
+5
+	'''
+	if isinstance(cards, int):
+		return cards
+	if isinstance(cards, dict):
+		return poker_functions.hand_to_mask(cards)
+
+	mask = 0
+	for card in cards:
+		if not isinstance(card, int):
+			card = poker_functions.card_to_code(card)
+		mask |= 1 << card
+	return mask
+
+
+def simulate_batch(hand: int, opponents: int, dead: int, trials: int,
+		seed: str, draw: bool = False) -> tuple:
+	'''
+	Deals and scores a batch of showdowns
+
+	Parameters:
+		hand (int): the hand mask of the known hand
+		opponents (int): the number of opponents
+		dead (int): a hand mask of cards that can't be dealt
+		trials (int): the number of deals to make
+		seed (str): the seed of this batch's random number generator
+		draw (bool): whether the opponents replace the cards
+			poker_functions.choose_bad_cards picks before the showdown, like
+			the CPUs in poker_game do. The known hand is taken as already drawn
+
+	Returns:
+		(tuple(int, int, int, float, float)): the number of wins, ties and
+			losses, then the sum and the sum of squares of the share of the
+			pot won in each deal
+
+	Doctests:
+>>> royal_flush = to_mask([(10, 0), (11, 0), (12, 0), (13, 0), (1, 0)])
+>>> simulate_batch(royal_flush, 1, 0, 100, 'doctest')
+(100, 0, 0, 100.0, 100.0)
+
+>>> pair = to_mask([(1, 0), (1, 1), (13, 2), (9, 3), (4, 0)])
+>>> simulate_batch(pair, 3, 0, 500, 'doctest', draw=True)[0] < \
+simulate_batch(pair, 3, 0, 500, 'doctest')[0]
+True
+	'''
+	rng = Random(seed)
+
+	# Every card that's left to deal
+	stub = []
+	for code in poker_functions.create_deck(True):
+		if not (hand | dead) & (1 << code):
+			stub.append(code)
+
+	wins = 0
+	ties = 0
+	losses = 0
+	share_sum = 0.0
+	share_squares = 0.0
+	for _ in range(trials):
+		deck = poker_functions.shuffle(stub, rng)
+		hands = [hand] + poker_functions.deal_hands(opponents, deck)
+		if draw:
+			for opponent in range(1, opponents + 1):
+				for code in poker_functions.choose_bad_cards(hands[opponent]):
+					hands[opponent] = poker_functions.replace_card_mask(code,
+						hands[opponent], deck)
+
+		best = poker_functions.rank_hands(hands)[0]
+
+		# The known hand is always index 0
+		if 0 not in best:
+			losses += 1
+			continue
+		if len(best) == 1:
+			wins += 1
+		else:
+			ties += 1
+		share = 1 / len(best)
+		share_sum += share
+		share_squares += share * share
+
+	return (wins, ties, losses, share_sum, share_squares)
+
+
+def wilson_interval(successes: int, trials: int) -> tuple:
+	'''
+	Finds the 95% confidence interval of a probability
+
+	Parameters:
+		successes (int): the number of times something happened
+		trials (int): the number of times it could have happened
+
+	Returns:
+		(tuple(float, float)): the lowest and highest the probability is likely
+			to be
+
+	Doctests:
+>>> wilson_interval(50, 100)
+(0.40382982859014716, 0.5961701714098528)
+
+>>> wilson_interval(0, 0)
+(0.0, 1.0)
+	'''
+	if trials == 0:
+		return (0.0, 1.0)
+	probability = successes / trials
+	z_squared = Z_SCORE * Z_SCORE
+	centre = (probability + z_squared / (2 * trials)) / (1 + z_squared / trials)
+	spread = Z_SCORE * sqrt(probability * (1 - probability) / trials
+			+ z_squared / (4 * trials * trials)) / (1 + z_squared / trials)
+	return (max(0.0, centre - spread), min(1.0, centre + spread))
+
+
+def summarize(totals: list, stop_reason: str) -> dict:
+	'''
+	Turns the totals of all the batches into probabilities
+
+	Parameters:
+		totals (list[int, int, int, float, float]): the added up results of
+			simulate_batch
+		stop_reason (str): why the simulation stopped
+
+	Returns:
+		(dict): the results; see equity
+
+	Doctests:
+>>> result = summarize([60, 10, 30, 65.0, 62.5], 'max_trials')
+>>> result['win'], result['tie'], result['loss'], result['equity']
+(0.6, 0.1, 0.3, 0.65)
+	'''
+	wins, ties, losses, share_sum, share_squares = totals
+	trials = wins + ties + losses
+	result = { 'trials': trials, 'stopped': stop_reason }
+
+	for name, count in (('win', wins), ('tie', ties), ('loss', losses)):
+		result[name] = count / trials if trials else 0.0
+		result[name + '_ci'] = wilson_interval(count, trials)
+
+	result['equity'], result['equity_error'] = equity_error(totals)
+	return result
+
+
+def equity_error(totals: list) -> tuple:
+	'''
+	Finds the average share of the pot and its standard error
+
+	Parameters:
+		totals (list[int, int, int, float, float]): the added up results of
+			simulate_batch
+
+	Returns:
+		(tuple(float, float)): the equity, and its standard error
+
+	Doctests:
+>>> equity_error([1, 0, 1, 1.0, 1.0])
+(0.5, 0.5)
+	'''
+	trials = totals[0] + totals[1] + totals[2]
+	if trials < 2:
+		return (0.0, float('inf'))
+	mean = totals[3] / trials
+	variance = max(0.0, totals[4] / trials - mean * mean)
+	return (mean, sqrt(variance / (trials - 1)))
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+	'''
+	Gets the pool of processes for equity, starting a new one if there isn't
+	one with the given number of processes
+
+	Parameters:
+		workers (int): the number of processes
+
+	Returns:
+		(ProcessPoolExecutor): the pool
+	'''
+	global equity_pool, equity_pool_workers
+
+	if equity_pool is None or equity_pool_workers != workers:
+		shutdown_pool()
+		equity_pool = ProcessPoolExecutor(workers)
+		equity_pool_workers = workers
+	return equity_pool
+
+
+def shutdown_pool():
+	'''
+	Stops the pool of processes for equity, if there is one, without waiting
+	for any batches that are still running. The next call to equity starts a
+	new one
+
+	Doctests:
+>>> pool = get_pool(2)
+>>> equity(5, 1, target_error=0, max_trials=200, batch_size=50, workers=2, \
+seed=1)['trials']
+200
+>>> get_pool(2) is pool
+True
+>>> shutdown_pool()
+>>> get_pool(2) is pool
+False
+>>> shutdown_pool()
+	'''
+	global equity_pool, equity_pool_workers
+
+	if equity_pool is not None:
+		equity_pool.shutdown(wait=False, cancel_futures=True)
+	equity_pool = None
+	equity_pool_workers = 0
+
+
+def equity(hand, opponents: int, dead_cards=(), target_error: float = 0.005,
+		time_budget: float = None, max_trials: int = 1000000,
+		batch_size: int = 2000, workers: int = None, seed=None,
+		draw: bool = False) -> dict:
+	'''
+	Estimates the chances of the given hand against some number of opponents
+
+	Parameters:
+		hand (dict | int | list): the known hand (see to_mask)
+		opponents (int): the number of opponents
+		dead_cards (dict | int | list): cards that can't be dealt, like cards
+			seen elsewhere (see to_mask)
+		target_error (float): stop once the standard error of the equity is
+			at most this; 0 never stops early
+		time_budget (float): stop after about this many seconds, if given
+		max_trials (int): stop after this many deals
+		batch_size (int): the number of deals in each batch
+		workers (int): the number of processes to use; 1 runs the batches in
+			this process. Defaults to the number of CPUs
+		seed: the seed for the batches, for repeatable results
+		draw (bool): whether the opponents redraw before the showdown (see
+			simulate_batch)
+
+	Returns:
+		(dict): the results, with:
+			trials: the number of deals made
+			win, tie, loss: the chance of each outcome
+			win_ci, tie_ci, loss_ci: the 95% confidence interval of each
+			equity: the average share of the pot won
+			equity_error: the standard error of the equity
+			stopped: 'target_error', 'time_budget' or 'max_trials'
+
+	Doctests:
+>>> result = equity([(1, 0), (1, 1), (1, 2), (1, 3), (13, 0)], 3, \
+target_error=0, max_trials=4000, workers=1, seed=1)
+>>> result['trials'], result['stopped']
+(4000, 'max_trials')
+>>> result['win'] > 0.99
+True
+	'''
+	hand = to_mask(hand)
+	dead = to_mask(dead_cards)
+	if hand & dead:
+		raise ValueError("the hand and the dead cards share a card")
+	if 52 - (hand | dead).bit_count() < 5 * opponents:
+		raise ValueError("not enough cards left to deal to every opponent")
+
+	if seed is None:
+		seed = Random().getrandbits(64)
+	if workers is None:
+		workers = cpu_count() or 1
+	start = monotonic()
+
+	# Added up results of every batch
+	totals = [0, 0, 0, 0.0, 0.0]
+	batches_made = 0
+
+	def next_batch() -> tuple:
+		'''
+		Gets the arguments for the next batch, each with its own seed
+		'''
+		nonlocal batches_made
+		trials = min(batch_size, max_trials - batches_made * batch_size)
+		batches_made += 1
+		return (hand, opponents, dead, trials, f"{seed}-{batches_made}", draw)
+
+	def trials_left() -> bool:
+		'''
+		Checks if there are deals that haven't been handed out to a batch
+		'''
+		return batches_made * batch_size < max_trials
+
+	def stop_reason():
+		'''
+		Checks the totals against every reason to stop
+		'''
+		if totals[0] + totals[1] + totals[2] >= max_trials:
+			return 'max_trials'
+		if target_error > 0 and equity_error(totals)[1] <= target_error:
+			return 'target_error'
+		if time_budget is not None and monotonic() - start >= time_budget:
+			return 'time_budget'
+		return None
+
+	# Run in this process
+	if workers <= 1:
+		while trials_left():
+			for index, value in enumerate(simulate_batch(*next_batch())):
+				totals[index] += value
+			reason = stop_reason()
+			if reason is not None:
+				return summarize(totals, reason)
+		return summarize(totals, 'max_trials')
+
+	# Keep two batches per worker going, handing out a new batch every time
+	# one finishes
+	reason = None
+	pool = get_pool(workers)
+	pending = set()
+	while trials_left() and len(pending) < 2 * workers:
+		pending.add(pool.submit(simulate_batch, *next_batch()))
+
+	while pending and reason is None:
+		timeout = None
+		if time_budget is not None:
+			timeout = max(0.0, time_budget - (monotonic() - start))
+		done, pending = wait(pending, timeout, FIRST_COMPLETED)
+		for future in done:
+			for index, value in enumerate(future.result()):
+				totals[index] += value
+
+		reason = stop_reason()
+		if reason is None and trials_left():
+			for _ in done:
+				pending.add(pool.submit(simulate_batch, *next_batch()))
+
+	# Don't wait for batches that aren't needed anymore. The ones that
+	# haven't started are dropped, and the ones that have are left to finish
+	# in the background, so the pool can still be used by the next call
+	for future in pending:
+		future.cancel()
+
+	return summarize(totals, reason or 'max_trials')
+
+
+def cached_equity(hand, opponents: int, time_budget: float = None,
+		max_trials: int = 2000, target_error: float = 0.01,
+		batch_size: int = 25, draw: bool = False) -> dict:
+	'''
+	Estimates the chances of the given hand like equity, in this process,
+	picking up where the last estimate of the same hand left off. Hands are
+	remembered by their canonical hand (see poker_functions.canonical_hand),
+	since hands with the same ranks in different suits have the same chances.
+	Every batch has a seed made from the hand and the number of deals before
+	it, so the estimate after some number of deals is always the same,
+	however many calls it took to get there (as long as max_trials is a
+	multiple of batch_size)
+
+	Parameters:
+		hand (dict | int | list): the known hand (see to_mask)
+		opponents (int): the number of opponents
+		time_budget (float): stop after about this many seconds, and give back
+			the best estimate so far; at least one batch is simulated for a
+			hand that has never been estimated
+		max_trials (int): stop once the hand has had this many deals
+		target_error (float): stop once the standard error of the equity is
+			at most this
+		batch_size (int): the number of deals between checks of the time
+		draw (bool): whether the opponents redraw before the showdown (see
+			simulate_batch); estimates with and without the draw are
+			remembered separately
+
+	Returns:
+		(dict): the results, like equity; stopped is 'cached' if the hand
+			didn't need any more deals
+
+	Doctests:
+>>> equity_cache.clear()
+>>> result = cached_equity([(1, 0), (1, 1), (1, 2), (5, 3), (9, 0)], 2, \
+max_trials=200, target_error=0)
+>>> result['trials'], result['stopped']
+(200, 'max_trials')
+>>> again = cached_equity([(1, 1), (1, 0), (1, 3), (5, 2), (9, 1)], 2, \
+max_trials=200)
+>>> again['stopped'], again['equity'] == result['equity']
+('cached', True)
+>>> cached_equity([(1, 0), (1, 1), (1, 2), (5, 3), (9, 0)], 2, \
+max_trials=400, target_error=0)['trials']
+400
+>>> import poker_equity
+>>> poker_equity.EQUITY_CACHE_SIZE = 2
+>>> hands = [[(1, 0), (2, 0), (3, 1), (4, 1), (rank, 2)] for rank in (6, 7, 8)]
+>>> for hand in (hands[0], hands[1], hands[0], hands[2]):
+...     _ = cached_equity(hand, 1, max_trials=25)
+>>> [key[0] for key in equity_cache] == [ \
+poker_functions.canonical_hand(to_mask(hand))[0] for hand in (hands[0], hands[2])]
+True
+>>> poker_equity.EQUITY_CACHE_SIZE = 65536
+	'''
+	start = monotonic()
+	hand = poker_functions.canonical_hand(to_mask(hand))[0]
+	key = (hand, opponents, draw)
+	totals = equity_cache.get(key)
+	if totals is None:
+		totals = [0, 0, 0, 0.0, 0.0]
+		# Forget the hand that was used longest ago when there's no more room
+		if len(equity_cache) >= EQUITY_CACHE_SIZE:
+			equity_cache.popitem(last=False)
+		equity_cache[key] = totals
+	else:
+		equity_cache.move_to_end(key)
+
+	simulated = False
+	while True:
+		trials = totals[0] + totals[1] + totals[2]
+		if trials >= max_trials:
+			reason = 'max_trials'
+			break
+		if trials >= 2 and equity_error(totals)[1] <= target_error:
+			reason = 'target_error'
+			break
+		if trials and time_budget is not None \
+				and monotonic() - start >= time_budget:
+			reason = 'time_budget'
+			break
+
+		batch = min(batch_size, max_trials - trials)
+		results = simulate_batch(hand, opponents, 0, batch,
+				f"{hand}-{opponents}-{draw}-{trials}", draw)
+		for index, value in enumerate(results):
+			totals[index] += value
+		simulated = True
+
+	return summarize(totals, reason if simulated else 'cached')
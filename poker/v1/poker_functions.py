@@ -1,14 +1,21 @@
-from random import randint
+from itertools import combinations_with_replacement
+from operator import itemgetter
+import random
 
 suits = { 0: "Hearts", 1: "Diamonds", 2: "Clubs", 3: "Spades" }
 ranks = ( 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13 )
 rank_names = { 1: "Ace", 11: "Jack", 12: "Queen", 13: "King" }
 
 
-def create_deck() -> list:
+def create_deck(compact: bool = False, as_deck: bool = False) -> list:
 	'''
 	Creates a new deck of cards
 
+	Parameters:
+		compact (bool): if True, the cards are card codes (see card_to_code)
+			instead of tuples
+		as_deck (bool): if True, the deck is a Deck instead of a list
+
 	Returns:
 		list[tuple(int,int)]: The newly created deck as a list. Each tuple in
 			the list represents a card (rank, suit)
@@ -21,7 +28,20 @@ def create_deck() -> list:
 (1, 2), (2, 2), (3, 2), (4, 2), (5, 2), (6, 2), (7, 2), (8, 2), (9, 2), \
 (10, 2), (11, 2), (12, 2), (13, 2), (1, 3), (2, 3), (3, 3), (4, 3), (5, 3), \
 (6, 3), (7, 3), (8, 3), (9, 3), (10, 3), (11, 3), (12, 3), (13, 3)]
+
+		>>> create_deck(True) == list(range(52))
+		True
+
+		>>> len(create_deck(as_deck=True))
+		52
 	'''
+	if as_deck:
+		return Deck(create_deck(compact))
+
+	# Card codes are numbered in the same order as the tuple deck
+	if compact:
+		return list(range(52))
+
 	deck = []
 	# Loop through every possible card, adding each possibility to the new
 	# deck
@@ -31,12 +51,152 @@ def create_deck() -> list:
 	return deck
 
 
-def print_card(card: tuple):
+class Deck:
+	'''
+	A deck of cards kept in a fixed size list, with cursors for the top and
+	the bottom of the deck, so dealing from the top and putting cards back on
+	the bottom never have to move the other cards
+
+	Works with deal, deal_hands, replace_card, replace_card_mask and shuffle
+	the same way a list deck does: the last card is the top of the deck
+	'''
+
+	def __init__(self, cards: list = None, capacity: int = None):
+		'''
+		Parameters:
+			cards (list): the cards in the deck, the last card being the top;
+				defaults to a new deck (see create_deck)
+			capacity (int): the size of the list the cards are kept in;
+				defaults to twice the number of cards, which leaves room for
+				a round of discards without overwriting any snapshot
+		'''
+		if cards is None:
+			cards = create_deck()
+		if capacity is None:
+			capacity = max(2 * len(cards), 1)
+		if capacity < len(cards):
+			raise ValueError("capacity must fit every card")
+
+		self.cards = list(cards) + [None] * (capacity - len(cards))
+		self.capacity = capacity
+		# The position after the top card
+		self.top = len(cards) % capacity
+		self.count = len(cards)
+		# The number of cards put on the bottom, to check snapshots with
+		self.returned = 0
+
+	def __len__(self) -> int:
+		'''
+		Returns:
+			(int): the number of cards left in the deck
+		'''
+		return self.count
+
+	def __getitem__(self, index: int):
+		'''
+		Gets a card without taking it out of the deck
+
+		Parameters:
+			index (int): the position of the card; 0 is the bottom and -1 is
+				the top, like a list
+
+		Returns:
+			the card
+		'''
+		if index < 0:
+			index += self.count
+		if not 0 <= index < self.count:
+			raise IndexError("deck index out of range")
+		return self.cards[(self.top - self.count + index) % self.capacity]
+
+	def __iter__(self):
+		'''
+		Goes through the cards from the bottom to the top
+		'''
+		for index in range(self.count):
+			yield self[index]
+
+	def __repr__(self) -> str:
+		return f"Deck({list(self)})"
+
+	def pop(self):
+		'''
+		Takes the top card off the deck
+
+		Returns:
+			the top card
+
+		Doctests:
+>>> deck = Deck([(1, 0), (2, 1), (3, 2)])
+>>> deck.pop(), len(deck)
+((3, 2), 2)
+		'''
+		if self.count == 0:
+			raise IndexError("deal from an empty deck")
+		self.top = (self.top - 1) % self.capacity
+		self.count -= 1
+		return self.cards[self.top]
+
+	def put_bottom(self, card):
+		'''
+		Puts a card on the bottom of the deck
+
+		Parameters:
+			card: the card to put back
+
+		Doctests:
+>>> deck = Deck([(1, 0), (2, 1), (3, 2)])
+>>> deck.put_bottom(deck.pop())
+>>> deck
+Deck([(3, 2), (1, 0), (2, 1)])
+		'''
+		if self.count == self.capacity:
+			raise IndexError("the deck is full")
+		self.cards[(self.top - self.count - 1) % self.capacity] = card
+		self.count += 1
+		self.returned += 1
+
+	def snapshot(self) -> tuple:
+		'''
+		Remembers the current state of the deck, without copying any cards
+
+		Returns:
+			(tuple(int, int, int)): the snapshot, for restore
+
+		Doctests:
+>>> deck = Deck(create_deck(True))
+>>> saved = deck.snapshot()
+>>> for _ in range(20):
+... 	deck.put_bottom(deck.pop())
+>>> deck.restore(saved)
+>>> list(deck) == create_deck(True)
+True
+		'''
+		return (self.top, self.count, self.returned)
+
+	def restore(self, snapshot: tuple):
+		'''
+		Puts the deck back the way it was when the snapshot was taken
+
+		Parameters:
+			snapshot (tuple(int, int, int)): a snapshot from this deck
+		'''
+		top, count, returned = snapshot
+		# Cards put on the bottom fill the free room first, and only after
+		# that start writing over the cards the snapshot needs
+		if self.returned - returned > self.capacity - count:
+			raise ValueError("too many cards were put back since the snapshot")
+		self.top = top
+		self.count = count
+		self.returned = returned
+
+def print_card(card: tuple, output=print):
 	'''
 	Prints the given card
 
 	Parameters:
 		card (tuple(int, int)): The card to print in the format: (rank, suit)
+		output (callable): where to print to, like print; defaults to print
 	
 	Doctests:
 		>>> print_card((1, 0))
@@ -56,7 +216,14 @@ def print_card(card: tuple):
 
 		>>> print_card((13, 1))
 		King of Diamonds
+
+		>>> print_card(51)
+		King of Spades
 	'''
+	# Card codes are printed the same as their tuple
+	if isinstance(card, int):
+		card = code_to_card(card)
+
 	# More readable variable names
 	rank = card[0]
 	suit = card[1]
@@ -73,38 +240,208 @@ def print_card(card: tuple):
 	suit_text = suits[suit]
 
 	# Print card
-	print(rank_text, 'of', suit_text)
+	output(rank_text, 'of', suit_text)
+
+
+# Compact cards and hands
+#
+# A card can also be stored as a single int from 0 to 51 (its card code),
+# which is its position in a new deck: suit * 13 + rank - 1. A hand can then be
+# stored as a single int too (its hand mask), where bit n is set if the hand
+# holds the card with the code n. A hand mask fits in 52 bits, so millions of
+# hands can be kept in an array('Q') instead of millions of dictionaries
+
+
+def card_to_code(card: tuple) -> int:
+	'''
+	Finds the card code of the given card
+
+	Parameters:
+		card (tuple(int, int)): a card in the format: (rank, suit)
+
+	Returns:
+		(int): the card code, from 0 to 51
+
+	Doctests:
+		>>> card_to_code((1, 0))
+		0
+
+		>>> card_to_code((13, 3))
+		51
+	'''
+	return card[1] * 13 + card[0] - 1
+
+
+def code_to_card(code: int) -> tuple:
+	'''
+	Finds the card with the given card code
+
+	Parameters:
+		code (int): a card code, from 0 to 51
+
+	Returns:
+		(tuple(int, int)): the card in the format: (rank, suit)
+
+	Doctests:
+		>>> code_to_card(0)
+		(1, 0)
+
+		>>> code_to_card(51)
+		(13, 3)
+	'''
+	return (code % 13 + 1, code // 13)
+
+
+def hand_to_mask(hand: dict) -> int:
+	'''
+	Packs the given hand into a hand mask
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]}): cards in the format:
+			(rank, suit) organized by their suit
+
+	Returns:
+		(int): the hand mask, with the bit of each card code in the hand set
+
+	Doctests:
+		>>> hand_to_mask({0: [(1, 0), (3, 0)], 1: [], 2: [], 3: [(13, 3)]})
+		2251799813685253
+	'''
+	mask = 0
+	for suit in hand.values():
+		for card in suit:
+			mask |= 1 << card_to_code(card)
+	return mask
+
+
+def mask_to_codes(mask: int) -> list:
+	'''
+	Finds the card codes in the given hand mask
 
+	Parameters:
+		mask (int): a hand mask
+
+	Returns:
+		(list[int]): the card codes in the hand, from lowest to highest
 
-def shuffle(deck: list) -> list:
+	Doctests:
+		>>> mask_to_codes(2251799813685253)
+		[0, 2, 51]
+	'''
+	codes = []
+	# Take the lowest set bit off the mask until there aren't any left
+	while mask:
+		low_bit = mask & -mask
+		codes.append(low_bit.bit_length() - 1)
+		mask ^= low_bit
+	return codes
+
+
+def mask_to_hand(mask: int) -> dict:
+	'''
+	Unpacks the given hand mask into a hand
+
+	Parameters:
+		mask (int): a hand mask
+
+	Returns:
+		(dict{int: list[tuple(int, int)]}): the cards in the format:
+			(rank, suit) organized by their suit
+
+	Doctests:
+		>>> mask_to_hand(2251799813685253)
+		{0: [(1, 0), (3, 0)], 1: [], 2: [], 3: [(13, 3)]}
+
+		>>> hand = {0: [(5, 0)], 1: [(2, 1), (13, 1)], 2: [], 3: [(1, 3)]}
+		>>> mask_to_hand(hand_to_mask(hand)) == hand
+		True
+	'''
+	hand = { 0: [], 1: [], 2: [], 3: [] }
+	for code in mask_to_codes(mask):
+		card = code_to_card(code)
+		hand[card[1]].append(card)
+	return hand
+
+
+def canonical_hand(hand: dict) -> tuple:
+	'''
+	Relabels the suits of the given hand so that every hand that only differs
+	by its suits becomes the same hand mask. Suits don't change how good a
+	hand is, so this turns the 2,598,960 possible hands into 134,459
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand mask
+
+	Returns:
+		(int, list[int]): the hand mask of the relabelled hand, and the suit
+			each suit of the given hand became
+
+	Doctests:
+>>> canonical_hand({0: [(1, 0)], 1: [], 2: [(2, 2), (3, 2)], 3: [(1, 3)]})
+(67117062, [1, 3, 0, 2])
+
+>>> canonical_hand({0: [(1, 0)], 1: [(2, 1), (3, 1)], 2: [], 3: [(1, 3)]})
+(67117062, [1, 0, 3, 2])
+	'''
+	# The ranks in each suit, as 13 bits
+	suit_masks = []
+	if isinstance(hand, int):
+		for suit in suits:
+			suit_masks.append((hand >> (suit * 13)) & 0x1FFF)
+	else:
+		for suit in hand.values():
+			suit_mask = 0
+			for card in suit:
+				suit_mask |= 1 << (card[0] - 1)
+			suit_masks.append(suit_mask)
+
+	# The suit with the highest ranks becomes the first suit, and so on
+	order = sorted(suits, key=suit_masks.__getitem__, reverse=True)
+	canonical = 0
+	suit_map = [0] * 4
+	for new_suit, old_suit in enumerate(order):
+		canonical |= suit_masks[old_suit] << (new_suit * 13)
+		suit_map[old_suit] = new_suit
+	return (canonical, suit_map)
+
+
+def shuffle(deck: list, rng=None) -> list:
 	'''
 	Changes the order of the cards in the deck randomly
 
 	Parameters:
 		deck (list[tuple(int, int)]): a list of cards in the format: (rank, suit)
+		rng (random.Random): the random number generator to shuffle with, so
+			a seeded generator always gives the same order; defaults to the
+			random module
 	
 	Returns:
 		(list[tuple(int, int)]): the same list as the given list, with the
 			order of its elements randomly organized
+
+	Doctests:
+		>>> deck = create_deck()
+		>>> shuffled = shuffle(deck, random.Random(1))
+		>>> shuffled == shuffle(deck, random.Random(1)), shuffled == deck
+		(True, False)
+		>>> sorted(shuffled) == sorted(deck)
+		True
 	'''
+	if rng is None:
+		rng = random
+
+	# Decks are shuffled as a list, then put back into a new Deck
+	if isinstance(deck, Deck):
+		return Deck(shuffle(list(deck), rng), deck.capacity)
+
 	# There may be times when I want to keep the original deck, so its best to
 	# make a copy and shuffle that
 	working_deck = deck.copy()
 
-	# Do 1000 shuffles
-	for _ in range(1000):
-
-		# Get the positions of the cards to be swapped
-		position1 = randint(0, len(working_deck) - 1)
-		position2 = randint(0, len(working_deck) - 1)
-
-		# Get the cards
-		card1 = working_deck[position1]
-		card2 = working_deck[position2]
-
-		# Swap the cards
-		working_deck[position2] = card1
-		working_deck[position1] = card2
+	# random.shuffle is a Fisher-Yates shuffle: each card is swapped once with
+	# a random card that hasn't been placed yet, so every order is equally
+	# likely and it only takes one random number per card
+	rng.shuffle(working_deck)
 
 	# Shuffled!
 	return working_deck
@@ -115,8 +452,8 @@ def deal(deck: list) -> tuple:
 	Removes the top card from the deck, and returns said card
 
 	Parameters:
-		deck (list[tuple(int, int)]): a list of cards in the format
-			(rank, suit); the last card will be removed
+		deck (list[tuple(int, int)] | Deck): a list of cards in the format
+			(rank, suit), or a Deck; the last card will be removed
 	
 	Returns:
 		(tuple(int, int)): the last card in the deck
@@ -139,20 +476,48 @@ def deal(deck: list) -> tuple:
 		(2, 1)
 		>>> deck
 		[(3, 2), (4, 3), (5, 0), (1, 0)]
+
+		>>> deck = [0, 14, 28, 42]
+		>>> deal(deck)
+		42
 	'''
 	# The list.pop() method does exactly what I need
 	return deck.pop()
 
 
+def put_bottom(card: tuple, deck: list):
+	'''
+	Puts the given card on the bottom of the deck
+
+	Parameters:
+		card (tuple(int, int)): the card in the format: (rank, suit)
+		deck (list[tuple(int, int)] | Deck): a list of cards in the format
+			(rank, suit), or a Deck
+
+	Doctests:
+		>>> deck = [(1, 0), (2, 1)]
+		>>> put_bottom((3, 2), deck)
+		>>> deck
+		[(3, 2), (1, 0), (2, 1)]
+	'''
+	# A Deck does this without moving the other cards
+	if isinstance(deck, Deck):
+		deck.put_bottom(card)
+	else:
+		deck.insert(0, card)
+
+
 def replace_card(card: tuple, hand: dict, deck: list) -> bool:
 	'''
 	Returns the given card to the given deck and replaces it with the top card
 
 	Parameters:
 		card (tuple(int, int)): the card to discard in the format: (rank, suit)
-		hand (dict{list[tuple(int, int)]}): cards in the format: (rank, suit)
-			organized by their suit
-		deck (list[tuple(int, int)]): a list of cards in the format (rank, suit)
+		hand (dict{list[tuple(int, int)]} | HandAnalysis): cards in the
+			format: (rank, suit) organized by their suit, or their analysis,
+			which is kept up to date without going over the other cards
+		deck (list[tuple(int, int)] | Deck): a list of cards in the format
+			(rank, suit), or a Deck
 	
 	Returns:
 		(bool): True if the card was found, False otherwise
@@ -175,14 +540,38 @@ False
 [(1, 0), (2, 1), (3, 2), (4, 3)]
 >>> hand
 {0: [(5, 0)], 1: [(5, 1)], 2: [(5, 2)], 3: [(5, 3), (1, 3)]}
+
+>>> deck = Deck([(1, 0), (2, 1), (3, 2), (4, 3)])
+>>> hand = {0: [(5, 0)], 1: [(5, 1)], 2: [(5, 2)], 3: [(5, 3), (1, 3)]}
+>>> replace_card((1, 3), hand, deck)
+True
+>>> deck
+Deck([(1, 3), (1, 0), (2, 1), (3, 2)])
+
+>>> analysis = HandAnalysis({0: [(5, 0)], 1: [(5, 1)], 2: [(5, 2)], \
+3: [(5, 3), (1, 3)]})
+>>> replace_card((1, 3), analysis, [(1, 0), (2, 1), (3, 2), (4, 3)])
+True
+>>> analysis.hand_rank, analysis.hand[3]
+(7, [(5, 3), (4, 3)])
 	'''
+	# An analysis swaps the card in its hand, and only rescores once both
+	# cards have changed
+	if isinstance(hand, HandAnalysis):
+		if card not in hand.hand[card[1]]:
+			return False
+		hand.remove_card(card, False)
+		put_bottom(card, deck)
+		hand.add_card(deal(deck))
+		return True
+
 	# Check if the hand has the card
 	if card not in hand[card[1]]:
 		return False
 	# Remove the card from the hand
 	hand[card[1]].remove(card)
 	# Put the card in the deck
-	deck.insert(0, card)
+	put_bottom(card, deck)
 	# Deal a card from the deck...
 	new_card = deal(deck)
 	# and give it to the hand
@@ -190,17 +579,71 @@ False
 	return True
 
 
+def replace_card_mask(card: int, hand: int, deck: list) -> int:
+	'''
+	Returns the given card to the given deck and replaces it with the top
+	card, for hand masks
+
+	Parameters:
+		card (int): the card code of the card to discard
+		hand (int | HandAnalysis): a hand mask, or its analysis, which is kept
+			up to date without going over the other cards
+		deck (list[int] | Deck): a list of card codes, or a Deck of them
+
+	Returns:
+		(int): the new hand mask, which is the same as the given hand mask if
+			the card wasn't found
+
+	Doctests:
+>>> deck = [0, 14, 28, 42]
+>>> replace_card_mask(51, (1 << 51) | (1 << 4), deck)
+4398046511120
+>>> deck
+[51, 0, 14, 28]
+
+>>> deck = [0, 14, 28, 42]
+>>> replace_card_mask(50, (1 << 51) | (1 << 4), deck)
+2251799813685264
+>>> deck
+[0, 14, 28, 42]
+
+>>> analysis = HandAnalysis(0b11110 | (1 << 51))
+>>> replace_card_mask(51, analysis, [0]) == analysis.hand == 0b11111
+True
+>>> analysis.hand_rank
+8
+	'''
+	# An analysis swaps the card in its hand mask, and only rescores once
+	# both cards have changed
+	if isinstance(hand, HandAnalysis):
+		if hand.hand & (1 << card):
+			hand.remove_card(card, False)
+			put_bottom(card, deck)
+			hand.add_card(deal(deck))
+		return hand.hand
+
+	# Check if the hand has the card
+	card_bit = 1 << card
+	if not hand & card_bit:
+		return hand
+	# Put the card in the deck
+	put_bottom(card, deck)
+	# Deal a card from the deck and swap it in
+	return (hand ^ card_bit) | (1 << deal(deck))
+
+
 def deal_hands(hand_num: int, deck: list) -> list:
 	'''
 	Creates a dictionary of hands with 5 cards each from the given deck
 
 	Parameters:
 		hand_num (int): the number of hands to deal
-		deck (list[tuple(int, int)]): a list of cards in the format:
-			(rank, suit); this list will be modified
+		deck (list[tuple(int, int)] | Deck): a list of cards in the format:
+			(rank, suit), or a Deck; this deck will be modified
 	Returns:
 		(list[dict{int: list[tuple(int, int)]}]): the dealt hands, each
-			with 5 cards, organized by suit
+			with 5 cards, organized by suit. If the deck holds card codes,
+			the hands are hand masks instead
 	
 	Doctests:
 		>>> deck = [(1, 0), (2, 1), (3, 2), (4, 3), (5, 0), (6, 1), (7, 2), \
@@ -217,7 +660,21 @@ def deal_hands(hand_num: int, deck: list) -> list:
 		[{0: [(1, 0), (13, 0)], 1: [(2, 1)], 2: [(11, 2)], 3: [(12, 3)]}]
 		>>> deck
 		[(3, 2), (4, 3), (5, 0), (6, 1), (7, 2), (8, 3), (9, 0), (10, 1)]
+
+		>>> deck = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
+		>>> deal_hands(2, deck)
+		[5456, 2728]
+		>>> deck
+		[0, 1, 2]
 	'''
+	# Decks of card codes deal hand masks
+	if len(deck) > 0 and isinstance(deck[-1], int):
+		hands = [0] * hand_num
+		for _ in range(5):
+			for hand in range(hand_num):
+				hands[hand] |= 1 << deal(deck)
+		return hands
+
 	# Dictionary of hands to return
 	hands = []
 
@@ -258,7 +715,17 @@ def find_card(card_index: int, hand: dict) -> tuple:
 
 >>> find_card(5, {0: [(1, 0), (5, 0)], 1: [(2, 1)], 2: [(3, 2)], 3: [(4, 3)]})
 (4, 3)
+
+>>> find_card(2, 2251799813685253)
+2
 	'''
+	# Hand masks give back the card code, or -1 if it wasn't found
+	if isinstance(hand, int):
+		codes = mask_to_codes(hand)
+		if 0 < card_index <= len(codes):
+			return codes[card_index - 1]
+		return -1
+
 	card_count = 0
 	for suit in hand.values():
 		for card in suit:
@@ -268,13 +735,14 @@ def find_card(card_index: int, hand: dict) -> tuple:
 	return (0, 0)
 
 
-def print_hand(hand: dict):
+def print_hand(hand: dict, output=print):
 	'''
 	Prints the cards in the given hand
 
 	Parameters:
 		hand (dict{int: list[tuple(int, int)]}): a dictionary of cards in the
 			format: (rank, suit) sorted by suit
+		output (callable): where to print to, like print; defaults to print
 	
 	Doctests:
 		>>> print_hand({0: [(1, 0), (2, 0)], 1: [(3, 1)], 2: [(4, 2), (5, 2)], 3: []})
@@ -290,7 +758,16 @@ def print_hand(hand: dict):
 		3) 8 of Spades
 		4) Ace of Spades
 		5) 7 of Spades
+
+		>>> print_hand(2251799813685253)
+		1) Ace of Hearts
+		2) 3 of Hearts
+		3) King of Spades
 	'''
+	# Hand masks are printed the same as their hand
+	if isinstance(hand, int):
+		hand = mask_to_hand(hand)
+
 	# The number of the card in the hand
 	card_number = 1
 
@@ -299,8 +776,8 @@ def print_hand(hand: dict):
 		for card in hand[suit]:
 
 			# Print the card
-			print(f"{card_number}) ", end='')
-			print_card(card)
+			output(f"{card_number}) ", end='')
+			print_card(card, output)
 
 			# Increment the card number
 			card_number += 1
@@ -356,7 +833,7 @@ def raise_bet(money: int, bet: int, current_bet: int) -> tuple:
 	return (money, current_bet)
 
 
-def print_raise(raised_bet: int, bet: int, name: str):
+def print_raise(raised_bet: int, bet: int, name: str, output=print):
 	'''
 	Prints the given bet
 
@@ -364,6 +841,7 @@ def print_raise(raised_bet: int, bet: int, name: str):
 		raised_bet: the amount the bet is currently
 		bet (int): the amount the player bet
 		name (string): the name of the player betting
+		output (callable): where to print to, like print; defaults to print
 	
 	Doctests:
 >>> print_raise(25, 5, 'Nathan')
@@ -376,18 +854,19 @@ def print_raise(raised_bet: int, bet: int, name: str):
 > CPU 3 met the bet of $50 <
 	'''
 	if bet == 0:
-		print(f"> {name} met the bet of ${raised_bet} <")
+		output(f"> {name} met the bet of ${raised_bet} <")
 		return
-	print(f"> {name} bet ${bet}, putting the bet to ${raised_bet} <")
+	output(f"> {name} bet ${bet}, putting the bet to ${raised_bet} <")
 
 
-def print_balance(money: int, name: str):
+def print_balance(money: int, name: str, output=print):
 	'''
 	Prints the balance of the player
 
 	Parameters:
 		money (int): the available betting money of this player
 		name (int): the name of this player
+		output (callable): where to print to, like print; defaults to print
 	
 	Doctests:
 >>> print_balance(50, 'Nathan')
@@ -396,15 +875,16 @@ Nathan has $50 to bet with
 >>> print_balance(0, 'CPU 1')
 CPU 1 has $0 to bet with
 	'''
-	print(f"{name} has ${money} to bet with")
+	output(f"{name} has ${money} to bet with")
 
 
-def print_current_bet(bet: int):
+def print_current_bet(bet: int, output=print):
 	'''
 	Prints the current bet amount
 
 	Parameters:
 		bet (int): the bet amount
+		output (callable): where to print to, like print; defaults to print
 	
 	Doctests:
 >>> print_current_bet(100)
@@ -413,7 +893,7 @@ The bet is at $100
 >>> print_current_bet(50)
 The bet is at $50
 	'''
-	print(f"The bet is at ${bet}")
+	output(f"The bet is at ${bet}")
 
 
 def flush(hand: dict) -> int:
@@ -421,8 +901,9 @@ def flush(hand: dict) -> int:
 	Is the given hand a flush?
 
 	Parameters:
-		hand (dict{int: list[tuple(int, int)]}): a dictionary containing cards
-			in the format: (rank, suit) sorted by their suit
+		hand (dict{int: list[tuple(int, int)]} | HandAnalysis): a dictionary
+			containing cards in the format: (rank, suit) sorted by their suit,
+			or its analysis
 	
 	Returns:
 		(int): 5 if a flush, 0 otherwise
@@ -434,6 +915,9 @@ def flush(hand: dict) -> int:
 >>> flush({0: [], 1: [(1, 1), (2, 1), (3, 1), (4, 1)], 2: [(5, 2)], 3: []})
 0
 	'''
+	if isinstance(hand, HandAnalysis):
+		return 5 if hand.is_flush else 0
+
 	# Check every suit in hand
 	for suit in hand.values():
 
@@ -460,8 +944,9 @@ def hand_ranks(hand: dict) -> list:
 	Creates a histogram of the hand, finding the number of cards in each rank
 
 	Parameters:
-		hand (dict{int: list[tuple(int, int)]}): a dictionary containing cards
-			in the format (rank, suit) sorted by their suit
+		hand (dict{int: list[tuple(int, int)]} | HandAnalysis): a dictionary
+			containing cards in the format (rank, suit) sorted by their suit,
+			or its analysis, which already has the histogram
 	
 	Returns:
 		(list[int]): a list of length 13, where each index represents a rank
@@ -472,10 +957,23 @@ def hand_ranks(hand: dict) -> list:
 
 >>> hand_ranks({0: [(5, 0)], 1: [(5, 1), (9, 1)], 2: [(9, 3)], 3: [(9, 3)]})
 [0, 0, 0, 0, 2, 0, 0, 0, 3, 0, 0, 0, 0]
+
+>>> hand_ranks(2251799813685253)
+[1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1]
 	'''
+	# The analysis's histogram is shared, so a copy is given back
+	if isinstance(hand, HandAnalysis):
+		return hand.ranks.copy()
+
 	# The histogram, with an entry for every rank
 	hist = [0] * 13
 
+	# Hand masks have the rank in the card code
+	if isinstance(hand, int):
+		for code in mask_to_codes(hand):
+			hist[code % 13] += 1
+		return hist
+
 	# Loop through every suit
 	for suit in hand.values():
 
@@ -516,6 +1014,9 @@ def straight(ranks: list) -> int:
 4
 
 >>> straight([1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1])
+0
+
+>>> straight([0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 1, 1, 1])
 0
 	'''
 	# Check all the ranks up until the last 4
@@ -524,7 +1025,8 @@ def straight(ranks: list) -> int:
 
 		# If the hand has an ace, and isn't A 2 3 4 5, check for the scenario
 		# of 10 J Q K A
-		if rank == 0 and ranks[1] == 0 and ranks[-4:] == [1] * 4:
+		if rank == 0 and count == 1 and ranks[1] == 0 and \
+				ranks[-4:] == [1] * 4:
 			return 4
 
 		# If the hand has the current rank...
@@ -548,8 +1050,9 @@ def straight_flush(hand: dict) -> int:
 	Is the given hand a straight flush?
 
 	Parameters:
-		hand (dict{int: list[tuple(int, int)]}): a dictionary containing cards
-			in the format (rank, suit) sorted by their suit
+		hand (dict{int: list[tuple(int, int)]} | HandAnalysis): a dictionary
+			containing cards in the format (rank, suit) sorted by their suit,
+			or its analysis
 
 	Returns:
 		(int): 8 if a straight flush, 0 otherwise
@@ -571,12 +1074,16 @@ def straight_flush(hand: dict) -> int:
 2: [], 3: []})
 0
 	'''
+	# Go over the cards once for both checks
+	if not isinstance(hand, HandAnalysis):
+		hand = HandAnalysis(hand)
+
 	# Is the hand a flush?
-	if flush(hand) != 5:
+	if not hand.is_flush:
 		return 0
 
 	# Is the hand a straight?
-	if straight(hand_ranks(hand)) != 4:
+	if straight(hand.ranks) != 4:
 		return 0
 
 	# This hand is a straight flush
@@ -763,69 +1270,496 @@ def one_pair(ranks: list) -> int:
 	return 0
 
 
-def hand_value(hand: dict) -> tuple:
+def score_ranks(ranks: list) -> int:
 	'''
-	Finds the value of the hand based on its cards
+	Finds the rank of a hand from its rank histogram alone, as if its cards
+	weren't all the same suit
 
 	Parameters:
-		hand (dict{int, list[tuple(int, int)]}): a hand of cards of the format
-			(rank, suit) sorted by their suit
-	
+		ranks (list[int]): a histogram of the cards ranks in a hand
+
 	Returns:
-		(int, float): the first number is the highest card; the second number is
-			a number to represent the value of the hand based on the values of
-			the cards, like this:
-			({2} * 5^0 + {3} * 5^1 + {4} * 5^2 + ... + {K} * 5^11 + {A} * 5^12)
-			/ {1 * 5^11 + 4 * 5^12} + {hand rank}
-	
+		(int): the rank of the hand
+
 	Doctests:
->>> hand_value({0: [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)], 1: [], 2: [], 3: []})
-(1, 8.238095390232381)
+>>> score_ranks([0, 0, 3, 0, 0, 2, 0, 0, 0, 0, 0, 0, 0])
+6
 
->>> hand_value({0: [(10, 0), (11, 0), (12, 0), (13, 0), (1, 0)], 1: [], 2: [], 3: []})
-(1, 8.29752380952381)
+>>> score_ranks([1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1])
+4
 
->>> hand_value({0: [(10, 0), (11, 0), (12, 0), (13, 0)], 1: [(1, 1)], 2: [], 3: []})
-(1, 4.29752380952381)
-	'''
-	# Card ranks in the hand
-	ranks = hand_ranks(hand)
-	# Move Ace to top rank (Ace has the highest value)
-	ranks.append(ranks.pop(0))
-	# Each rank in the ranks list has 5 possible values in a deck with only 4 suits
-	# 0, 1, 2, 3, 4
-	rank_amounts_num = 5
-	# The max value a hand can have on ranks alone
-	max_value = rank_amounts_num**11 + 4 * rank_amounts_num**12
-
-	# Find the hand value on ranks alone
-	hand_ranks_value = 0
-	for rank, value in enumerate(ranks):
-		# Like binary, this method allows any amount of any rank to not overlap
-		# in value with other ranks
-		hand_ranks_value += value * rank_amounts_num**(rank)
-	
-	# The hand's value: whole digit is the hand rank, decimal is the value of
-	# the ranks in the hand
-	hand_value = hand_ranks_value / max_value + find_hand_rank(hand)
-	
+>>> score_ranks([0, 1, 0, 1, 0, 0, 1, 2, 0, 0, 0, 0, 0])
+1
+	'''
+	return max(four_of_a_kind(ranks),
+		max(full_house(ranks),
+		max(straight(ranks),
+		max(three_of_a_kind(ranks),
+		max(two_pair(ranks), one_pair(ranks)
+	)))))
+
+
+def highest_rank(ranks: list) -> int:
+	'''
+	Finds the highest card rank in a rank histogram, Ace being the highest
+
+	Parameters:
+		ranks (list[int]): a histogram of the cards ranks in a hand
+
+	Returns:
+		(int): the highest rank, or 0 if there are no cards
+
+	Doctests:
+>>> highest_rank([1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1])
+1
+
+>>> highest_rank([0, 0, 3, 0, 0, 2, 0, 0, 0, 0, 0, 0, 0])
+6
+
+>>> highest_rank([0] * 13)
+0
+	'''
 	# If there is an ace, it is the highest
-	if ranks[-1] != 0:
-		return (1, hand_value)
+	if ranks[0] != 0:
+		return 1
 
 	# Record the highest card
 	highest = 0
 
 	# Check every rank
-	for rank, count in enumerate(ranks[:-1]):
-		
+	for rank, count in enumerate(ranks):
+
 		# If there is a card of this rank, then because we're iterating
 		# upwards, it is the highest so far
 		if count != 0:
-			highest = rank + 2 # Fix zero index problem
-	
+			highest = rank + 1 # Fix zero index problem
+
 	# Found the highest card
-	return (highest, hand_value)
+	return highest
+
+
+def strength_key(ranks: list, hand_rank: int) -> int:
+	'''
+	Finds the strength of a hand, a number where a higher number is a better
+	hand and hands that are just as good have the same number
+
+	Parameters:
+		ranks (list[int]): a histogram of the cards ranks in a hand
+		hand_rank (int): the rank of the hand
+
+	Returns:
+		(int): the strength of the hand. In hexadecimal, the first digit is
+			the hand rank, and the next 5 are the values of the cards (2 to
+			14, Ace being 14), with the ranks that have the most cards first
+			and higher ranks before lower ones. In A 2 3 4 5 straights, Ace
+			is 1 instead
+
+	Doctests:
+>>> hex(strength_key([0, 0, 3, 0, 0, 2, 0, 0, 0, 0, 0, 0, 0], 6))
+'0x633366'
+
+>>> hex(strength_key([1, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0, 0, 2], 2))
+'0x2dd99e'
+
+>>> hex(strength_key([1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0], 8))
+'0x854321'
+
+>>> hex(strength_key([1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1], 4))
+'0x4edcba'
+	'''
+	# The value of each rank, Ace being the highest
+	values = list(range(2, 14)) + [14]
+	values = values[-1:] + values[:-1]
+
+	# In A 2 3 4 5 straights, Ace is the lowest
+	if (hand_rank == 4 or hand_rank == 8) and ranks[0] != 0 and ranks[1] != 0:
+		values[0] = 1
+
+	# Order the ranks by their amount of cards, then by their value
+	groups = []
+	for rank, count in enumerate(ranks):
+		if count != 0:
+			groups.append((count, values[rank]))
+	groups.sort(reverse=True)
+
+	# Add each card value as a hexadecimal digit, up to 5 cards
+	strength = hand_rank
+	card_num = 0
+	for count, value in groups:
+		for _ in range(count):
+			if card_num < 5:
+				strength = strength * 16 + value
+				card_num += 1
+
+	# Hands with less than 5 cards still line up with 5 card hands
+	for _ in range(5 - card_num):
+		strength *= 16
+
+	return strength
+
+
+# Each rank in a hand has 5 possible amounts in a deck with only 4 suits
+# (0, 1, 2, 3, 4), so giving every rank a weight of 5^n means adding up the
+# weights of the cards in a hand gives a number unique to the ranks in that
+# hand, like binary. Ace has the highest weight (Ace has the highest value)
+rank_weights = { 1: 5**12, 2: 5**0, 3: 5**1, 4: 5**2, 5: 5**3, 6: 5**4,
+	7: 5**5, 8: 5**6, 9: 5**7, 10: 5**8, 11: 5**9, 12: 5**10, 13: 5**11 }
+
+
+def build_hand_table() -> dict:
+	'''
+	Scores every possible set of ranks a 5 card hand can have
+
+	Returns:
+		(dict{int: tuple(int, int, int)}): the score of each set of ranks, by
+			the total rank weight of the set. Each score is:
+			0: the strength of the hand if its cards aren't all the same suit
+			1: the strength of the hand if its cards are all the same suit
+			2: the highest card in the hand
+			The rank of a hand is its strength // 16^5 (see strength_key)
+
+	Doctests:
+>>> table = build_hand_table()
+>>> len(table)
+6175
+>>> table[rank_weights[10] + rank_weights[11] + rank_weights[12] + \
+rank_weights[13] + rank_weights[1]]
+(5168314, 9362618, 1)
+>>> table[rank_weights[2] * 2 + rank_weights[7] * 3]
+(6780706, 6780706, 7)
+	'''
+	table = {}
+
+	# Every set of ranks is a choice of 5 ranks, where ranks can repeat
+	for rank_set in combinations_with_replacement(ranks, 5):
+
+		# A histogram of the ranks in the set
+		hist = [0] * 13
+		for rank in rank_set:
+			hist[rank - 1] += 1
+
+		# A deck only has 4 cards of each rank
+		if max(hist) > 4:
+			continue
+
+		# Find the rank of the hand when its cards aren't a flush
+		hand_rank = score_ranks(hist)
+
+		# Only hands with 5 different ranks can be a flush, and those are
+		# either a straight flush or a plain flush
+		flush_rank = hand_rank
+		if max(hist) == 1:
+			flush_rank = 8 if hand_rank == 4 else 5
+
+		weight = 0
+		for rank in rank_set:
+			weight += rank_weights[rank]
+		table[weight] = (strength_key(hist, hand_rank),
+				strength_key(hist, flush_rank), highest_rank(hist))
+
+	return table
+
+
+# Every possible 5 card hand, scored once when the module is loaded; after
+# this, scoring a hand only takes adding up 5 weights and a dictionary lookup
+hand_table = build_hand_table()
+
+
+def build_suit_mask_weights() -> list:
+	'''
+	Finds the total rank weight of every set of ranks in a single suit
+
+	Returns:
+		(list[int]): the total rank weight, by the 13 bits for a suit in a
+			hand mask
+
+	Doctests:
+>>> weights = build_suit_mask_weights()
+>>> weights[0b1000000000001] == rank_weights[1] + rank_weights[13]
+True
+	'''
+	weights = [0] * 8192
+	for suit_mask in range(1, 8192):
+		# Add the weight of the lowest rank to the weight without it
+		low_bit = suit_mask & -suit_mask
+		weights[suit_mask] = weights[suit_mask ^ low_bit] + \
+				rank_weights[low_bit.bit_length()]
+	return weights
+
+
+# The rank weights for each suit of a hand mask
+suit_mask_weights = build_suit_mask_weights()
+
+
+# The ranks from the highest value to the lowest, Ace being the highest
+ranks_by_value = ( 1, 13, 12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2 )
+
+# What rank_shape has found for each total rank weight so far
+rank_shapes = {}
+
+
+def rank_shape(weight: int) -> tuple:
+	'''
+	Works out the ranks in a hand from its total rank weight, and keeps them
+	in rank_shapes so it's only done once for each weight
+
+	Parameters:
+		weight (int): the total rank weight of the cards (see rank_weights)
+
+	Returns:
+		(tuple(list[int], int, list[tuple(int, int)])): the histogram of the
+			ranks (see hand_ranks), the ranks in the hand as 13 bits (bit 0
+			is the Ace), and the ranks grouped by their number of cards as
+			(number of cards, rank), biggest group first and higher ranks
+			before lower ones. These are shared, so they must not be changed
+
+	Doctests:
+>>> rank_shape(rank_weights[1] * 2 + rank_weights[13] * 2 + rank_weights[5])
+([2, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 2], 4113, [(2, 1), (2, 13), (1, 5)])
+	'''
+	# Each rank is a base 5 digit of the weight
+	hist = [weight // rank_weights[rank] % 5 for rank in ranks]
+	rank_mask = 0
+	for rank, count in enumerate(hist):
+		if count:
+			rank_mask |= 1 << rank
+
+	# Going from the highest rank down and sorting only by the number of
+	# cards keeps higher ranks before lower ones in groups of the same size
+	groups = [(hist[rank - 1], rank) for rank in ranks_by_value
+		if hist[rank - 1]]
+	groups.sort(key=itemgetter(0), reverse=True)
+
+	shape = (hist, rank_mask, groups)
+	rank_shapes[weight] = shape
+	return shape
+
+
+class HandAnalysis:
+	'''
+	Everything the evaluators need to know about a hand, found by going over
+	its cards only once. Every evaluator that's given a HandAnalysis instead
+	of a hand reads from it instead of going over the cards again, and
+	replace_card keeps it up to date as cards are swapped, so scoring the
+	hand again only takes looking it up
+	'''
+
+	def __init__(self, hand):
+		'''
+		Parameters:
+			hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand mask
+
+		Doctests:
+>>> analysis = HandAnalysis({0: [(1, 0), (5, 0)], 1: [(1, 1)], 2: [(1, 2)], \
+3: [(9, 3)]})
+>>> analysis.ranks
+[3, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0]
+>>> analysis.suit_counts, bin(analysis.rank_mask), analysis.groups
+([2, 1, 1, 1], '0b100010001', [(3, 1), (1, 9), (1, 5)])
+>>> analysis.hand_rank, analysis.highest, hex(analysis.strength)
+(3, 1, '0x3eee95')
+		'''
+		self.hand = hand
+		# The number of cards in each suit, and the total rank weight of the
+		# cards (see rank_weights), like hand_lookup
+		suit_counts = [0] * 4
+		weight = 0
+		if isinstance(hand, int):
+			for suit in suits:
+				suit_mask = (hand >> (suit * 13)) & 0x1FFF
+				suit_counts[suit] = suit_mask.bit_count()
+				weight += suit_mask_weights[suit_mask]
+		else:
+			for suit, cards in hand.items():
+				suit_counts[suit] = len(cards)
+				for card in cards:
+					weight += rank_weights[card[0]]
+		self.suit_counts = suit_counts
+		self.weight = weight
+		self.rescore()
+
+	def rescore(self):
+		'''
+		Works out everything else from the suit counts and the total rank
+		weight, which only takes looking them up, not going over the cards
+		'''
+		# The weight is unique to the ranks in the hand, so everything about
+		# the ranks is worked out once for each weight and kept (see
+		# rank_shape)
+		shape = rank_shapes.get(self.weight)
+		if shape is None:
+			shape = rank_shape(self.weight)
+		self.ranks, self.rank_mask, self.groups = shape
+
+		# Like flush, the hand is a flush if the first suit with cards has all
+		# 5 of them
+		self.is_flush = False
+		for count in self.suit_counts:
+			if count:
+				self.is_flush = count == 5
+				break
+
+		score = hand_table.get(self.weight)
+		if score is not None:
+			self.strength = score[1] if self.is_flush else score[0]
+			self.highest = score[2]
+		else:
+			# Only 5 card hands are in the table, anything else has to be
+			# checked the long way, from what was found above
+			hand_rank = score_ranks(self.ranks)
+			if self.is_flush:
+				hand_rank = max(hand_rank,
+						8 if straight(self.ranks) == 4 else 5)
+			self.strength = strength_key(self.ranks, hand_rank)
+			self.highest = highest_rank(self.ranks)
+		self.hand_rank = self.strength >> 20
+
+	def add_card(self, card, rescore: bool = True):
+		'''
+		Adds a card to the hand, and to the analysis without going over the
+		other cards
+
+		Parameters:
+			card (tuple(int, int) | int): the card, or its card code for a hand
+				mask
+			rescore (bool): whether to work out the strength and the rest
+				again; it can be put off when another card is about to change
+
+		Doctests:
+>>> analysis = HandAnalysis({0: [(1, 0), (2, 0), (3, 0), (4, 0)], 1: [], \
+2: [], 3: []})
+>>> analysis.add_card((5, 0))
+>>> analysis.hand_rank, analysis.hand[0]
+(8, [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)])
+		'''
+		if isinstance(self.hand, int):
+			self.hand |= 1 << card
+			card = code_to_card(card)
+		else:
+			self.hand[card[1]].append(card)
+		self.suit_counts[card[1]] += 1
+		self.weight += rank_weights[card[0]]
+		if rescore:
+			self.rescore()
+
+	def remove_card(self, card, rescore: bool = True):
+		'''
+		Takes a card out of the hand, and out of the analysis without going
+		over the other cards
+
+		Parameters:
+			card (tuple(int, int) | int): the card, which must be in the hand,
+				or its card code for a hand mask
+			rescore (bool): whether to work out the strength and the rest
+				again; it can be put off when another card is about to change
+
+		Doctests:
+>>> analysis = HandAnalysis(0b11111)
+>>> analysis.remove_card(4)
+>>> analysis.hand, analysis.ranks[:5]
+(15, [1, 1, 1, 1, 0])
+		'''
+		if isinstance(self.hand, int):
+			self.hand &= ~(1 << card)
+			card = code_to_card(card)
+		else:
+			self.hand[card[1]].remove(card)
+		self.suit_counts[card[1]] -= 1
+		self.weight -= rank_weights[card[0]]
+		if rescore:
+			self.rescore()
+
+
+def hand_lookup(hand: dict) -> tuple:
+	'''
+	Scores the given hand using the hand table
+
+	Parameters:
+		hand (dict{int, list[tuple(int, int)]} | HandAnalysis): a hand of cards
+			of the format (rank, suit) sorted by their suit, or its analysis
+
+	Returns:
+		(int, int, int): the strength of the hand (see strength_key), the rank
+			of the hand, and the highest card in the hand
+
+	Doctests:
+>>> hand_lookup({0: [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)], 1: [], 2: [], 3: []})
+(8733473, 8, 1)
+
+>>> hand_lookup({0: [(2, 0), (7, 0)], 1: [(2, 1), (7, 1)], 2: [(7, 2)], 3: []})
+(6780706, 6, 7)
+
+>>> hand_lookup({0: [(1, 0), (5, 0)], 1: [(1, 1)], 2: [(1, 2)], 3: []})
+(4124240, 3, 1)
+
+>>> hand_lookup(hand_to_mask( \
+{0: [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)], 1: [], 2: [], 3: []}))
+(8733473, 8, 1)
+	'''
+	# A hand that's already been gone over doesn't need to be again
+	if isinstance(hand, HandAnalysis):
+		return (hand.strength, hand.hand_rank, hand.highest)
+
+	# Add up the weights of the cards, checking for a flush along the way
+	weight = 0
+	is_flush = False
+	if isinstance(hand, int):
+		# Hand masks are added up a suit at a time
+		for suit in suits:
+			suit_mask = (hand >> (suit * 13)) & 0x1FFF
+			weight += suit_mask_weights[suit_mask]
+			if suit_mask.bit_count() == 5:
+				is_flush = True
+	else:
+		for suit in hand.values():
+			for card in suit:
+				weight += rank_weights[card[0]]
+			if len(suit) == 5:
+				is_flush = True
+
+	score = hand_table.get(weight)
+
+	# Only 5 card hands are in the table, anything else has to be checked
+	# the long way
+	if score is None:
+		analysis = HandAnalysis(hand)
+		return (analysis.strength, analysis.hand_rank, analysis.highest)
+
+	strength = score[1] if is_flush else score[0]
+	return (strength, strength >> 20, score[2])
+
+
+def hand_value(hand: dict) -> tuple:
+	'''
+	Finds the value of the hand based on its cards
+
+	Parameters:
+		hand (dict{int, list[tuple(int, int)]} | HandAnalysis): a hand of cards
+			of the format (rank, suit) sorted by their suit, or its analysis
+	
+	Returns:
+		(int, int): the first number is the highest card; the second number is
+			the strength of the hand (see strength_key): the hand rank, then
+			the card values from the biggest group of a rank to the
+			smallest, so a higher number is always a better hand and hands
+			that are just as good always have the same number
+	
+	Doctests:
+>>> hand_value({0: [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)], 1: [], 2: [], 3: []})
+(1, 8733473)
+
+>>> hand_value({0: [(10, 0), (11, 0), (12, 0), (13, 0), (1, 0)], 1: [], 2: [], 3: []})
+(1, 9362618)
+
+>>> hand_value({0: [(10, 0), (11, 0), (12, 0), (13, 0)], 1: [(1, 1)], 2: [], 3: []})
+(1, 5168314)
+
+>>> hand_value({0: [(1, 0), (2, 0), (3, 0), (4, 0)], 1: [(5, 1)], 2: [], 3: []}) \
+< hand_value({0: [(2, 0), (3, 0), (4, 0), (5, 0)], 1: [(6, 1)], 2: [], 3: []})
+True
+	'''
+	strength, hand_rank, highest = hand_lookup(hand)
+	return (highest, strength)
 
 
 def find_hand_rank(hand: dict) -> int:
@@ -833,8 +1767,9 @@ def find_hand_rank(hand: dict) -> int:
 	Finds the ranking of this hand
 
 	Parameters:
-		hand (dict{int, list[tuple(int, int)]}): a dictionary containing cards
-			in the format (rank, suit), sorted by their suit
+		hand (dict{int, list[tuple(int, int)]} | HandAnalysis): a dictionary
+			containing cards in the format (rank, suit), sorted by their suit,
+			or its analysis
 	
 	Returns:
 		(int): the rank of the hand
@@ -852,21 +1787,47 @@ def find_hand_rank(hand: dict) -> int:
 {0: [(1, 0), (5, 0)], 1: [(1, 1)], 2: [(1, 2)], 3: [(1, 3)]})
 7
 	'''
-	# A histogram of this hand's card ranks
-	ranks = hand_ranks(hand)
+	return hand_lookup(hand)[1]
 
-	# Get the rank of this hand
-	return max(straight_flush(hand),
-		max(four_of_a_kind(ranks),
-		max(full_house(ranks),
-		max(flush(hand),
-		max(straight(ranks),
-		max(three_of_a_kind(ranks),
-		max(two_pair(ranks), one_pair(ranks)
-	)))))))
 
+def rank_hands(hands: list) -> list:
+	'''
+	Orders the given hands from best to worst, without printing anything
 
-def compare_hands(hands: list, names: list) -> int:
+	Parameters:
+		hands (list[dict[int: list[tuple(int, int)]]]): a list of hands with
+			cards in the format: (rank, suit) sorted by suit
+
+	Returns:
+		(list[list[int]]): groups of hand indexes, best group first; hands in
+			the same group are tied
+
+	Doctests:
+>>> rank_hands([ \
+{0: [(2, 0), (8, 0)], 1: [(3, 1)], 2: [(5, 2)], 3: [(7, 3)]}, \
+{0: [], 1: [], 2: [(10, 2), (11, 2), (12, 2), (13, 2), (1, 2)], 3: []}, \
+{0: [(2, 1), (8, 1)], 1: [(3, 0)], 2: [(5, 3)], 3: [(7, 2)]}])
+[[1], [0, 2]]
+	'''
+	# Find the value of each hand
+	values = []
+	for hand in hands:
+		values.append(hand_value(hand)[1])
+
+	# Sort the hands from the highest value to the lowest, then put hands
+	# with the same value in the same group
+	ranking = []
+	last_value = None
+	order = sorted(range(len(hands)), key=values.__getitem__, reverse=True)
+	for hand_index in order:
+		if values[hand_index] != last_value:
+			ranking.append([])
+			last_value = values[hand_index]
+		ranking[-1].append(hand_index)
+	return ranking
+
+
+def compare_hands(hands: list, names: list, output=print) -> list:
 	'''
 	Find the best hand
 
@@ -874,9 +1835,11 @@ def compare_hands(hands: list, names: list) -> int:
 		hands (list[dict[int: list[tuple(int, int)]]]): a list of hands with
 			cards in the format: (rank, suit) sorted by suit
 		names (list[string]): a list of names for the players holding the hands
+		output (callable): where to print to, like print; defaults to print
 	
 	Returns:
-		int: the index of the winner
+		(list[list[int]]): groups of hand indexes, best group first; hands in
+			the same group are tied, so the first group splits the pot
 	
 	Doctest:
 >>> compare_hands([ \
@@ -885,7 +1848,7 @@ def compare_hands(hands: list, names: list) -> int:
 ["Nathan", "CPU"])
 CPU's hand is the best!
 Nathan's hand looses...
-1
+[[1], [0]]
 
 >>> compare_hands([ \
 {0: [(2, 0), (8, 0)], 1: [(3, 1)], 2: [(5, 2)], 3: [(7, 3)]}, \
@@ -893,7 +1856,7 @@ Nathan's hand looses...
 ["Nathan", "CPU"])
 CPU's hand is the best!
 Nathan's hand looses...
-1
+[[1], [0]]
 
 >>> compare_hands([ \
 {0: [(1, 0), (9, 0)], 1: [(3, 1)], 2: [(5, 2)], 3: [(7, 3)]}, \
@@ -901,48 +1864,61 @@ Nathan's hand looses...
 {0: [], 1: [(10, 1), (11, 1), (12, 1), (13, 1), (1, 1)], 2: [], 3: []}], \
 ["Nathan", "CPU 1", "CPU 2"])
 CPU 2's hand is the best!
-Nathan's hand looses...
 CPU 1's hand looses...
-2
-	'''
-	# A list of the hand rank per hand
-	ranking = []
-
-	# Find the rank of each hand
-	for hand in hands:
-		ranking.append(find_hand_rank(hand))
-		continue
-	
-	# Get the highest ranked hand
-	highest_hand = 0
+Nathan's hand looses...
+[[2], [1], [0]]
 
-	# Check each hand
-	for hand_index, this_hand in enumerate(hands):
-		if hand_value(this_hand)[1] > hand_value(hands[highest_hand])[1]:
-			highest_hand = hand_index
+>>> compare_hands([ \
+{0: [(2, 0), (8, 0)], 1: [(3, 1)], 2: [(5, 2)], 3: [(7, 3)]}, \
+{0: [(2, 1), (8, 1)], 1: [(3, 0)], 2: [(5, 3)], 3: [(7, 2)]}, \
+{0: [(1, 0), (9, 0)], 1: [(3, 2)], 2: [(5, 1)], 3: [(7, 1)]}], \
+["Nathan", "CPU 1", "CPU 2"])
+CPU 2's hand is the best!
+Nathan's hand looses...
+CPU 1's hand looses...
+[[2], [0, 1]]
 
-	# Found the highest hand
+>>> compare_hands([ \
+{0: [(2, 0), (8, 0)], 1: [(3, 1)], 2: [(5, 2)], 3: [(7, 3)]}, \
+{0: [(2, 1), (8, 1)], 1: [(3, 0)], 2: [(5, 3)], 3: [(7, 2)]}], \
+["Nathan", "CPU"])
+Nathan's hand ties for the best!
+CPU's hand ties for the best!
+[[0, 1]]
+	'''
+	# Order the hands, best first
+	ranking = rank_hands(hands)
 
-	# Message for winning hand
-	print(f"{names[highest_hand]}'s hand is the best!")
+	# Messages for winning hands
+	for this_hand in ranking[0]:
+		if len(ranking[0]) == 1:
+			output(f"{names[this_hand]}'s hand is the best!")
+		else:
+			output(f"{names[this_hand]}'s hand ties for the best!")
 
 	# Messages for loosing hands
-	for this_hand in range(len(hands)):
-		# Skip the winning hand
-		if this_hand == highest_hand:
-			continue
-		print(f"{names[this_hand]}'s hand looses...")
+	for group in ranking[1:]:
+		for this_hand in group:
+			output(f"{names[this_hand]}'s hand looses...")
 	
-	return highest_hand
+	return ranking
+
+
+# A table of the best cards to replace for every hand; when one is loaded
+# (see poker_strategy.load_table), choose_bad_cards looks cards up in it
+# instead of using its rules
+strategy_table = None
 
 
 def choose_bad_cards(hand: dict) -> list:
 	'''
-	Finds the cards to replace based on the rank of the hand
+	Finds the cards to replace based on the rank of the hand, or from the
+	strategy table if one is loaded
 
 	Parameters:
-		hand (dict{int, list[tuple(int, int)]}): a hand containing cards in the
-			format (rank, suit) sorted by suit
+		hand (dict{int, list[tuple(int, int)]} | HandAnalysis): a hand
+			containing cards in the format (rank, suit) sorted by suit, or its
+			analysis
 	
 	Returns:
 		(list): a list of cards to be replaced in the hand
@@ -974,10 +1950,31 @@ def choose_bad_cards(hand: dict) -> list:
 
 >>> choose_bad_cards({0: [(1, 0), (9, 0)], 1: [(3, 1)], 2: [(5, 2)], 3: [(7, 3)]})
 [(9, 0), (3, 1), (5, 2), (7, 3)]
+
+>>> choose_bad_cards(hand_to_mask( \
+{0: [(1, 0), (2, 0)], 1: [(1, 1), (2, 1)], 2: [(3, 2)], 3: []}))
+[28]
 	'''
+	# The rank, histogram and highest card all come from going over the
+	# cards once
+	analysis = hand if isinstance(hand, HandAnalysis) else None
+	if analysis is not None:
+		hand = analysis.hand
+
+	if strategy_table is not None:
+		return strategy_table.lookup(hand)
+
+	# Hand masks give back card codes
+	if isinstance(hand, int):
+		bad_cards = choose_bad_cards(mask_to_hand(hand))
+		return [card_to_code(card) for card in bad_cards]
+
+	if analysis is None:
+		analysis = HandAnalysis(hand)
+
 	# find hand rank
-	hand_rank = find_hand_rank(hand)
-	ranks = hand_ranks(hand)
+	hand_rank = analysis.hand_rank
+	ranks = analysis.ranks
 
 	# If the hand is a straight flush, don't discard at all
 	if hand_rank == 8:
@@ -1060,7 +2057,7 @@ def choose_bad_cards(hand: dict) -> list:
 					bad_cards.append(this_card)
 		return bad_cards
 
-	highest_rank = hand_value(hand)[0]
+	highest_rank = analysis.highest
 	bad_cards = []
 	for suit in hand.values():
 		for this_card in suit:
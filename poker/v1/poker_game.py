@@ -1,6 +1,13 @@
-from random import randint
+from contextlib import contextmanager
+import random
+import sys
+from time import perf_counter
 
+import poker_betting
+import poker_equity
 import poker_functions
+import poker_profile
+import poker_state
 
 
 # Note: I feel like classes would work better for this program, but that wasn't
@@ -12,8 +19,11 @@ def pause():
 	'''
 	Pauses until the user presses the enter key
 	'''
+	# Headless games don't wait for anyone
+	if not PAUSES:
+		return
 	input("(Press enter to continue)")
-	print()
+	OUTPUT()
 
 
 def pinput() -> str:
@@ -30,14 +40,21 @@ def print_action(action: str):
 	'''
 	Prints the given action
 	'''
-	print('>', action, '<')
+	OUTPUT('>', action, '<')
 
 
 def dealer_says(quote: str):
 	'''
 	Prints a quote from the dealer
 	'''
-	print(f'\n\nDEALER: "{quote}"\n')
+	OUTPUT(f'\n\nDEALER: "{quote}"\n')
+
+
+def null_output(*args, **kwargs):
+	'''
+	Same as builtin print(), but throws away whatever it's given, for games
+	nobody is watching
+	'''
 
 
 # Constants
@@ -84,66 +101,124 @@ PLAYER_INDEX = 2
 MINIMUM_BET = 10
 STARTING_MONEY = 1000
 PLAYER_NUM = 5
-NAMES = []
-for this_player in range(PLAYER_NUM):
-	if this_player == PLAYER_INDEX:
-		print("What's your name?")
-		NAMES.append(pinput())
-		continue
-	cpu_number = this_player
-	if this_player > PLAYER_INDEX:
-		cpu_number -= 1
-	NAMES.append('CPU' + str(cpu_number + 1))
 
 
+# Table settings that headless games (see headless_table) change: where
+# everything the game prints goes, whether pause() waits for the player, the
+# random number generator used for shuffling and the CPUs, and how much more
+# or less than usual each CPU is willing to bet (None is the usual for all)
+OUTPUT = print
+PAUSES = True
+RNG = random
+BET_SCALES = None
+
+# Whether CPUs pick the cards to replace with poker_draw instead of the usual
+# rules, and whether the player is shown what poker_draw would replace
+SOLVE_DRAWS = False
+DRAW_HINTS = False
+
+# The seconds each CPU can spend estimating its chance of winning against the
+# other players before betting (see poker_equity.cached_equity), or None for
+# CPUs to bet on the strength of their hand instead, and the most deals each
+# estimate is made from. play_round passes the budget to cpu_decisions;
+# poker_server doesn't, since an estimate would hold up every other table
+EQUITY_BUDGET = None
+EQUITY_TRIALS = 2000
+
+# The value of the best hand in the game, a royal flush, which the value of
+# every other hand is measured against
+ROYAL_FLUSH_VALUE = poker_functions.hand_value({
+	0: [(10, 0), (11, 0), (12, 0), (13, 0), (1, 0)],
+	1: [], 2: [], 3: []
+	})[1]
+
+
+def make_names(player_name: str) -> list:
+	'''
+	Names every player at the table, numbering the CPUs in order
+
+	Parameters:
+		player_name (str): the name of the main player, if there is one
+
+	Returns:
+		list[str]: the name of each player
+
+	Doctests:
+>>> make_names('Nathan')
+['CPU1', 'CPU2', 'Nathan', 'CPU3', 'CPU4']
+	'''
+	names = []
+	for this_player in range(PLAYER_NUM):
+		if this_player == PLAYER_INDEX:
+			names.append(player_name)
+			continue
+		cpu_number = this_player
+		if PLAYER_INDEX is not None and this_player > PLAYER_INDEX:
+			cpu_number -= 1
+		names.append('CPU' + str(cpu_number + 1))
+	return names
+
 
-def ante_up(money):
+# The main player's name is asked for when the game starts
+NAMES = make_names('Player')
+
+
+def ante_up(money, names):
 	'''
 	Each player makes a minimum bet
 
 	Parameters:
 		money (list[int]): the amount of betting money each player has
-		bet (int): the current bet
->>>
+		names (list[str]): the name of each player
 	'''
 	dealer_says('Ante up!')
-	print("Minimum bet:", MINIMUM_BET)
-	print()
+	OUTPUT("Minimum bet:", MINIMUM_BET)
+	OUTPUT()
 	# For each player...
-	for this_player in range(PLAYER_NUM): 
+	for this_player in range(len(money)): 
 
 		# Bet the minimum bet
 		money[this_player] -= MINIMUM_BET
 
 		# Print the bet
-		print_action(NAMES[this_player] + ' met the minimum bet')
+		print_action(names[this_player] + ' met the minimum bet')
 
 		# Print the balance
-		poker_functions.print_balance(money[this_player], NAMES[this_player])
+		poker_functions.print_balance(money[this_player], names[this_player],
+				OUTPUT)
 		pause()
 
 
-def player_redraw_cards(hand, deck):
+def player_redraw_cards(name, hand, deck):
 	'''
 	A menu to let the player choose which cards to redraw
 	'''
+	if DRAW_HINTS:
+		# poker_draw needs numpy, so it's only imported when it's used
+		import poker_draw
+		bad_cards = poker_draw.best_discards(hand)
+		OUTPUT("Hint: the best cards to replace are:" if bad_cards \
+				else "Hint: the best is to keep every card")
+		for card in bad_cards:
+			poker_functions.print_card(card, OUTPUT)
+
 	# Does the player wish to discard cards?
-	print('Do you wish to discard any cards? (y/n)')
+	OUTPUT('Do you wish to discard any cards? (y/n)')
 	discard_answer = pinput()
 	# Validate input
 	while discard_answer != 'y' and discard_answer != 'n':
-		print("Answer must be 'y' or 'n'. Try again")
+		OUTPUT("Answer must be 'y' or 'n'. Try again")
 		discard_answer = pinput()
 	if discard_answer == 'n':
 		return
 	
 	# How many cards does the player wish to replace?
-	print('How many?')
+	OUTPUT('How many?')
 	card_num = pinput()
 	# Validate input
 	while (int(card_num) < 1 or int(card_num) > 4) \
 			if card_num.isnumeric() else True:
-		print('Answer must be an integer between 1 and 4 (inclusive).',
+		OUTPUT('Answer must be an integer between 1 and 4 (inclusive).',
 			  'Try again')
 		card_num = pinput()
 	card_num = int(card_num)
@@ -156,18 +231,18 @@ def player_redraw_cards(hand, deck):
 	# Which cards?
 	for _ in range(card_num):
 		# Print cards
-		print()
+		OUTPUT()
 		for index, card in enumerate(card_options):
-			print(f"{index + 1}) ", end='')
-			poker_functions.print_card(card)
+			OUTPUT(f"{index + 1}) ", end='')
+			poker_functions.print_card(card, OUTPUT)
 	
 		# Which card?
-		print(f"Which card? (1-{len(card_options)})")
+		OUTPUT(f"Which card? (1-{len(card_options)})")
 		card = pinput()
 		# Validate input
 		while (int(card) < 1 or int(card) > len(card_options)) \
 				if card.isnumeric() else True:
-			print("Answer must be an integer between 1 and",
+			OUTPUT("Answer must be an integer between 1 and",
 				  f"{len(card_options)} (inclusive). Try again")
 			card = pinput()
 		card = card_options[int(card) - 1]
@@ -176,37 +251,58 @@ def player_redraw_cards(hand, deck):
 		poker_functions.replace_card(card, hand, deck)
 		# Remove the card from the list of options
 		card_options.remove(card)
-	print_action(NAMES[PLAYER_INDEX] + " replaced " + str(card_num) + " card(s)")
-	print("\nHere are your final cards now:")
-	poker_functions.print_hand(hand)
+	print_action(name + " replaced " + str(card_num) + " card(s)")
+	OUTPUT("\nHere are your final cards now:")
+	poker_functions.print_hand(hand, OUTPUT)
 	pause()
 
 
 def cpu_redraw_cards(name, hand, deck):
 	'''
 	The AI for a CPU player to redraw cards
+
+	Doctests:
+>>> import os, subprocess
+>>> subprocess.run([sys.executable, '-c', \
+"import sys, poker_game; print('numpy' in sys.modules)"], capture_output=True, \
+text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+'False'
 	'''
-	bad_cards = poker_functions.choose_bad_cards(hand)
+	if SOLVE_DRAWS:
+		# poker_draw needs numpy, so it's only imported when it's used
+		import poker_draw
+		bad_cards = poker_draw.best_discards(hand)
+	else:
+		bad_cards = poker_functions.choose_bad_cards(hand)
 	for card in bad_cards:
 		# Replace the card in the hand
 		poker_functions.replace_card(card, hand, deck)
 	print_action(name + " replaced " + str(len(bad_cards)) + " card(s)")
 
 
-def redraw_cards(hands, deck):
+def redraw_cards(hands, deck, names, player_index):
 	'''
 	Cycle through each player and let them discard
+
+	Parameters:
+		hands (list[dict{int: list[tuple(int, int)]}]): the hand of each player
+		deck (poker_functions.Deck | list[tuple(int, int)]): the deck to draw
+			new cards from
+		names (list[str]): the name of each player
+		player_index (int): the index of the main player, or None if every
+			player is a CPU
 	'''
 	dealer_says("You may redraw any cards, if necessary.")
 	for this_player in range(len(hands)):
-		if this_player == PLAYER_INDEX:
-			player_redraw_cards(hands[PLAYER_INDEX], deck)
+		if this_player == player_index:
+			player_redraw_cards(names[this_player], hands[this_player], deck)
 		else:
-			cpu_redraw_cards(NAMES[this_player], hands[this_player], deck)
+			cpu_redraw_cards(names[this_player], hands[this_player], deck)
 			pause()
 
 
-def cpu_decisions(money, hands, bet) -> list:
+def cpu_decisions(money, hands, bet, player_is_playing=None, \
+		player_index=None, equity_budget=None) -> list:
 	'''
 	Creates a list of parameters for the decisions each AI could make
 
@@ -214,26 +310,71 @@ def cpu_decisions(money, hands, bet) -> list:
 		money (list[int]): a list containing the betting money for each player
 		hands (list[hand]): a list containing the hand of each player
 		bet (int): the current bet
+		player_is_playing (list[bool]): whether each player is still in the
+			round; every player is if not given
+		player_index (int): the index of the main player, or None if every
+			player is a CPU
+		equity_budget (float): the seconds each CPU can spend estimating its
+			chance of winning (see EQUITY_BUDGET), or None to use the
+			strength of its hand
 	
 	Returns:
 		list[tuple(int, int, int)]: the decision parameters for each AI
 			0: the maximum the bet can be before the AI folds
 			1: the base number for the raise amount the AI can make
 			2: the minimum the bet can be for the AI to call
-			The main player's spot is filled, but can be ignored
+			The main player's spot, and the spots of players that aren't
+			playing, are filled, but can be ignored
+
+	Doctests:
+>>> hands = [{0: [(1, 0), (13, 0)], 1: [(1, 1), (13, 1)], 2: [(1, 2)], 3: []}, \
+{0: [(2, 0)], 1: [(4, 1)], 2: [(7, 2), (9, 2)], 3: [(11, 3)]}]
+>>> with headless_table(2):
+...     cpu_decisions([990, 990], hands, 10)
+[(776, 77, 388), (81, 8, 40)]
+>>> with headless_table(2):
+...     decisions = cpu_decisions([990, 990], hands, 10, equity_budget=0.05)
+>>> decisions[0][0] > 900, decisions[1]
+(True, (0, 0, 0))
+>>> with headless_table(3):
+...     cpu_decisions([990] * 3, hands + [hands[1]], 10, [True, True, False], \
+equity_budget=0.05) == decisions + [(0, 0, 0)]
+True
 	'''
+	# Only the players still in the round can win it
+	if player_is_playing is None:
+		opponents = len(hands) - 1
+	else:
+		opponents = player_is_playing.count(True) - 1
+
 	bet_decisions = []
 	for this_player, hand in enumerate(hands):
-		# This is the best hand in the game, so the value of a hand out of 1 is
-		# based from this
-		royal_flush_value = poker_functions.hand_value({
-			0: [(10, 0), (11, 0), (12, 0), (13, 0), (1, 0)],
-			1: [], 2: [], 3: []
-			})[1]
-		this_hand_value = poker_functions.hand_value(hand)[1]
+		# Players that aren't playing don't bet, so no time is spent on them
+		if player_is_playing is not None and not player_is_playing[this_player]:
+			bet_decisions.append((0, 0, 0))
+			continue
 
-		max_bet = int((this_hand_value / royal_flush_value) * \
-				(money[this_player] + bet))
+		# The main player's spot isn't used, so no time is spent on it
+		if equity_budget is None or this_player == player_index:
+			# The value of the hand out of 1, measured against the best hand
+			strength = poker_functions.hand_value(hand)[1] / ROYAL_FLUSH_VALUE
+		elif opponents == 0:
+			# The pot is won already
+			strength = 1.0
+		else:
+			# The chance of the hand winning against every other player after
+			# they redraw, as good as it can be found in the time
+			equity = poker_equity.cached_equity(hand, opponents,
+				equity_budget, EQUITY_TRIALS, draw=True)['equity']
+			# How much better than an even share of the pot that is, out of 1,
+			# squared so CPUs only bet big on hands that almost always win.
+			# Hands no better than an even share fold
+			strength = max(0.0,
+				(equity * (opponents + 1) - 1) / opponents) ** 2
+
+		max_bet = int(strength * (money[this_player] + bet))
+		if BET_SCALES is not None:
+			max_bet = int(max_bet * BET_SCALES[this_player])
 
 		raise_base = max_bet // 10
 
@@ -259,12 +400,12 @@ def cpu_main_loop(name, money, to_call, bet_decisions, bet) -> tuple:
 		tuple(int, int, bool): the remaining betting money for this CPU, and if
 			the CPU is still playing
 	'''
-	max_bet = bet_decisions[0]
-	raise_amount = bet_decisions[1] + randint(0, 3)
-	min_bet = bet_decisions[2]
+	raise_amount = bet_decisions[1] + RNG.randint(0, 3)
+	action, raise_amount = poker_betting.cpu_action(money, to_call, bet,
+			bet_decisions, raise_amount)
 
 	# If the CPU can't or won't make the call, then fold
-	if to_call > money or bet > max_bet:
+	if action == 'fold':
 		print_action(name + ' folded')
 		return (money, bet, False)
 
@@ -272,7 +413,7 @@ def cpu_main_loop(name, money, to_call, bet_decisions, bet) -> tuple:
 	money -= to_call
 
 	# If the CPU won't raise, then call
-	if bet > min_bet:
+	if action == 'call':
 		print_action(name + ' called the bet')
 		return (money, bet, True)
 
@@ -281,15 +422,16 @@ def cpu_main_loop(name, money, to_call, bet_decisions, bet) -> tuple:
 			money, raise_amount, bet
 		)
 
-	print(f"> {name} raised the bet to ${bet} <")
+	OUTPUT(f"> {name} raised the bet to ${bet} <")
 	return (money, bet, True)
 
 
-def player_main_loop(money, hand, to_call, bet) -> tuple:
+def player_main_loop(name, money, hand, to_call, bet) -> tuple:
 	'''
 	The turn of the main player
 
 	Parameters:
+		name (str): the name of the player
 		money (int): the betting money available to the player
 		hand (hand): the hand of the player
 		to_call (int): the amount the player has to call to
@@ -299,200 +441,379 @@ def player_main_loop(money, hand, to_call, bet) -> tuple:
 		tuple(int, int, bool): the remaining betting money for the player, and
 			if the player is still playing
 	'''
-	print("Current bet:", bet)
-	print("Your available betting money:", money)
-	print("The amount to call to:", to_call)
-	print("Your hand:")
-	poker_functions.print_hand(hand)
-	print()
+	OUTPUT("Current bet:", bet)
+	OUTPUT("Your available betting money:", money)
+	OUTPUT("The amount to call to:", to_call)
+	OUTPUT("Your hand:")
+	poker_functions.print_hand(hand, OUTPUT)
+	OUTPUT()
 
 	if to_call > money:
-		print("You do not have enough money to meet the bet, you are forced", \
+		OUTPUT("You do not have enough money to meet the bet, you are forced", \
 				"to fold.")
-		print_action(NAMES[PLAYER_INDEX] + ' folded')
+		print_action(name + ' folded')
 		return (money, bet, False)
 
-	print("What do you want to do? (fold/call/raise)")
+	OUTPUT("What do you want to do? (fold/call/raise)")
 	choice = pinput()
 	while choice != 'fold' and choice != 'call' and choice != 'raise':
-		print("Answer must be 'fold', 'call', or 'raise'. Please try again")
+		OUTPUT("Answer must be 'fold', 'call', or 'raise'. Please try again")
 		choice = pinput()
 	
-	print()
+	OUTPUT()
 	
 	if choice == 'fold':
-		print_action(NAMES[PLAYER_INDEX] + ' folded')
+		print_action(name + ' folded')
 		return (money, bet, False)
 
 	if choice == 'call':
 		money -= to_call
-		print_action(NAMES[PLAYER_INDEX] + ' called the bet')
+		print_action(name + ' called the bet')
 		return (money, bet, True)
 
 	# Choice was 'raise'
-	print("How much do you want to raise by?")
+	OUTPUT("How much do you want to raise by?")
 	raise_amount = pinput()
 	while (int(raise_amount) < 0 or int(raise_amount) > money) \
 			if raise_amount.isnumeric() else True:
-		print("Answer must be a number between 0 and your betting money.", \
+		OUTPUT("Answer must be a number between 0 and your betting money.", \
 				"Please try again")
 		raise_amount = pinput()
 	raise_amount = int(raise_amount)
 
 	money -= raise_amount
 	bet += raise_amount
-	print_action(f"{NAMES[PLAYER_INDEX]} raised the bet to {bet}")
+	print_action(f"{name} raised the bet to {bet}")
 	return (money, bet, True)
 
 
 def round_main_loop(money, start_money, fold_losses, hands, bet_decisions, \
-		player_is_playing) -> int:
+		player_is_playing, names, player_index, to_call=None) -> int:
 	'''
 	The main loop of a round, where each player can call, raise, or fold
+
+	Parameters:
+		names (list[str]): the name of each player
+		player_index (int): the index of the main player, or None if every
+			player is a CPU
+		to_call (list[int]): the amount each player still has to call to,
+			filled in as the bet changes; a new list is used if not given
 	'''
 	dealer_says("Place your bets!")
 
-	bet = MINIMUM_BET
-
-	# The amount a given player still has to call to
-	to_call = [0] * PLAYER_NUM
-	call_amount = 0
-	this_player = -1
+	# The bet, the amount each player still has to call to, and when the
+	# betting is over are kept track of by the betting round
+	betting = poker_betting.BettingRound(money, start_money, fold_losses,
+			player_is_playing, to_call, MINIMUM_BET)
 
 	# Loop until everyone calls
-	while call_amount < player_is_playing.count(True) - 1:
-
-		this_player += 1
-		# If all players played, loop again
-		if this_player >= PLAYER_NUM:
-			this_player = 0
-
-		if not player_is_playing[this_player]:
-			continue
+	while not betting.is_done():
+		this_player = betting.player
 
-		call_add = 0
-
-		old_bet = bet
 		# Find player action for main player or CPU
-		money[this_player], bet, player_is_playing[this_player] = player_main_loop(
-				money[this_player], hands[this_player], to_call[this_player], bet
-			) if this_player == PLAYER_INDEX else cpu_main_loop(
-				NAMES[this_player], money[this_player], to_call[this_player],
-				bet_decisions[this_player], bet
+		turn = player_main_loop(
+				names[this_player], money[this_player], hands[this_player],
+				betting.to_call[this_player], betting.bet
+			) if this_player == player_index else cpu_main_loop(
+				names[this_player], money[this_player],
+				betting.to_call[this_player], bet_decisions[this_player],
+				betting.bet
 			)
-		if not player_is_playing[this_player]:
-			fold_losses[this_player] = start_money[this_player] - \
-					money[this_player]
-			pause()
-			continue
-		call_add = bet - old_bet
-		if call_add != 0:
-			call_amount = 0
-		else:
-			call_amount += 1
-		# Update the amount each player needs to call to
-		for player_to_call in range(PLAYER_NUM):
-			if player_to_call != this_player:
-				to_call[player_to_call] += call_add
+		betting.end_turn(*turn)
 
-		#print(call_amount)
 		pause()
 	
-	return bet
+	return betting.bet
 
 
-def play_round(money):
+def deal_cards(player_num):
 	'''
-	Plays a round of poker, given the bet money of the 5 players
+	Creates and shuffles a new deck, then deals each player a hand from it
 
 	Parameters:
-		money (list[int]): the betting money available to all players
+		player_num (int): the number of players
+
+	Returns:
+		(tuple(poker_functions.Deck, list[dict{int: list[tuple(int, int)]}])):
+			the deck left after dealing, and the hand of each player
+
+	Doctests:
+>>> with headless_table(3, seed=1):
+...     deck, hands = deal_cards(3)
+>>> len(deck), len(hands), sum(len(suit) for suit in hands[0].values())
+(37, 3, 5)
 	'''
-	print("\n\n---NEW ROUND---\n")
-	start_money = money.copy()
+	dealer_says("Dealing...")
+	# A Deck deals and takes back cards without moving the rest, and can be
+	# saved without copying it (see poker_state.TableState.snapshot)
+	deck = poker_functions.create_deck(as_deck=True)
+	deck = poker_functions.shuffle(deck, RNG)
+	hands = poker_functions.deal_hands(player_num, deck)
+	return (deck, hands)
 
-	# Create and shuffle a new deck
-	deck = poker_functions.create_deck()
-	deck = poker_functions.shuffle(deck)
+
+def play_round(money) -> list:
+	'''
+	Plays a round of poker, given the bet money of the 5 players
+
+	Parameters:
+		money (list[int] | poker_state.TableState): the betting money
+			available to all players, or a table to play the round on, which
+			is left the way the round ended
+
+	Returns:
+		list[int]: the players who won the round
+
+	Doctests:
+>>> with headless_table(3, seed=1):
+...     money = [1000] * 3
+...     winners = play_round(money)
+>>> with headless_table(3, seed=1):
+...     table = poker_state.TableState([1000] * 3, NAMES)
+...     play_round(table) == winners, table.money == money
+(True, True)
+>>> len(table.hands), len(table.bet_decisions), len(table.deck)
+(3, 3, 37)
+>>> lines = []
+>>> with headless_table(2, seed=1, output=lambda *args, **kwargs: \
+lines.append(args)):
+...     _ = play_round(poker_state.TableState([1000] * 2, ['Ann', 'Bob']))
+>>> ('>', 'Bob met the minimum bet', '<') in lines
+True
+	'''
+	if isinstance(money, poker_state.TableState):
+		table = money
+		table.new_round()
+	else:
+		table = poker_state.TableState(money, NAMES, PLAYER_INDEX)
+	money = table.money
+	names = table.names
+	player_index = table.player_index
+
+	OUTPUT("\n\n---NEW ROUND---\n")
+	start_money = table.start_money
 
 	# Ante up
 	# A minimum bet is made, and all players must meet it
 	# The check for if a player CAN make the bet has already been made
-	ante_up(money)
+	ante_up(money, names)
 	bet = MINIMUM_BET
+	table.bet = bet
 	
-	# Deal hands
-	dealer_says("Dealing...")
-	hands = poker_functions.deal_hands(PLAYER_NUM, deck)
+	# Create and shuffle a new deck, and deal hands
+	deck, hands = deal_cards(len(money))
+	table.deck = deck
+	table.hands[:] = hands
 
 	# Print the player's hand
-	print("Your hand:")
-	poker_functions.print_hand(hands[PLAYER_INDEX])
-	pause()
+	if player_index is not None:
+		OUTPUT("Your hand:")
+		poker_functions.print_hand(hands[player_index], OUTPUT)
+		pause()
 
 	# Redraw cards
-	redraw_cards(hands, deck)
+	redraw_cards(hands, deck, names, player_index)
+
+	# The status of each player
+	player_is_playing = table.is_playing
 
 	# A list of tuples containing:
 	#	the max bet for a player
 	#	the amount they're willing to raise per turn
 	#	the minimum they're willing to bet
 	# (actual game player's isn't counted)
-	bet_decisions = cpu_decisions(money, hands, bet)
+	bet_decisions = cpu_decisions(money, hands, bet, player_is_playing,
+			player_index, EQUITY_BUDGET)
+	table.bet_decisions[:] = bet_decisions
 
 	# Main loop
-	# The status of each player
-	player_is_playing = [True] * PLAYER_NUM
-	fold_losses = [0] * PLAYER_NUM
+	fold_losses = table.fold_losses
 	bet = round_main_loop(money, start_money, fold_losses, hands, \
-			bet_decisions, player_is_playing)
+			bet_decisions, player_is_playing, names, player_index, table.to_call)
+	table.bet = bet
 
 	# Find the winner
 	dealer_says("The results are...")
 	pause()
+	playing_players = []
 	playing_hands = []
 	playing_names = []
 	for player, hand in enumerate(hands):
 		if player_is_playing[player]:
+			playing_players.append(player)
 			playing_hands.append(hand)
-			playing_names.append(NAMES[player])
-	winner = poker_functions.compare_hands(playing_hands, playing_names)
+			playing_names.append(names[player])
+	ranking = poker_functions.compare_hands(playing_hands, playing_names,
+			OUTPUT)
 	winner_money = player_is_playing.count(True) * bet + sum(fold_losses)
 	pause()
-	print("\nThe winning hand:")
-	poker_functions.print_hand(hands[winner])
-	print("The winner's earnings:", winner_money)
-	money[winner] += winner_money
-	pause()
-	print("\nYour loss:", bet if player_is_playing[PLAYER_INDEX] \
-			else fold_losses[PLAYER_INDEX])
-	pause()
+
+	# Tied winners split the pot, and the first winner gets what's left over
+	winners = []
+	share = winner_money // len(ranking[0])
+	for place, playing_index in enumerate(ranking[0]):
+		winner = playing_players[playing_index]
+		winners.append(winner)
+		earnings = share
+		if place == 0:
+			earnings += winner_money - share * len(ranking[0])
+		OUTPUT("\nThe winning hand:")
+		poker_functions.print_hand(hands[winner], OUTPUT)
+		OUTPUT("The winner's earnings:", earnings)
+		money[winner] += earnings
+		pause()
+	if player_index is not None:
+		OUTPUT("\nYour loss:", bet if player_is_playing[player_index] \
+				else fold_losses[player_index])
+		pause()
+	return winners
+
+
+def reset_broke_players(money) -> int:
+	'''
+	Gives every CPU that can't meet the minimum bet their starting money again
+
+	Parameters:
+		money (list[int]): the betting money available to all players
+
+	Returns:
+		int: the number of CPUs that were reset
+
+	Doctests:
+>>> money = [5, 1000, 0, 20, 9]
+>>> reset_broke_players(money), money
+(2, [1000, 1000, 0, 20, 1000])
+	'''
+	reset_num = 0
+	for this_player in range(PLAYER_NUM):
+		# The main player has to leave instead (see main)
+		if this_player == PLAYER_INDEX:
+			continue
+		if money[this_player] < MINIMUM_BET:
+			money[this_player] = STARTING_MONEY
+			reset_num += 1
+	return reset_num
+
+
+@contextmanager
+def headless_table(player_num: int = PLAYER_NUM, seed=None,
+		output=null_output, rng=None):
+	'''
+	Sets up the table for CPUs only, without waiting for anyone, and puts the
+	table settings back afterwards
+
+	Parameters:
+		player_num (int): the number of CPUs at the table
+		seed: the seed for the random number generator, for repeatable games
+		output (callable): where to print to, like print; defaults to
+			null_output, which prints nothing
+		rng (random.Random): the random number generator to use, instead of
+			a new one from the seed, for tables that play on over many calls
+
+	Doctests:
+>>> import poker_game
+>>> with headless_table(3, seed=1):
+...     poker_game.NAMES, poker_game.PAUSES
+(['CPU1', 'CPU2', 'CPU3'], False)
+>>> len(poker_game.NAMES), poker_game.PAUSES
+(5, True)
+	'''
+	global PLAYER_NUM, PLAYER_INDEX, NAMES, OUTPUT, PAUSES, RNG, BET_SCALES
+
+	# Remember the table settings to put them back afterwards
+	saved_settings = (PLAYER_NUM, PLAYER_INDEX, NAMES, OUTPUT, PAUSES, RNG,
+			BET_SCALES)
+	try:
+		PLAYER_NUM = player_num
+		PLAYER_INDEX = None
+		NAMES = make_names('')
+		OUTPUT = output
+		PAUSES = False
+		RNG = random.Random(seed) if rng is None else rng
+		BET_SCALES = None
+		yield
+	finally:
+		PLAYER_NUM, PLAYER_INDEX, NAMES, OUTPUT, PAUSES, RNG, BET_SCALES = \
+				saved_settings
+
+
+def play_headless_rounds(round_num: int, player_num: int = PLAYER_NUM,
+		seed=None, output=null_output) -> dict:
+	'''
+	Plays rounds between CPUs only, without waiting for anyone. Every round is
+	played by the same functions as a normal game
+
+	Parameters:
+		round_num (int): the number of rounds to play
+		player_num (int): the number of CPUs at the table
+		seed: the seed for the random number generator, for repeatable games
+		output (callable): where to print to, like print; defaults to
+			null_output, which prints nothing
+
+	Returns:
+		dict: the results, with:
+			money: the betting money each CPU ended with
+			wins: the number of rounds each CPU won (a split pot counts as a
+				win for every winner)
+			resets: the number of times each CPU ran out of money and was
+				given their starting money again
+			rounds: the number of rounds played
+			seconds: how long it took
+
+	Doctests:
+>>> results = play_headless_rounds(50, seed=1)
+>>> results['money'] == play_headless_rounds(50, seed=1)['money']
+True
+>>> results['rounds'], len(results['money'])
+(50, 5)
+>>> sum(results['wins']) >= 50
+True
+	'''
+	start_time = perf_counter()
+	money = [STARTING_MONEY] * player_num
+	wins = [0] * player_num
+	resets = [0] * player_num
+	with headless_table(player_num, seed, output):
+		for _ in range(round_num):
+			# Same as the main game loop
+			for this_player in range(player_num):
+				if money[this_player] < MINIMUM_BET:
+					resets[this_player] += 1
+			reset_broke_players(money)
+
+			for winner in play_round(money):
+				wins[winner] += 1
+
+	return { 'money': money, 'wins': wins, 'resets': resets,
+		'rounds': round_num, 'seconds': perf_counter() - start_time }
 
 
 def main():
+	global NAMES
+
+	OUTPUT("What's your name?")
+	NAMES = make_names(pinput())
 
 	money = [STARTING_MONEY] * PLAYER_NUM
 	# Welcome
-	print(WELCOME_TEXT.format(NAMES[PLAYER_INDEX]))
+	OUTPUT(WELCOME_TEXT.format(NAMES[PLAYER_INDEX]))
 	pause()
 
 	# Game loop
 	while(True):
 		if money[PLAYER_INDEX] < MINIMUM_BET:
-			print("Get outta here, you don't have enough cash!")
+			OUTPUT("Get outta here, you don't have enough cash!")
 			quit()
-		for this_player in range(PLAYER_NUM):
-			if money[this_player] < MINIMUM_BET:
-				money[this_player] = STARTING_MONEY
+		reset_broke_players(money)
 		# Print the menu
-		print(MENU_TEXT.format(money[PLAYER_INDEX]))
+		OUTPUT(MENU_TEXT.format(money[PLAYER_INDEX]))
 
 		# Get the player's choice
 		choice = pinput()
 		# Check if the choice is valid
 		while (int(choice) < 1 or int(choice) > 3) \
 				if choice.isnumeric() else True:
-			print('Choice is invalid. Please try inputting something else')
+			OUTPUT('Choice is invalid. Please try inputting something else')
 			choice = pinput()
 
 		choice = int(choice)
@@ -503,7 +824,7 @@ def main():
 
 		# Check rules
 		if choice == 2:
-			print(RULES_TEXT)
+			OUTPUT(RULES_TEXT)
 			pause()
 		
 		# Quit
@@ -511,10 +832,15 @@ def main():
 			break
 
 	# Quit text
-	print(CLOSING_TEXT)
+	OUTPUT(CLOSING_TEXT)
 	pause()
 
 
+# Turn on profiling if it was asked for (see poker_profile), counting this
+# module even when it's run as the main program
+poker_profile.enable_from_env({ 'poker_game': sys.modules[__name__] })
+
+
 # Main program entry
 if __name__ == '__main__':
 	main()
@@ -0,0 +1,348 @@
+'''
+Plays many bots against poker_server at once, to see how many players a
+server can keep up with
+
+Every bot connects like a player would, joins a table with some other bots,
+and plays every round: it replaces the cards poker_functions.choose_bad_cards
+picks and folds, calls or raises at random, each after thinking for a
+random time. The time from every answer a bot sends until the server sends
+it something back is recorded, along with the number of answers and rounds
+played. By default a server is started on loopback just for the test:
+
+	python poker_loadtest.py --bots 2000 --duration 60 --output soak.json
+	python poker_loadtest.py --bots 2000 --duration 60 --baseline soak.json
+
+The results are laid out like poker_benchmark's, so they can be compared
+against a saved run the same way
+'''
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from time import perf_counter
+
+import poker_benchmark
+import poker_functions
+import poker_server
+
+
+# The version of the JSON results, changed if its layout ever changes
+RESULTS_VERSION = 1
+
+# The chance of each bet a bot makes, and the most it raises by
+ACTION_WEIGHTS = { 'fold': 1, 'call': 6, 'raise': 2 }
+MAX_RAISE = 20
+
+
+class BotStats:
+	'''
+	What every bot has done so far
+	'''
+
+	def __init__(self):
+		self.latencies = []
+		self.answers = 0
+		self.rounds = 0
+		self.errors = 0
+		self.connections = 0
+		self.disconnects = 0
+
+
+def to_hand(cards: list) -> dict:
+	'''
+	Turns the cards in a message into a hand
+
+	Parameters:
+		cards (list[list[int]]): every card as [rank, suit]
+
+	Returns:
+		(dict{int: list[tuple(int, int)]}): the hand
+
+	Doctests:
+>>> to_hand([[1, 0], [5, 2]])
+{0: [(1, 0)], 1: [], 2: [(5, 2)], 3: []}
+	'''
+	hand = { suit: [] for suit in poker_functions.suits }
+	for rank, suit in cards:
+		hand[suit].append((rank, suit))
+	return hand
+
+
+def choose_answer(question: dict, rng: random.Random) -> dict:
+	'''
+	Picks a bot's answer to a question from the server
+
+	Parameters:
+		question (dict): a redraw or turn message
+		rng (random.Random): the random number generator to pick with
+
+	Returns:
+		(dict): the answer
+
+	Doctests:
+>>> choose_answer({'type': 'redraw', 'id': 1, 'hand': [[1, 0], [9, 0], \
+[1, 1], [5, 2], [7, 3]]}, random.Random(1))
+{'type': 'redraw', 'id': 1, 'cards': [[9, 0], [5, 2], [7, 3]]}
+	'''
+	if question['type'] == 'redraw':
+		bad_cards = poker_functions.choose_bad_cards(to_hand(question['hand']))
+		return { 'type': 'redraw', 'id': question['id'],
+			'cards': [list(card) for card in bad_cards] }
+
+	action = rng.choices(list(ACTION_WEIGHTS),
+		list(ACTION_WEIGHTS.values()))[0]
+	amount = rng.randint(1, MAX_RAISE)
+	# Only raise by what the bot can afford
+	if action == 'raise' and amount > question['money']:
+		action = 'call'
+	return { 'type': 'turn', 'id': question['id'], 'action': action,
+		'amount': amount }
+
+
+async def run_bot(address: tuple, name: str, table_id: str, start: float,
+		deadline: float, think: float, stats: BotStats, seed):
+	'''
+	Plays as one bot until the deadline, connecting again if the server
+	sends it away
+
+	Parameters:
+		address (tuple(str, int)): the server's host and port
+		name (str): the bot's name
+		table_id (str): the table to join
+		start (float): when to connect, from perf_counter
+		deadline (float): when to stop, from perf_counter
+		think (float): the average seconds the bot thinks before answering
+		stats (BotStats): where to record what the bot does
+		seed: the seed for the bot's random number generator
+	'''
+	rng = random.Random(seed)
+	await asyncio.sleep(max(0.0, start - perf_counter()))
+	while perf_counter() < deadline:
+		try:
+			reader, writer = await asyncio.open_connection(*address,
+					limit=1 << 16)
+		except OSError:
+			stats.errors += 1
+			await asyncio.sleep(0.1)
+			continue
+		stats.connections += 1
+		writer.write(poker_server.encode({ 'type': 'join', 'name': name,
+			'table': table_id }))
+
+		sent_time = None
+		try:
+			while True:
+				line = await asyncio.wait_for(reader.readline(),
+						max(0.0, deadline - perf_counter()))
+				if not line:
+					stats.disconnects += 1
+					break
+				now = perf_counter()
+				if sent_time is not None:
+					stats.latencies.append(now - sent_time)
+					sent_time = None
+
+				message = poker_server.decode(line)
+				if message['type'] == 'showdown':
+					stats.rounds += 1
+				elif message['type'] == 'error':
+					stats.errors += 1
+				elif message['type'] in ('redraw', 'turn'):
+					if think > 0:
+						await asyncio.sleep(rng.expovariate(1 / think))
+					writer.write(poker_server.encode(
+						choose_answer(message, rng)))
+					sent_time = perf_counter()
+					stats.answers += 1
+		except asyncio.TimeoutError:
+			# Time is up
+			writer.write(poker_server.encode({ 'type': 'leave' }))
+		except (ConnectionError, ValueError):
+			stats.errors += 1
+		finally:
+			writer.close()
+
+
+def latency_histogram(latencies: list) -> dict:
+	'''
+	Counts the latencies in buckets that double in size
+
+	Parameters:
+		latencies (list[float]): latencies in seconds
+
+	Returns:
+		(dict{str: int}): the number of latencies up to each number of
+			microseconds, from 1 up, for every bucket that isn't empty
+
+	Doctests:
+>>> latency_histogram([0.0000005, 0.000003, 0.000004, 0.1])
+{'1': 1, '4': 2, '131072': 1}
+	'''
+	counts = {}
+	for latency in latencies:
+		bucket = 1
+		while bucket < latency * 1e6:
+			bucket *= 2
+		counts[bucket] = counts.get(bucket, 0) + 1
+	return { str(bucket): counts[bucket] for bucket in sorted(counts) }
+
+
+async def start_server(timeout: float):
+	'''
+	Starts a server on loopback in its own process, so the bots and the
+	server don't share a processor
+
+	Parameters:
+		timeout (float): the seconds the server waits for each answer
+
+	Returns:
+		(tuple(asyncio.subprocess.Process, tuple(str, int))): the server's
+			process, and its host and port
+	'''
+	path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+		'poker_server.py')
+	process = await asyncio.create_subprocess_exec(sys.executable, path,
+		'--port', '0', '--timeout', str(timeout),
+		stdout=asyncio.subprocess.PIPE)
+	line = (await process.stdout.readline()).decode()
+	if not line.startswith('Listening on '):
+		process.kill()
+		raise RuntimeError("the server didn't start")
+	host, port = line.split()[-1].rsplit(':', 1)
+	return (process, (host, int(port)))
+
+
+async def run_soak(bots: int = 100, duration: float = 10.0,
+		per_table: int = 2, think: float = 0.0, ramp: float = 1.0,
+		address: tuple = None, timeout: float = 5.0, seed: int = 0) -> dict:
+	'''
+	Plays bots against a server for some time
+
+	Parameters:
+		bots (int): the number of bots
+		duration (float): the seconds to play for, after every bot has
+			started
+		per_table (int): the number of bots at each table
+		think (float): the average seconds a bot thinks before answering
+		ramp (float): the seconds over which the bots connect, so the server
+			isn't sent every connection at once
+		address (tuple(str, int)): the server to play against; a server is
+			started on loopback if not given
+		timeout (float): the seconds the started server waits for answers
+		seed: the seed for the bots
+
+	Returns:
+		(dict): the results, like poker_benchmark.run_benchmarks, with:
+			benchmarks: 'answers', the answers sent per second and the 50th
+				and 99th percentile of the time until the server answered
+				back, and 'rounds', the rounds played per second by every bot
+			latency_histogram: the latencies (see latency_histogram)
+			errors, connections, disconnects: the number of each
+
+	Doctests:
+>>> results = asyncio.run(run_soak(bots=4, duration=1.0, ramp=0.1))
+>>> results['benchmarks']['rounds']['calls'] > 0, results['errors']
+(True, 0)
+	'''
+	process = None
+	if address is None:
+		process, address = await start_server(timeout)
+
+	stats = BotStats()
+	start_time = perf_counter()
+	deadline = start_time + ramp + duration
+	try:
+		await asyncio.gather(*(run_bot(address, f"bot{bot}",
+			f"load{bot // per_table}", start_time + ramp * bot / bots,
+			deadline, think, stats, f"{seed}-{bot}") for bot in range(bots)))
+	finally:
+		if process is not None:
+			process.terminate()
+			await process.wait()
+	seconds = perf_counter() - start_time
+
+	latencies = sorted(stats.latencies)
+	answers = { 'calls': stats.answers,
+		'ops_per_sec': stats.answers / seconds }
+	if latencies:
+		answers['p50_ns'] = poker_benchmark.percentile(latencies, 0.5) * 1e9
+		answers['p99_ns'] = poker_benchmark.percentile(latencies, 0.99) * 1e9
+
+	return { 'version': RESULTS_VERSION,
+		'settings': { 'bots': bots, 'duration': duration,
+			'per_table': per_table, 'think': think, 'seed': seed },
+		'seconds': seconds,
+		'benchmarks': { 'answers': answers,
+			'rounds': { 'calls': stats.rounds,
+				'ops_per_sec': stats.rounds / seconds } },
+		'latency_histogram': latency_histogram(latencies),
+		'errors': stats.errors, 'connections': stats.connections,
+		'disconnects': stats.disconnects }
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+	parser.add_argument('--bots', type=int, default=100,
+			help='number of bots')
+	parser.add_argument('--duration', type=float, default=10.0,
+			help='seconds to play for')
+	parser.add_argument('--per-table', type=int, default=2,
+			help='number of bots at each table')
+	parser.add_argument('--think', type=float, default=0.0,
+			help='average seconds a bot thinks before answering')
+	parser.add_argument('--ramp', type=float, default=1.0,
+			help='seconds over which the bots connect')
+	parser.add_argument('--connect',
+			help='host:port of a running server (default: start one)')
+	parser.add_argument('--seed', type=int, default=0, help='seed for the bots')
+	parser.add_argument('--output', help='save the results as JSON here')
+	parser.add_argument('--baseline', help='JSON results to compare against')
+	parser.add_argument('--threshold', type=float,
+			default=poker_benchmark.DEFAULT_THRESHOLD,
+			help='how much slower than the baseline counts as a regression')
+	args = parser.parse_args()
+
+	address = None
+	if args.connect:
+		host, port = args.connect.rsplit(':', 1)
+		address = (host, int(port))
+
+	results = asyncio.run(run_soak(args.bots, args.duration, args.per_table,
+		args.think, args.ramp, address, seed=args.seed))
+
+	answers = results['benchmarks']['answers']
+	rounds = results['benchmarks']['rounds']
+	print(f"{args.bots} bots for {results['seconds']:.1f}s")
+	print(f"Answers: {answers['calls']:,} ({answers['ops_per_sec']:,.0f}/s)")
+	if 'p50_ns' in answers:
+		print(f"Latency: {answers['p50_ns'] / 1e6:.2f} ms p50, " +
+				f"{answers['p99_ns'] / 1e6:.2f} ms p99")
+	print(f"Rounds: {rounds['calls']:,} ({rounds['ops_per_sec']:,.0f}/s)")
+	print(f"Errors: {results['errors']}, connections: " +
+			f"{results['connections']}, disconnects: {results['disconnects']}")
+	print("Latency histogram (up to microseconds: count):")
+	for bucket, count in results['latency_histogram'].items():
+		print(f"{int(bucket):>10}: {count}")
+
+	if args.output:
+		with open(args.output, 'w') as file:
+			json.dump(results, file, indent=2)
+
+	if args.baseline:
+		with open(args.baseline) as file:
+			baseline = json.load(file)
+		regressions = poker_benchmark.compare_results(results, baseline,
+				args.threshold)
+		for name, loss in regressions:
+			print(f"{name} is {loss:.1%} slower than the baseline")
+		if regressions:
+			raise SystemExit(1)
+		print("No regressions")
+
+
+# Main program entry
+if __name__ == '__main__':
+	main()
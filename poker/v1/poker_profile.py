@@ -0,0 +1,261 @@
+'''
+Counts the calls to the evaluators and deck functions in poker_functions and
+to each phase of a round in poker_game, and how long they take
+
+Profiling is off until it's turned on, either by calling enable or by
+setting the POKER_PROFILE environment variable before poker_game is
+imported:
+
+	POKER_PROFILE=1 POKER_PROFILE_LOG=5 python poker_game.py
+
+Turning it on swaps each function in its module for a copy that counts its
+calls and times them, and turning it off puts the functions back, so while
+it's off nothing is slowed down at all. Only calls made through the module
+are counted, like poker_functions.hand_value(hand) or a call from inside the
+module; a function that was saved somewhere else before profiling was turned
+on (like from poker_functions import hand_value) is not. Times include the
+time spent in any other counted functions called inside, so compare_hands
+includes its calls to hand_value
+'''
+
+from contextlib import contextmanager
+from functools import wraps
+import os
+import sys
+from time import perf_counter
+
+import poker_functions
+
+
+# The environment variables that turn profiling on, and that set the number
+# of seconds between log lines
+ENABLE_VARIABLE = 'POKER_PROFILE'
+LOG_VARIABLE = 'POKER_PROFILE_LOG'
+
+# The functions counted, by module, then by name
+TARGETS = {
+	'poker_functions': ( 'create_deck', 'shuffle', 'deal', 'deal_hands',
+		'put_bottom', 'replace_card', 'replace_card_mask', 'hand_ranks',
+		'hand_lookup', 'hand_value', 'find_hand_rank', 'rank_hands',
+		'compare_hands', 'choose_bad_cards' ),
+	'poker_game': ( 'play_round', 'ante_up', 'deal_cards', 'redraw_cards',
+		'cpu_decisions', 'round_main_loop', 'cpu_main_loop',
+		'player_main_loop' ),
+}
+
+# The phases of a round, and the functions that make up each one. The deal
+# is counted through poker_game.deal_cards, which also creates and shuffles
+# the deck, since deal_hands is called by the simulators too (see
+# poker_equity). Every turn of the betting loop calls one of cpu_main_loop or
+# player_main_loop, so their calls are the number of turns
+PHASES = {
+	'ante': ( 'poker_game.ante_up', ),
+	'deal': ( 'poker_game.deal_cards', ),
+	'redraw': ( 'poker_game.redraw_cards', ),
+	'betting': ( 'poker_game.round_main_loop', ),
+	'betting_turns': ( 'poker_game.cpu_main_loop',
+		'poker_game.player_main_loop' ),
+	'showdown': ( 'poker_functions.compare_hands', ),
+}
+
+# The number of calls and the seconds spent in each function, by
+# module.function, and the function each profiled copy replaced
+counters = {}
+originals = {}
+
+# Where log lines are printed, the seconds between them, and when the next
+# one is due (None if they're off)
+log_output = print
+log_interval = None
+next_log = None
+
+
+def profiled_copy(name: str, function):
+	'''
+	Makes a copy of a function that counts its calls and times them
+
+	Parameters:
+		name (str): the name the function is counted under
+		function (callable): the function to count
+
+	Returns:
+		(callable): the counting copy
+	'''
+	counter = counters.setdefault(name, [0, 0.0])
+
+	@wraps(function)
+	def profiled(*args, **kwargs):
+		start_time = perf_counter()
+		try:
+			return function(*args, **kwargs)
+		finally:
+			end_time = perf_counter()
+			counter[0] += 1
+			counter[1] += end_time - start_time
+			if next_log is not None and end_time >= next_log:
+				log_snapshot(end_time)
+	return profiled
+
+
+def enable(interval: float = None, output=print, modules: dict = None):
+	'''
+	Turns profiling on, if it isn't already
+
+	Parameters:
+		interval (float): the seconds between log lines of every counter; no
+			log lines are printed if not given
+		output (callable): where to print log lines to, like print
+		modules (dict{str: module}): modules to use instead of the imported
+			ones, by name, like a module that's being run as the main program
+	'''
+	global log_output, log_interval, next_log
+
+	log_output = output
+	log_interval = interval
+	next_log = None if interval is None else perf_counter() + interval
+	if originals:
+		return
+
+	for module_name, function_names in TARGETS.items():
+		# A module that hasn't been imported isn't being used, so it's skipped
+		module = (modules or {}).get(module_name, sys.modules.get(module_name))
+		if module is None:
+			continue
+		for function_name in function_names:
+			name = f"{module_name}.{function_name}"
+			function = getattr(module, function_name)
+			originals[name] = (module, function)
+			setattr(module, function_name, profiled_copy(name, function))
+
+
+def disable():
+	'''
+	Turns profiling off and puts every function back. The counters are kept
+	until reset is called
+	'''
+	global next_log
+
+	for name, (module, function) in originals.items():
+		setattr(module, name.split('.')[1], function)
+	originals.clear()
+	next_log = None
+
+
+def is_enabled() -> bool:
+	'''
+	Checks whether profiling is on
+
+	Returns:
+		(bool): True if profiling is on
+	'''
+	return bool(originals)
+
+
+def reset():
+	'''
+	Sets every counter back to 0
+	'''
+	for counter in counters.values():
+		counter[0] = 0
+		counter[1] = 0.0
+
+
+def snapshot() -> dict:
+	'''
+	Gets the counters so far
+
+	Returns:
+		(dict): with:
+			functions: the calls and seconds of every function called so far,
+				by module.function
+			phases: the calls and seconds of each phase of a round (see
+				PHASES)
+
+	Doctests:
+>>> reset()
+>>> with profiling():
+...     _ = poker_functions.hand_value( \
+{0: [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)], 1: [], 2: [], 3: []})
+>>> snapshot()['functions']['poker_functions.hand_value']['calls']
+1
+>>> is_enabled(), poker_functions.hand_value.__name__
+(False, 'hand_value')
+	'''
+	functions = { name: { 'calls': calls, 'seconds': seconds }
+		for name, (calls, seconds) in counters.items() if calls }
+	phases = {}
+	for phase, names in PHASES.items():
+		phases[phase] = { 'calls': 0, 'seconds': 0.0 }
+		for name in names:
+			calls, seconds = counters.get(name, (0, 0.0))
+			phases[phase]['calls'] += calls
+			phases[phase]['seconds'] += seconds
+	return { 'functions': functions, 'phases': phases }
+
+
+def log_snapshot(now: float = None):
+	'''
+	Prints a log line of every phase and function that has been called
+
+	Parameters:
+		now (float): the time from perf_counter, if it's already known
+	'''
+	global next_log
+
+	if now is None:
+		now = perf_counter()
+	if log_interval is not None:
+		next_log = now + log_interval
+
+	current = snapshot()
+	parts = [f"{name}={counts['calls']}/{counts['seconds']:.3f}s"
+		for group in ('phases', 'functions')
+		for name, counts in current[group].items() if counts['calls']]
+	log_output("[profile] " + " ".join(parts))
+
+
+@contextmanager
+def profiling(interval: float = None, output=print):
+	'''
+	Turns profiling on, then back off afterwards if it was off before
+
+	Parameters:
+		interval (float): the seconds between log lines (see enable)
+		output (callable): where to print log lines to, like print
+
+	Doctests:
+>>> import poker_game
+>>> reset()
+>>> import poker_equity
+>>> with profiling():
+...     _ = poker_game.play_headless_rounds(3, seed=1)
+...     _ = poker_equity.simulate_batch(1, 1, 0, 10, 'doctest')
+>>> phases = snapshot()['phases']
+>>> phases['ante']['calls'], phases['deal']['calls'], phases['showdown']['calls']
+(3, 3, 3)
+>>> phases['betting_turns']['calls'] >= 3 * 4
+True
+	'''
+	was_enabled = is_enabled()
+	enable(interval, output)
+	try:
+		yield
+	finally:
+		if not was_enabled:
+			disable()
+
+
+def enable_from_env(modules: dict = None):
+	'''
+	Turns profiling on if the POKER_PROFILE environment variable is set to
+	anything but 0 or nothing, with log lines every POKER_PROFILE_LOG
+	seconds if that's set
+
+	Parameters:
+		modules (dict{str: module}): modules to use instead of the imported
+			ones, by name (see enable)
+	'''
+	if os.environ.get(ENABLE_VARIABLE, '0') in ('', '0'):
+		return
+	interval = os.environ.get(LOG_VARIABLE)
+	enable(float(interval) if interval else None, modules=modules)
@@ -0,0 +1,242 @@
+'''
+Picks hands of a given hand rank, every hand of that rank being as likely as
+any other
+
+Every hand rank is made of a few choices, like the rank of the pair, the
+ranks of the other cards, and the suits of each, and the number of ways to
+make each choice multiply together into the number of hands of that rank
+(see poker_enumerate.EXPECTED_COUNTS). So every hand of a rank has a number,
+and the choices can be worked back out of it, the same way
+poker_enumerate.unrank_hands works back the cards of a hand. Picking a
+random number and working out its hand picks every hand equally often,
+unlike the generators in poker_hand_generator, which can make hands of
+another rank and can't make a hand with no pair at all
+'''
+
+from itertools import combinations
+
+import numpy as np
+
+import poker_enumerate
+
+
+# The number of hands of each hand rank, by hand rank
+CATEGORY_COUNTS = poker_enumerate.EXPECTED_COUNTS
+
+# Ranks here are rank - 1, the same as code % 13, so the ace is 0
+# The ranks of each straight, from the lowest (with the ace low) to the
+# highest (with the ace high)
+straight_ranks = np.array([[(low + step) % 13 for step in range(5)]
+	for low in range(10)], dtype=np.int64)
+
+# Every group of 5 different ranks that isn't a straight
+plain_rank_sets = np.array([ranks for ranks in combinations(range(13), 5)
+	if sorted(ranks) not in map(sorted, straight_ranks.tolist())],
+	dtype=np.int64)
+
+# Every way to give 5 cards suits that aren't all the same, as base 4
+# digits from the first card to the last
+suit_patterns = np.array([[pattern >> (2 * (4 - card)) & 3
+		for card in range(5)]
+	for pattern in range(4 ** 5) if pattern % 341 != 0], dtype=np.int64)
+
+# Every way to pick 2 or 3 of the 4 suits
+suit_pairs = np.array(list(combinations(range(4), 2)), dtype=np.int64)
+suit_triples = np.array(list(combinations(range(4), 3)), dtype=np.int64)
+
+# Every pair of different ranks, and the 11 other ranks of each pair
+rank_pairs = np.array(list(combinations(range(13), 2)), dtype=np.int64)
+pair_others = np.array([[rank for rank in range(13) if rank not in pair]
+	for pair in rank_pairs.tolist()], dtype=np.int64)
+
+# The 12 other ranks of each rank, and every way to pick 2 or 3 of them
+rank_others = np.array([[other for other in range(13) if other != rank]
+	for rank in range(13)], dtype=np.int64)
+other_pairs = np.array(list(combinations(range(12), 2)), dtype=np.int64)
+other_triples = np.array(list(combinations(range(12), 3)), dtype=np.int64)
+
+
+def unrank_category(category: int, indices) -> np.ndarray:
+	'''
+	Finds the hands of a hand rank with the given numbers
+
+	Parameters:
+		category (int): the hand rank, from 0 (high card) to 8 (straight
+			flush)
+		indices (ndarray): numbers from 0 to the number of hands of that
+			rank (see CATEGORY_COUNTS), one for each hand
+
+	Returns:
+		(ndarray): an (N, 5) array of card codes, one hand per row, lowest
+			code first
+
+	Doctests:
+>>> unrank_category(8, [0, 39])
+array([[ 0,  1,  2,  3,  4],
+       [39, 48, 49, 50, 51]], dtype=int8)
+
+>>> unrank_category(7, [0])
+array([[ 0,  1, 13, 26, 39]], dtype=int8)
+	'''
+	if not 0 <= category < len(CATEGORY_COUNTS):
+		raise ValueError(f"there is no hand rank {category}")
+	indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+	if ((indices < 0) | (indices >= CATEGORY_COUNTS[category])).any():
+		raise ValueError(f"numbers must be from 0 to " +
+				f"{CATEGORY_COUNTS[category] - 1} for hand rank {category}")
+	ranks = np.empty((len(indices), 5), dtype=np.int64)
+	suits = np.empty((len(indices), 5), dtype=np.int64)
+
+	# Straight flush: which straight, and its suit
+	if category == 8:
+		straight, suit = np.divmod(indices, 4)
+		ranks[:] = straight_ranks[straight]
+		suits[:] = suit[:, None]
+
+	# Four of a kind: the rank of the four, then the rank and suit of the
+	# other card
+	elif category == 7:
+		four, rest = np.divmod(indices, 12 * 4)
+		other, other_suit = np.divmod(rest, 4)
+		ranks[:, :4] = four[:, None]
+		ranks[:, 4] = rank_others[four, other]
+		suits[:, :4] = np.arange(4)
+		suits[:, 4] = other_suit
+
+	# Full house: the ranks of the three and the two, then which suits each
+	# has
+	elif category == 6:
+		three, rest = np.divmod(indices, 12 * 4 * 6)
+		two, rest = np.divmod(rest, 4 * 6)
+		three_suits, two_suits = np.divmod(rest, 6)
+		ranks[:, :3] = three[:, None]
+		ranks[:, 3:] = rank_others[three, two][:, None]
+		suits[:, :3] = suit_triples[three_suits]
+		suits[:, 3:] = suit_pairs[two_suits]
+
+	# Flush: the suit, and 5 ranks that aren't a straight
+	elif category == 5:
+		suit, rank_set = np.divmod(indices, len(plain_rank_sets))
+		ranks[:] = plain_rank_sets[rank_set]
+		suits[:] = suit[:, None]
+
+	# Straight: which straight, and suits that aren't all the same
+	elif category == 4:
+		straight, pattern = np.divmod(indices, len(suit_patterns))
+		ranks[:] = straight_ranks[straight]
+		suits[:] = suit_patterns[pattern]
+
+	# Three of a kind: the rank of the three, the ranks of the other two,
+	# then the suits of the three and of each other card
+	elif category == 3:
+		three, rest = np.divmod(indices, 66 * 4 * 16)
+		others, rest = np.divmod(rest, 4 * 16)
+		three_suits, other_suits = np.divmod(rest, 16)
+		ranks[:, :3] = three[:, None]
+		ranks[:, 3:] = rank_others[three[:, None], other_pairs[others]]
+		suits[:, :3] = suit_triples[three_suits]
+		suits[:, 3] = other_suits // 4
+		suits[:, 4] = other_suits % 4
+
+	# Two pair: the ranks of the pairs, the rank of the other card, then the
+	# suits of each pair and of the other card
+	elif category == 2:
+		pairs, rest = np.divmod(indices, 11 * 6 * 6 * 4)
+		other, rest = np.divmod(rest, 6 * 6 * 4)
+		high_suits, rest = np.divmod(rest, 6 * 4)
+		low_suits, other_suit = np.divmod(rest, 4)
+		ranks[:, :2] = rank_pairs[pairs, :1]
+		ranks[:, 2:4] = rank_pairs[pairs, 1:]
+		ranks[:, 4] = pair_others[pairs, other]
+		suits[:, :2] = suit_pairs[high_suits]
+		suits[:, 2:4] = suit_pairs[low_suits]
+		suits[:, 4] = other_suit
+
+	# One pair: the rank of the pair, the ranks of the other three, then the
+	# suits of the pair and of each other card
+	elif category == 1:
+		pair, rest = np.divmod(indices, 220 * 6 * 64)
+		others, rest = np.divmod(rest, 6 * 64)
+		pair_suits, other_suits = np.divmod(rest, 64)
+		ranks[:, :2] = pair[:, None]
+		ranks[:, 2:] = rank_others[pair[:, None], other_triples[others]]
+		suits[:, :2] = suit_pairs[pair_suits]
+		for card in range(3):
+			suits[:, 2 + card] = other_suits >> (2 * (2 - card)) & 3
+
+	# High card: 5 ranks that aren't a straight, and suits that aren't all
+	# the same
+	else:
+		rank_set, pattern = np.divmod(indices, len(suit_patterns))
+		ranks[:] = plain_rank_sets[rank_set]
+		suits[:] = suit_patterns[pattern]
+
+	return np.sort(suits * 13 + ranks, axis=1).astype(np.int8)
+
+
+def sample_category(category: int, count: int, rng=None) -> np.ndarray:
+	'''
+	Picks random hands of a hand rank, every hand of that rank being as
+	likely as any other
+
+	Parameters:
+		category (int): the hand rank, from 0 (high card) to 8 (straight
+			flush)
+		count (int): the number of hands to pick
+		rng (numpy.random.Generator | int): the random number generator to
+			pick with, or a seed for one, so runs can be repeated
+
+	Returns:
+		(ndarray): a (count, 5) array of card codes, one hand per row
+
+	Doctests:
+>>> import poker_batch
+>>> hands = sample_category(3, 1000, 1)
+>>> hands.shape, set(poker_batch.evaluate_batch(hands)['category'].tolist())
+((1000, 5), {3})
+>>> sample_category(9, 1)
+Traceback (most recent call last):
+	...
+ValueError: there is no hand rank 9
+	'''
+	if not 0 <= category < len(CATEGORY_COUNTS):
+		raise ValueError(f"there is no hand rank {category}")
+	rng = np.random.default_rng(rng)
+	return unrank_category(category,
+		rng.integers(0, CATEGORY_COUNTS[category], count))
+
+
+def sample_hands(counts, rng=None, shuffle: bool = True) -> tuple:
+	'''
+	Picks random hands of every hand rank, labelled with their hand rank
+
+	Parameters:
+		counts (int | list[int]): the number of hands to pick of each hand
+			rank, either the same for all of them or by hand rank
+		rng (numpy.random.Generator | int): the random number generator to
+			pick with, or a seed for one, so runs can be repeated
+		shuffle (bool): whether to mix the hands up; otherwise they're in
+			order of hand rank
+
+	Returns:
+		(tuple(ndarray, ndarray)): an (N, 5) array of card codes, one hand
+			per row, and the hand rank of each hand
+
+	Doctests:
+>>> hands, labels = sample_hands(2, 1, shuffle=False)
+>>> hands.shape, labels.tolist()
+((18, 5), [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8])
+	'''
+	rng = np.random.default_rng(rng)
+	if isinstance(counts, int):
+		counts = [counts] * len(CATEGORY_COUNTS)
+
+	hands = np.concatenate([sample_category(category, count, rng)
+		for category, count in enumerate(counts)])
+	labels = np.repeat(np.arange(len(counts), dtype=np.int8), counts)
+
+	if shuffle:
+		order = rng.permutation(len(hands))
+		hands = hands[order]
+		labels = labels[order]
+	return (hands, labels)
@@ -0,0 +1,771 @@
+'''
+Hosts many tables of the poker game at once over TCP, for players who
+connect over the network instead of sitting at the terminal
+
+Every table plays the same rounds as poker_game.play_round: ante, deal,
+redraw, the betting (kept track of by poker_betting.BettingRound, like
+poker_game.round_main_loop), and the showdown. Seats without a player are
+CPUs, played by poker_game.cpu_redraw_cards, poker_game.cpu_decisions and
+poker_game.cpu_main_loop, and where the game would ask the player with
+pinput(), the table sends the player a message and waits for the answer
+instead. Every table runs as its own asyncio task, so one process can keep
+thousands of tables going while their players think. A player that doesn't
+answer in time folds (or keeps their cards), and a table closes once its
+last player leaves:
+
+	python poker_server.py --port 8765
+
+Messages are JSON objects, one per line, each with a 'type'. A player
+starts by sending:
+
+	{"type": "join", "name": "Ann", "table": "lobby"}
+
+where 'table' is optional (players that name the same table sit at it
+together, and anyone else gets a table of their own). The table answers
+with 'joined', then sends every player:
+
+	deal: {"round", "hand", "money"}, their cards at the start of a round
+	redraw: {"id", "hand", "timeout"}, asking which cards to replace
+	turn: {"id", "bet", "to_call", "money", "timeout"}, asking for a bet
+	hand: {"hand"}, their cards after replacing some
+	action: {"seat", "name", "action", "bet"}, what each seat did
+	showdown: {"winners", "earnings", "hands", "money"}, who won the round
+	broke: the player ran out of money and has to leave, like the main game
+	error: {"message"}, a message that couldn't be used
+
+Cards are [rank, suit] like everywhere else in the game. A redraw or turn
+is answered with a message of the same type and id:
+
+	{"type": "redraw", "id": 3, "cards": [[2, 0], [9, 3]]}
+	{"type": "turn", "id": 4, "action": "raise", "amount": 20}
+
+where 'action' is 'fold', 'call' or 'raise', and 'amount' is how much to
+raise by, the same choices poker_game.player_main_loop gives. A player can
+leave by sending {"type": "leave"} or closing the connection
+'''
+
+import argparse
+import asyncio
+import json
+import random
+
+import poker_betting
+import poker_functions
+import poker_game
+
+
+# The most bytes a message from a player can have
+MAX_LINE = 4096
+
+# The most messages from a player kept waiting for the table to read them;
+# older ones are thrown away first
+INBOX_SIZE = 8
+
+# The most bytes waiting to be sent to a player before they're disconnected
+# for not keeping up
+MAX_BUFFER = 1 << 16
+
+# The seconds a player has to join after connecting, and to answer each
+# question
+JOIN_TIMEOUT = 10.0
+ACTION_TIMEOUT = 30.0
+
+# The most cards a player can replace, like poker_game.player_redraw_cards
+MAX_DISCARDS = 4
+
+
+def encode(message: dict) -> bytes:
+	'''
+	Turns a message into a line to send
+
+	Parameters:
+		message (dict): the message
+
+	Returns:
+		(bytes): the message as one line of JSON
+
+	Doctests:
+>>> encode({'type': 'turn', 'bet': 10})
+b'{"type":"turn","bet":10}\\n'
+	'''
+	return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+def decode(line: bytes) -> dict:
+	'''
+	Turns a line that was received into a message
+
+	Parameters:
+		line (bytes): one line of JSON
+
+	Returns:
+		(dict): the message
+
+	Doctests:
+>>> decode(b'{"type": "leave"}\\n')
+{'type': 'leave'}
+>>> decode(b'[1, 2]')
+Traceback (most recent call last):
+...
+ValueError: messages must be JSON objects with a type
+	'''
+	message = json.loads(line)
+	if not isinstance(message, dict) or not isinstance(message.get('type'), str):
+		raise ValueError("messages must be JSON objects with a type")
+	return message
+
+
+def hand_cards(hand: dict) -> list:
+	'''
+	Lists the cards of a hand for a message
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]}): a hand
+
+	Returns:
+		(list[list[int]]): every card as [rank, suit], in the order of the hand
+
+	Doctests:
+>>> hand_cards({0: [(1, 0)], 1: [], 2: [(5, 2)], 3: []})
+[[1, 0], [5, 2]]
+	'''
+	return [list(card) for suit in hand.values() for card in suit]
+
+
+def read_cards(cards) -> list:
+	'''
+	Turns the cards in a message back into cards, checking that they're laid
+	out the way hand_cards lays them out
+
+	Parameters:
+		cards: the cards from a message, which should be a list of [rank, suit]
+
+	Returns:
+		(list[tuple(int, int)]): the cards, or None if they aren't laid out
+			right
+
+	Doctests:
+>>> read_cards([[1, 0], [5, 2]])
+[(1, 0), (5, 2)]
+>>> read_cards(5), read_cards([[1, [0]]]), read_cards([[1, True]])
+(None, None, None)
+	'''
+	if not isinstance(cards, list):
+		return None
+	read = []
+	for card in cards:
+		if not isinstance(card, list) or len(card) != 2:
+			return None
+		for number in card:
+			# bool counts as an int, but true isn't a rank or a suit
+			if not isinstance(number, int) or isinstance(number, bool):
+				return None
+		read.append(tuple(card))
+	return read
+
+
+class Seat:
+	'''
+	A seat at a table, taken by a player over the network or by a CPU
+	'''
+
+	def __init__(self, name: str, writer: asyncio.StreamWriter = None):
+		'''
+		Parameters:
+			name (str): the name of whoever is in the seat
+			writer (asyncio.StreamWriter): the connection to the player, or
+				None for a CPU
+		'''
+		self.name = name
+		self.writer = writer
+		self.money = poker_game.STARTING_MONEY
+		# Messages from the player, waiting for the table to read them
+		self.inbox = asyncio.Queue(INBOX_SIZE) if writer is not None else None
+		# The id of the last question asked, so late answers can be told apart
+		self.question_id = 0
+		self.connected = writer is not None
+
+	def is_player(self) -> bool:
+		'''
+		Checks whether a player that's still connected is in the seat
+
+		Returns:
+			(bool): True for a connected player, False for a CPU
+		'''
+		return self.connected
+
+	def send(self, message: dict):
+		'''
+		Sends a message to the player, if there is one. Players that have too
+		much waiting to be sent to them are disconnected, so a slow player
+		can't make the table use more and more memory, and so are players
+		whose connection was lost while sending
+
+		Parameters:
+			message (dict): the message
+		'''
+		if not self.connected:
+			return
+		if self.writer.is_closing() \
+				or self.writer.transport.get_write_buffer_size() > MAX_BUFFER:
+			self.leave()
+			return
+		self.writer.write(encode(message))
+
+	def receive(self, message):
+		'''
+		Puts a message from the player in the inbox, throwing the oldest one
+		away if it's full
+
+		Parameters:
+			message (dict): the message, or None if the player left
+		'''
+		if self.inbox.full():
+			self.inbox.get_nowait()
+		self.inbox.put_nowait(message)
+
+	def leave(self):
+		'''
+		Disconnects the player; the seat goes to a CPU at the next round
+		'''
+		if not self.connected:
+			return
+		self.connected = False
+		self.receive(None)
+		self.writer.close()
+
+	async def ask(self, question: dict, timeout: float) -> dict:
+		'''
+		Asks the player a question and waits for the answer
+
+		Parameters:
+			question (dict): the question; its id is filled in
+			timeout (float): the seconds to wait for an answer
+
+		Returns:
+			(dict): the answer, a message of the same type and id, or None if
+				the player didn't answer in time or left
+		'''
+		if not self.connected:
+			return None
+		self.question_id += 1
+		question['id'] = self.question_id
+		question['timeout'] = timeout
+		self.send(question)
+
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + timeout
+		while True:
+			try:
+				message = await asyncio.wait_for(self.inbox.get(),
+						deadline - loop.time())
+			except asyncio.TimeoutError:
+				return None
+			if message is None:
+				return None
+			# Answers to questions that already timed out are thrown away
+			if message['type'] == question['type'] \
+					and message.get('id') == self.question_id:
+				return message
+
+
+class Table:
+	'''
+	A table of players and CPUs playing round after round, as its own task
+	'''
+
+	def __init__(self, server, table_id: str, rng: random.Random):
+		'''
+		Parameters:
+			server (PokerServer): the server the table is on
+			table_id (str): the name of the table
+			rng (random.Random): the random number generator for shuffling and
+				the CPUs
+		'''
+		self.server = server
+		self.table_id = table_id
+		self.rng = rng
+		self.seats = [Seat(f"CPU{seat + 1}")
+			for seat in range(server.seat_num)]
+		# Players that joined and are waiting for the next round to sit down
+		self.waiting = []
+		self.round_num = 0
+		self.task = None
+
+	def player_num(self) -> int:
+		'''
+		Counts the players at the table, and waiting to sit down
+
+		Returns:
+			(int): the number of players
+		'''
+		return sum(seat.is_player() for seat in self.seats) + \
+				sum(seat.is_player() for seat in self.waiting)
+
+	def join(self, seat: Seat) -> bool:
+		'''
+		Lets a player join the table at the next round
+
+		Parameters:
+			seat (Seat): the player's seat
+
+		Returns:
+			(bool): False if the table is already full
+		'''
+		if self.player_num() >= len(self.seats):
+			return False
+		self.waiting.append(seat)
+		return True
+
+	def sit_down(self):
+		'''
+		Gives the seats of players that left to CPUs, and the seats of CPUs to
+		players that are waiting
+		'''
+		for index, seat in enumerate(self.seats):
+			if seat.writer is not None and not seat.is_player():
+				self.seats[index] = Seat(f"CPU{index + 1}")
+
+		for index, seat in enumerate(self.seats):
+			if not self.waiting:
+				break
+			if seat.writer is None:
+				player = self.waiting.pop(0)
+				if player.is_player():
+					self.seats[index] = player
+					player.send({ 'type': 'joined', 'table': self.table_id,
+						'seat': index,
+						'names': [other.name for other in self.seats] })
+
+	def broadcast(self, message: dict):
+		'''
+		Sends a message to every player at the table
+
+		Parameters:
+			message (dict): the message
+		'''
+		for seat in self.seats:
+			seat.send(message)
+
+	async def run(self):
+		'''
+		Plays rounds until every player has left
+		'''
+		try:
+			while True:
+				self.sit_down()
+				if not any(seat.is_player() for seat in self.seats):
+					break
+				await self.play_round()
+				# Let every other table have a turn before the next round
+				await asyncio.sleep(self.server.round_delay)
+		finally:
+			for seat in self.seats + self.waiting:
+				seat.leave()
+			self.server.tables.pop(self.table_id, None)
+
+	async def player_redraw(self, seat: Seat, hand: dict, deck: list):
+		'''
+		Asks a player which cards to replace, the same choices as
+		poker_game.player_redraw_cards
+
+		Parameters:
+			seat (Seat): the player's seat
+			hand (dict{int: list[tuple(int, int)]}): the player's hand
+			deck (list[tuple(int, int)]): the deck
+
+		Returns:
+			(int): the number of cards replaced
+
+		Doctests:
+>>> async def answer_badly():
+...     server = PokerServer(seat_num=2, seed=1)
+...     await server.start('127.0.0.1', 0)
+...     reader, writer = await asyncio.open_connection(*server.address())
+...     writer.write(encode({'type': 'join', 'name': 'Ann'}))
+...     types = []
+...     while 'showdown' not in types:
+...         message = decode(await reader.readline())
+...         types.append(message['type'])
+...         if message['type'] == 'redraw':
+...             writer.write(encode({'type': 'redraw', 'id': message['id'],
+...                 'cards': 5}))
+...         elif message['type'] == 'turn' and 'error' not in types[-2:]:
+...             writer.write(encode({'type': 'turn', 'id': message['id'],
+...                 'action': 'raise', 'amount': True}))
+...         elif message['type'] == 'turn':
+...             writer.write(encode({'type': 'turn', 'id': message['id'],
+...                 'action': 'call'}))
+...     writer.close()
+...     await server.close()
+...     return types[:4], types.count('error'), len(server.tables)
+>>> asyncio.run(answer_badly())
+(['joined', 'deal', 'redraw', 'error'], 2, 0)
+		'''
+		answer = await seat.ask({ 'type': 'redraw', 'hand': hand_cards(hand) },
+				self.server.timeout)
+		if answer is None:
+			return 0
+
+		answer_cards = read_cards(answer.get('cards', []))
+		if answer_cards is None:
+			seat.send({ 'type': 'error',
+				'message': "cards must be a list of [rank, suit]" })
+			return 0
+
+		# Only cards in the hand count, each once, up to the most allowed
+		cards = []
+		for card in answer_cards:
+			if card not in cards and card[1] in hand \
+					and card in hand[card[1]]:
+				cards.append(card)
+		if len(cards) > MAX_DISCARDS:
+			seat.send({ 'type': 'error',
+				'message': f"at most {MAX_DISCARDS} cards can be replaced" })
+			return 0
+
+		for card in cards:
+			poker_functions.replace_card(card, hand, deck)
+		seat.send({ 'type': 'hand', 'hand': hand_cards(hand) })
+		return len(cards)
+
+	async def player_turn(self, seat: Seat, money: int, to_call: int,
+			bet: int) -> tuple:
+		'''
+		Asks a player for their bet, the same choices as
+		poker_game.player_main_loop
+
+		Parameters:
+			seat (Seat): the player's seat
+			money (int): the betting money available to the player
+			to_call (int): the amount the player has to call to
+			bet (int): the current bet
+
+		Returns:
+			tuple(int, int, bool): the remaining betting money for the player,
+				the bet, and if the player is still playing
+		'''
+		# Players that can't meet the bet have to fold
+		if to_call > money:
+			return (money, bet, False)
+
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + self.server.timeout
+		while True:
+			answer = await seat.ask({ 'type': 'turn', 'bet': bet,
+				'to_call': to_call, 'money': money },
+				max(0.0, deadline - loop.time()))
+			# Players that don't answer fold
+			if answer is None or answer.get('action') == 'fold':
+				return (money, bet, False)
+
+			if answer.get('action') == 'call':
+				return (money - to_call, bet, True)
+
+			amount = answer.get('amount')
+			# bool counts as an int, but true isn't an amount
+			if answer.get('action') == 'raise' and isinstance(amount, int) \
+					and not isinstance(amount, bool) and 0 <= amount <= money:
+				return (money - amount, bet + amount, True)
+
+			# Anything else is asked again, like the game does
+			seat.send({ 'type': 'error', 'message': "action must be 'fold', " +
+				"'call', or 'raise' with an amount between 0 and your " +
+				"betting money" })
+
+	async def play_round(self):
+		'''
+		Plays a round, the same way as poker_game.play_round
+		'''
+		self.round_num += 1
+		seat_num = len(self.seats)
+		seats = self.seats
+
+		# Same as the main game loop: players that can't meet the minimum bet
+		# have to leave, and CPUs get their starting money again
+		for index, seat in enumerate(seats):
+			if seat.money < poker_game.MINIMUM_BET:
+				if seat.is_player():
+					seat.send({ 'type': 'broke' })
+					seat.leave()
+					seats[index] = Seat(f"CPU{index + 1}")
+				seats[index].money = poker_game.STARTING_MONEY
+
+		money = [seat.money for seat in seats]
+		start_money = money.copy()
+
+		# The CPU functions read their settings from poker_game, so every call
+		# to them is made with this table's settings
+		def cpu_settings():
+			return poker_game.headless_table(seat_num, rng=self.rng)
+
+		# Create and shuffle a new deck, then ante up and deal
+		deck = poker_functions.shuffle(poker_functions.create_deck(), self.rng)
+		for index in range(seat_num):
+			money[index] -= poker_game.MINIMUM_BET
+		hands = poker_functions.deal_hands(seat_num, deck)
+		for index, seat in enumerate(seats):
+			seat.send({ 'type': 'deal', 'round': self.round_num,
+				'hand': hand_cards(hands[index]), 'money': money[index] })
+
+		# Redraw cards
+		for index, seat in enumerate(seats):
+			if seat.is_player():
+				replaced = await self.player_redraw(seat, hands[index], deck)
+			else:
+				old_cards = hand_cards(hands[index])
+				with cpu_settings():
+					poker_game.cpu_redraw_cards(seat.name, hands[index], deck)
+				replaced = len([card for card in hand_cards(hands[index])
+					if card not in old_cards])
+			self.broadcast({ 'type': 'action', 'seat': index,
+				'name': seat.name, 'action': 'redraw', 'cards': replaced })
+
+		# CPUs bet on the strength of their hand, since estimating their
+		# chances (see poker_game.EQUITY_BUDGET) would hold up every table
+		# on the server while it ran
+		player_is_playing = [True] * seat_num
+		with cpu_settings():
+			bet_decisions = poker_game.cpu_decisions(money, hands,
+					poker_game.MINIMUM_BET, player_is_playing)
+
+		# The betting loop, the same as poker_game.round_main_loop
+		fold_losses = [0] * seat_num
+		betting = poker_betting.BettingRound(money, start_money, fold_losses,
+				player_is_playing, bet=poker_game.MINIMUM_BET)
+		while not betting.is_done():
+			this_player = betting.player
+			to_call = betting.to_call[this_player]
+			old_bet = betting.bet
+			seat = seats[this_player]
+			if seat.is_player():
+				turn = await self.player_turn(seat, money[this_player],
+						to_call, old_bet)
+			else:
+				with cpu_settings():
+					turn = poker_game.cpu_main_loop(seat.name,
+						money[this_player], to_call, bet_decisions[this_player],
+						old_bet)
+			betting.end_turn(*turn)
+
+			if not player_is_playing[this_player]:
+				action = 'fold'
+			else:
+				action = 'call' if betting.bet == old_bet else 'raise'
+			self.broadcast({ 'type': 'action', 'seat': this_player,
+				'name': seat.name, 'action': action, 'bet': betting.bet })
+		bet = betting.bet
+
+		# Find the winner; tied winners split the pot, and the first winner
+		# gets what's left over, the same as poker_game.play_round
+		playing_players = [player for player in range(seat_num)
+			if player_is_playing[player]]
+		ranking = poker_functions.rank_hands(
+			[hands[player] for player in playing_players])
+		winner_money = player_is_playing.count(True) * bet + sum(fold_losses)
+		winners = [playing_players[index] for index in ranking[0]]
+		share = winner_money // len(winners)
+		earnings = []
+		for place, winner in enumerate(winners):
+			earnings.append(share + (winner_money - share * len(winners)
+				if place == 0 else 0))
+			money[winner] += earnings[-1]
+
+		for index, seat in enumerate(seats):
+			seat.money = money[index]
+		self.broadcast({ 'type': 'showdown', 'winners': winners,
+			'earnings': earnings,
+			'hands': { str(player): hand_cards(hands[player])
+				for player in playing_players },
+			'money': money })
+
+
+class PokerServer:
+	'''
+	A TCP server hosting every table
+	'''
+
+	def __init__(self, seat_num: int = poker_game.PLAYER_NUM,
+			timeout: float = ACTION_TIMEOUT, round_delay: float = 0.0,
+			seed=None):
+		'''
+		Parameters:
+			seat_num (int): the number of seats at each table
+			timeout (float): the seconds a player has to answer each question
+			round_delay (float): the seconds a table waits between rounds
+			seed: the seed for every table's random number generator, for
+				repeatable games; tables get their own seed from it and their
+				name
+		'''
+		self.seat_num = seat_num
+		self.timeout = timeout
+		self.round_delay = round_delay
+		self.seed = seed
+		self.tables = {}
+		self.table_count = 0
+		self.server = None
+
+	async def start(self, host: str = '127.0.0.1', port: int = 8765):
+		'''
+		Starts listening for players
+
+		Parameters:
+			host (str): the address to listen on
+			port (int): the port to listen on; 0 picks a free one
+
+		Doctests:
+>>> async def play_one_round():
+...     server = PokerServer(seat_num=3, seed=1)
+...     await server.start('127.0.0.1', 0)
+...     reader, writer = await asyncio.open_connection(*server.address())
+...     writer.write(encode({'type': 'join', 'name': 'Ann'}))
+...     types = []
+...     while 'showdown' not in types:
+...         message = decode(await reader.readline())
+...         types.append(message['type'])
+...         if message['type'] == 'redraw':
+...             writer.write(encode({'type': 'redraw', 'id': message['id'],
+...                 'cards': message['hand'][:2]}))
+...         elif message['type'] == 'turn':
+...             writer.write(encode({'type': 'turn', 'id': message['id'],
+...                 'action': 'call'}))
+...     writer.close()
+...     await server.close()
+...     return types[:4], len(server.tables)
+>>> asyncio.run(play_one_round())
+(['joined', 'deal', 'redraw', 'hand'], 0)
+		'''
+		self.server = await asyncio.start_server(self.handle_client, host,
+				port, limit=MAX_LINE)
+
+	def address(self) -> tuple:
+		'''
+		Gets the address the server is listening on
+
+		Returns:
+			(tuple(str, int)): the host and port
+		'''
+		return self.server.sockets[0].getsockname()[:2]
+
+	async def close(self):
+		'''
+		Stops listening and closes every table
+		'''
+		self.server.close()
+		for table in list(self.tables.values()):
+			table.task.cancel()
+		tasks = [table.task for table in self.tables.values()]
+		await asyncio.gather(*tasks, return_exceptions=True)
+		await self.server.wait_closed()
+
+	def get_table(self, table_id: str = None) -> Table:
+		'''
+		Finds a table by name, starting it if it isn't running yet
+
+		Parameters:
+			table_id (str): the name of the table; None starts a new table
+
+		Returns:
+			(Table): the table
+		'''
+		if table_id is None:
+			self.table_count += 1
+			table_id = f"table{self.table_count}"
+		table = self.tables.get(table_id)
+		if table is None:
+			rng = random.Random(None if self.seed is None
+				else f"{self.seed}-{table_id}")
+			table = Table(self, table_id, rng)
+			self.tables[table_id] = table
+			table.task = asyncio.create_task(table.run())
+		return table
+
+	async def handle_client(self, reader: asyncio.StreamReader,
+			writer: asyncio.StreamWriter):
+		'''
+		Seats a player who connected, then passes their messages to their
+		table until they leave
+
+		Parameters:
+			reader (asyncio.StreamReader): messages from the player
+			writer (asyncio.StreamWriter): messages to the player
+		'''
+		seat = Seat('', writer)
+		try:
+			join = decode(await asyncio.wait_for(reader.readline(),
+					JOIN_TIMEOUT))
+			name = join.get('name')
+			table_id = join.get('table')
+			if join['type'] != 'join' or not isinstance(name, str) \
+					or not 0 < len(name) <= 32 \
+					or not isinstance(table_id, (str, type(None))):
+				raise ValueError("the first message must be a join with a " +
+						"name of 1 to 32 characters")
+			seat.name = name
+			if not self.get_table(table_id).join(seat):
+				raise ValueError(f"table {table_id} is full")
+
+			while seat.is_player():
+				line = await reader.readline()
+				if not line:
+					break
+				try:
+					message = decode(line)
+				except ValueError as error:
+					seat.send({ 'type': 'error', 'message': str(error) })
+					continue
+				if message['type'] == 'leave':
+					break
+				seat.receive(message)
+		except (ValueError, asyncio.TimeoutError) as error:
+			# Lines that are too long end up here too
+			seat.send({ 'type': 'error', 'message': str(error) })
+		except ConnectionError:
+			pass
+		finally:
+			seat.leave()
+
+
+async def serve(host: str, port: int, **settings):
+	'''
+	Runs the server until it's stopped
+
+	Parameters:
+		host (str): the address to listen on
+		port (int): the port to listen on
+		settings: the settings for PokerServer
+	'''
+	server = PokerServer(**settings)
+	await server.start(host, port)
+	# Flushed right away, so a program that started the server can read it
+	print(f"Listening on {server.address()[0]}:{server.address()[1]}",
+			flush=True)
+	try:
+		await asyncio.Event().wait()
+	finally:
+		await server.close()
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+	parser.add_argument('--host', default='127.0.0.1',
+			help='address to listen on')
+	parser.add_argument('--port', type=int, default=8765,
+			help='port to listen on')
+	parser.add_argument('--seats', type=int, default=poker_game.PLAYER_NUM,
+			help='number of seats at each table')
+	parser.add_argument('--timeout', type=float, default=ACTION_TIMEOUT,
+			help='seconds a player has to answer each question')
+	parser.add_argument('--seed', default=None, help='seed for the tables')
+	args = parser.parse_args()
+
+	try:
+		asyncio.run(serve(args.host, args.port, seat_num=args.seats,
+			timeout=args.timeout, seed=args.seed))
+	except KeyboardInterrupt:
+		pass
+
+
+# Main program entry
+if __name__ == '__main__':
+	main()
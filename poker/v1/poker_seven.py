@@ -0,0 +1,299 @@
+'''
+Scores hands of 5 to 7 cards by the best 5 cards in them, for games like
+Texas hold'em where a player makes a hand out of 7 cards
+
+Trying all 21 ways to pick 5 cards out of 7 is slow, so everything that can
+be worked out ahead of time is: every group of 5 to 7 ranks (with at most 4
+of each) is looked up in a table of the best strength that can be made from
+those ranks without a flush, and since 7 cards can only have 5 or more of one
+suit, the ranks in that suit are looked up in a table of the best flush they
+make. When scoring many hands at once, the rank table is a hash table so
+that no searching is needed, and only hands with a flush look at their
+suits. The better of the two is the strength of the hand. Both tables are
+built from poker_functions.hand_table, so the strengths are the same as
+poker_functions.hand_value gives for the best 5 cards
+'''
+
+from itertools import combinations, combinations_with_replacement
+
+import numpy as np
+
+import poker_batch
+import poker_functions
+
+
+# The rank weight of each rank, by rank - 1, the same as code % 13
+rank_weight_array = np.array(
+	[poker_functions.rank_weights[rank] for rank in poker_functions.ranks],
+	dtype=np.int64)
+
+
+def best_strengths(rank_groups: np.ndarray, is_flush: bool) -> np.ndarray:
+	'''
+	Finds the best strength that 5 of the given ranks make
+
+	Parameters:
+		rank_groups (ndarray): an (N, 5 to 7) array of ranks (as rank - 1),
+			one group of ranks per row
+		is_flush (bool): whether the cards all have the same suit
+
+	Returns:
+		(ndarray): the best strength of each group
+
+	Doctests:
+>>> best_strengths(np.array([[0, 0, 0, 1, 1, 2, 2]]), False) >> 20
+array([6])
+>>> best_strengths(np.array([[0, 9, 10, 11, 12, 4]]), True) >> 20
+array([8])
+	'''
+	strengths = poker_batch.table_flush_strengths if is_flush \
+			else poker_batch.table_strengths
+	picks = np.array(list(combinations(range(rank_groups.shape[1]), 5)))
+
+	# The weight of every way to pick 5 ranks out of each group
+	weights = rank_weight_array[rank_groups[:, picks]].sum(axis=2)
+	entries = np.searchsorted(poker_batch.table_weights, weights)
+	entries = np.minimum(entries, len(poker_batch.table_weights) - 1)
+	# Some picks can't be made, like 5 of one rank, and aren't in the table
+	found = poker_batch.table_weights[entries] == weights
+	return np.where(found, strengths[entries], -1).max(axis=1)
+
+
+def build_rank_table() -> tuple:
+	'''
+	Finds the best strength without a flush of every group of 5 to 7 ranks,
+	with at most 4 of each rank
+
+	Returns:
+		(tuple(ndarray, ndarray)): the rank weights of every group, sorted,
+			and the best strength of each
+
+	Doctests:
+>>> weights, strengths = build_rank_table()
+>>> len(weights)
+73775
+>>> bool((np.diff(weights) > 0).all())
+True
+	'''
+	weights = []
+	strengths = []
+	for card_num in range(5, 8):
+		groups = np.array([group for group in
+			combinations_with_replacement(range(13), card_num)
+			if max(map(group.count, group)) <= 4], dtype=np.int64)
+		weights.append(rank_weight_array[groups].sum(axis=1))
+		strengths.append(best_strengths(groups, False))
+
+	weights = np.concatenate(weights)
+	order = np.argsort(weights)
+	return (weights[order], np.concatenate(strengths)[order])
+
+
+def build_flush_table() -> np.ndarray:
+	'''
+	Finds the best flush that every group of 5 to 7 ranks in one suit makes
+
+	Returns:
+		(ndarray): by the 13 bit mask of the ranks in the suit, the best
+			strength of the flush, or -1 if there are less than 5 or more
+			than 7 ranks
+
+	Doctests:
+>>> flush_table = build_flush_table()
+>>> int(flush_table[0b1111000000001] >> 20), int(flush_table[0b1111])
+(8, -1)
+	'''
+	flush_table = np.full(1 << 13, -1, dtype=np.int64)
+	for card_num in range(5, 8):
+		groups = np.array(list(combinations(range(13), card_num)),
+				dtype=np.int64)
+		suit_masks = (1 << groups).sum(axis=1)
+		flush_table[suit_masks] = best_strengths(groups, True)
+	return flush_table
+
+
+# The number of bits in the position of a rank weight in the hash table, and
+# the number rank weights are multiplied by to spread them out over the
+# table (2**64 divided by the golden ratio)
+HASH_BITS = 20
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_weights(weights: np.ndarray) -> np.ndarray:
+	'''
+	Finds where each rank weight goes in the hash table
+
+	Parameters:
+		weights (ndarray): rank weights
+
+	Returns:
+		(ndarray): the position of each weight in the hash table, if it
+			doesn't have to move past a taken spot
+
+	Doctests:
+>>> hash_weights(np.array([0, 1, 2]))
+array([     0, 648055, 247535])
+	'''
+	return ((weights.astype(np.uint64) * HASH_MULTIPLIER)
+			>> np.uint64(64 - HASH_BITS)).astype(np.intp)
+
+
+def build_hash_table(weights: np.ndarray, strengths: np.ndarray) -> tuple:
+	'''
+	Puts the rank table in a hash table, so a rank weight can be found
+	without searching. A weight whose spot is taken goes in the next free
+	spot after it
+
+	Parameters:
+		weights (ndarray): the rank weights of the rank table
+		strengths (ndarray): the best strength of each
+
+	Returns:
+		(tuple(ndarray, ndarray)): the weight in every spot of the table (-1
+			if it's free), and the strength in every spot
+
+	Doctests:
+>>> hash_keys, hash_strengths = build_hash_table(np.array([1, 2]), \
+np.array([10, 20]))
+>>> int(hash_keys[648055]), int(hash_strengths[648055])
+(1, 10)
+	'''
+	table_size = 1 << HASH_BITS
+	hash_keys = np.full(table_size, -1, dtype=np.int32)
+	hash_strengths = np.zeros(table_size, dtype=np.int32)
+	for weight, strength, spot in zip(weights.tolist(), strengths.tolist(),
+			hash_weights(weights).tolist()):
+		while hash_keys[spot] != -1:
+			spot = (spot + 1) % table_size
+		hash_keys[spot] = weight
+		hash_strengths[spot] = strength
+	return (hash_keys, hash_strengths)
+
+
+# The tables, as arrays for scoring many hands at once, and as a dictionary
+# and list for scoring one hand at a time
+rank_table_weights, rank_table_strengths = build_rank_table()
+flush_table = build_flush_table()
+hash_keys, hash_strengths = build_hash_table(rank_table_weights,
+	rank_table_strengths)
+rank_table = dict(zip(rank_table_weights.tolist(),
+	rank_table_strengths.tolist()))
+flush_list = flush_table.tolist()
+
+# Rank weights fit in 32 bits, so above them each card also adds 1 to a
+# count of the cards in its suit, 4 bits per suit. Adding 3 to every count
+# sets the top bit of the ones that are at least 5, which is a flush
+code_keys = np.array([poker_functions.rank_weights[code % 13 + 1]
+	| (1 << (32 + 4 * (code // 13))) for code in range(52)], dtype=np.int64)
+FLUSH_CHECK_ADD = 0x3333 << 32
+FLUSH_CHECK_BITS = 0x8888 << 32
+WEIGHT_BITS = 0xFFFFFFFF
+
+
+def evaluate_seven(hand) -> tuple:
+	'''
+	Scores a hand of 5 to 7 cards by its best 5 cards
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand mask
+			of 5 to 7 cards
+
+	Returns:
+		(int, int): the strength of the best 5 cards (see
+			poker_functions.strength_key), and their hand rank
+
+	Doctests:
+>>> evaluate_seven({0: [(1, 0), (13, 0), (12, 0), (11, 0), (10, 0), \
+(2, 0)], 1: [(1, 1)], 2: [], 3: []}) \
+== (poker_functions.hand_value( \
+{0: [(1, 0), (13, 0), (12, 0), (11, 0), (10, 0)], 1: [], 2: [], 3: []})[1], 8)
+True
+
+>>> evaluate_seven(poker_functions.hand_to_mask({0: [(1, 0), (2, 0)], \
+1: [(1, 1), (2, 1)], 2: [(1, 2), (2, 2)], 3: [(3, 3)]}))[1]
+6
+	'''
+	if isinstance(hand, dict):
+		hand = poker_functions.hand_to_mask(hand)
+
+	# Add up the weights of the cards a suit at a time, like hand_lookup,
+	# looking for the best flush along the way
+	weight = 0
+	strength = -1
+	for suit in poker_functions.suits:
+		suit_mask = (hand >> (suit * 13)) & 0x1FFF
+		weight += poker_functions.suit_mask_weights[suit_mask]
+		if flush_list[suit_mask] > strength:
+			strength = flush_list[suit_mask]
+
+	rank_strength = rank_table.get(weight)
+	if rank_strength is None:
+		raise ValueError("the hand must have 5 to 7 different cards")
+	if rank_strength > strength:
+		strength = rank_strength
+	return (strength, strength >> 20)
+
+
+def evaluate_seven_batch(hands: np.ndarray) -> np.ndarray:
+	'''
+	Scores every hand of 7 cards in the given array by its best 5 cards
+
+	Parameters:
+		hands (ndarray): an (N, 5 to 7) array of card codes, one hand per row;
+			no card can be in a hand twice
+
+	Returns:
+		(ndarray): an array of N records, one per hand, like
+			poker_batch.evaluate_batch, with the fields:
+			category: the hand rank of the best 5 cards
+			strength: the strength of the best 5 cards
+
+	Doctests:
+>>> result = evaluate_seven_batch(np.array([ \
+[0, 9, 10, 11, 12, 13, 26], \
+[0, 13, 26, 1, 14, 27, 40], \
+[0, 14, 28, 42, 4, 50, 38]]))
+>>> result['category']
+array([8, 7, 4], dtype=int8)
+	'''
+	hands = np.asarray(hands)
+	if hands.ndim != 2 or not 5 <= hands.shape[1] <= 7:
+		raise ValueError(
+				f"hands must have the shape (N, 5 to 7), not {hands.shape}")
+
+	# Add up the rank weights and suit counts of each hand, a card at a time
+	columns = hands.T
+	totals = code_keys[columns[0]]
+	for column in columns[1:]:
+		totals += code_keys[column]
+	weights = totals & WEIGHT_BITS
+
+	# Find every weight in the hash table, moving the ones that aren't in
+	# their spot on to the next spot until they're all found
+	spots = hash_weights(weights)
+	missed = np.flatnonzero(hash_keys[spots] != weights)
+	while len(missed):
+		if (hash_keys[spots[missed]] == -1).any():
+			raise ValueError("hands must have 5 to 7 different cards each")
+		spots[missed] = (spots[missed] + 1) % len(hash_keys)
+		missed = missed[hash_keys[spots[missed]] != weights[missed]]
+	strengths = hash_strengths[spots].astype(np.int64)
+
+	# Only hands with a flush need the ranks in their flush suit, as 13 bits,
+	# to look up the best flush
+	flushes = np.flatnonzero((totals + FLUSH_CHECK_ADD) & FLUSH_CHECK_BITS)
+	if len(flushes):
+		suit_counts = totals[flushes] >> 32
+		flush_suits = np.zeros(len(flushes), dtype=np.int64)
+		for suit in poker_functions.suits:
+			flush_suits[(suit_counts >> (4 * suit)) & 0xF >= 5] = suit
+		flush_hands = hands[flushes].astype(np.int64)
+		suit_masks = np.where(flush_hands // 13 == flush_suits[:, None],
+				1 << (flush_hands % 13), 0).sum(axis=1)
+		strengths[flushes] = np.maximum(strengths[flushes],
+				flush_table[suit_masks])
+
+	result = np.empty(len(hands), dtype=poker_batch.result_dtype)
+	result['strength'] = strengths
+	result['category'] = strengths >> 20
+	return result
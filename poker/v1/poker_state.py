@@ -0,0 +1,322 @@
+'''
+Keeps everything about a table during a round in one place, so a round can
+be saved and played again from where it was
+
+poker_game passes the table around as lists with one item per player
+(money, start_money, fold_losses, to_call, player_is_playing, bet_decisions
+and hands). A TableState holds those same lists, so every round function in
+poker_game works on it as is, and a PlayerState looks at one player's items
+in them. A snapshot copies each list once instead of deep copying the whole
+table, and a Deck is saved without copying any cards (see Deck.snapshot), so
+searches and replays can save and restore a table thousands of times for
+each decision
+'''
+
+import poker_functions
+
+
+class PlayerState:
+	'''
+	One player at a table, read from and written to the table's lists
+	'''
+
+	__slots__ = ('table', 'index')
+
+	def __init__(self, table, index: int):
+		'''
+		Parameters:
+			table (TableState): the table the player is at
+			index (int): the player's index at the table
+		'''
+		self.table = table
+		self.index = index
+
+	def __repr__(self) -> str:
+		return f"PlayerState({self.name!r}, money={self.money}, " + \
+				f"is_playing={self.is_playing})"
+
+	@property
+	def name(self) -> str:
+		return self.table.names[self.index]
+
+	@property
+	def money(self) -> int:
+		return self.table.money[self.index]
+
+	@money.setter
+	def money(self, money: int):
+		self.table.money[self.index] = money
+
+	@property
+	def start_money(self) -> int:
+		return self.table.start_money[self.index]
+
+	@property
+	def fold_loss(self) -> int:
+		return self.table.fold_losses[self.index]
+
+	@fold_loss.setter
+	def fold_loss(self, fold_loss: int):
+		self.table.fold_losses[self.index] = fold_loss
+
+	@property
+	def to_call(self) -> int:
+		return self.table.to_call[self.index]
+
+	@to_call.setter
+	def to_call(self, to_call: int):
+		self.table.to_call[self.index] = to_call
+
+	@property
+	def is_playing(self) -> bool:
+		return self.table.is_playing[self.index]
+
+	@is_playing.setter
+	def is_playing(self, is_playing: bool):
+		self.table.is_playing[self.index] = is_playing
+
+	@property
+	def bet_decisions(self) -> tuple:
+		return self.table.bet_decisions[self.index]
+
+	@property
+	def hand(self) -> dict:
+		return self.table.hands[self.index]
+
+
+class TableState:
+	'''
+	A table during a round: one list per thing each player has, laid out the
+	same way poker_game passes them around, plus the deck and the bet
+	'''
+
+	__slots__ = ('names', 'player_index', 'money', 'start_money',
+		'fold_losses', 'to_call', 'is_playing', 'bet_decisions', 'hands',
+		'deck', 'bet')
+
+	def __init__(self, money: list, names: list, player_index: int = None):
+		'''
+		Parameters:
+			money (list[int]): the betting money of each player; this list is
+				kept, not copied, so the caller sees the money change
+			names (list[str]): the name of each player
+			player_index (int): the index of the main player, or None if every
+				player is a CPU
+
+		Doctests:
+>>> table = TableState([1000, 500], ['CPU1', 'CPU2'])
+>>> len(table), table.player(1)
+(2, PlayerState('CPU2', money=500, is_playing=True))
+		'''
+		player_num = len(money)
+		self.names = names
+		self.player_index = player_index
+		self.money = money
+		self.start_money = money.copy()
+		self.fold_losses = [0] * player_num
+		self.to_call = [0] * player_num
+		self.is_playing = [True] * player_num
+		# Filled in during the round (see poker_game.play_round)
+		self.bet_decisions = []
+		self.hands = []
+		self.deck = None
+		self.bet = 0
+
+	def new_round(self):
+		'''
+		Gets the table ready for a new round with the money the players have
+		now
+		'''
+		player_num = len(self.money)
+		self.start_money[:] = self.money
+		self.fold_losses[:] = [0] * player_num
+		self.to_call[:] = [0] * player_num
+		self.is_playing[:] = [True] * player_num
+		self.bet_decisions.clear()
+		self.hands.clear()
+		self.deck = None
+		self.bet = 0
+
+	def __len__(self) -> int:
+		'''
+		Returns:
+			(int): the number of players at the table
+		'''
+		return len(self.money)
+
+	def player(self, index: int) -> PlayerState:
+		'''
+		Gets a player at the table
+
+		Parameters:
+			index (int): the player's index
+
+		Returns:
+			(PlayerState): the player
+		'''
+		return PlayerState(self, index)
+
+	def players(self) -> list:
+		'''
+		Returns:
+			(list[PlayerState]): every player at the table, in order
+		'''
+		return [PlayerState(self, index) for index in range(len(self.money))]
+
+	def playing_num(self) -> int:
+		'''
+		Returns:
+			(int): the number of players that haven't folded
+		'''
+		return self.is_playing.count(True)
+
+	def snapshot(self) -> tuple:
+		'''
+		Saves the table, copying each list once. The names are shared, since
+		they don't change during a round
+
+		Returns:
+			(tuple): the snapshot, for restore
+
+		Doctests:
+>>> table = TableState([1000, 1000], ['CPU1', 'CPU2'])
+>>> table.deck = poker_functions.create_deck(as_deck=True)
+>>> table.hands = poker_functions.deal_hands(2, table.deck)
+>>> saved = table.snapshot()
+>>> table.money[0] -= 100
+>>> table.player(1).is_playing = False
+>>> poker_functions.replace_card(table.hands[0][3][0], table.hands[0], \
+table.deck)
+True
+>>> table.restore(saved)
+>>> table.money, table.is_playing, table.hands[0][3], len(table.deck)
+([1000, 1000], [True, True], [(13, 3), (11, 3), (9, 3), (7, 3), (5, 3)], 42)
+		'''
+		# A Deck saves its cursors, along with the Deck itself since
+		# play_round gives the table a new one every round, and a list deck
+		# is copied
+		if isinstance(self.deck, poker_functions.Deck):
+			deck = (self.deck, self.deck.snapshot())
+		else:
+			deck = None if self.deck is None else self.deck.copy()
+		return (self.money.copy(), self.start_money.copy(),
+			self.fold_losses.copy(), self.to_call.copy(),
+			self.is_playing.copy(), self.bet_decisions.copy(),
+			[copy_hand(hand) for hand in self.hands], deck, self.bet)
+
+	def restore(self, snapshot: tuple):
+		'''
+		Puts the table back the way it was when the snapshot was taken. Every
+		list is filled in place, so anything holding on to one of them (like
+		the money list given to play_round) sees the change, and the snapshot
+		can be restored again. The deck is set back to the deck the table had
+		then, or None if it had none
+
+		Parameters:
+			snapshot (tuple): a snapshot of this table
+
+		Doctests:
+>>> import poker_game
+>>> with poker_game.headless_table(3, seed=2):
+...     table = TableState([1000] * 3, poker_game.NAMES)
+...     table.deck = poker_functions.create_deck(as_deck=True)
+...     table.hands = poker_functions.deal_hands(3, table.deck)
+...     table.bet_decisions = poker_game.cpu_decisions(table.money, \
+table.hands, poker_game.MINIMUM_BET)
+...     saved, rng_state = table.snapshot(), poker_game.RNG.getstate()
+...     results = []
+...     for _ in range(2):
+...         table.restore(saved)
+...         poker_game.RNG.setstate(rng_state)
+...         bet = poker_game.round_main_loop(table.money, table.start_money, \
+table.fold_losses, table.hands, table.bet_decisions, table.is_playing, \
+table.names, table.player_index, table.to_call)
+...         results.append((bet, table.money.copy(), table.to_call.copy()))
+>>> results[0] == results[1], table.snapshot() != saved
+(True, True)
+
+>>> with poker_game.headless_table(3, seed=2):
+...     table = TableState([1000] * 3, poker_game.NAMES)
+...     before_deal = table.snapshot()
+...     _ = poker_game.play_round(table)
+...     saved, deck = table.snapshot(), list(table.deck)
+...     _ = poker_game.play_round(table)
+...     table.restore(saved)
+...     restored_deck = list(table.deck)
+...     table.restore(before_deal)
+>>> restored_deck == deck, table.deck
+(True, None)
+		'''
+		money, start_money, fold_losses, to_call, is_playing, bet_decisions, \
+				hands, deck, self.bet = snapshot
+		self.money[:] = money
+		self.start_money[:] = start_money
+		self.fold_losses[:] = fold_losses
+		self.to_call[:] = to_call
+		self.is_playing[:] = is_playing
+		self.bet_decisions[:] = bet_decisions
+		self.hands[:] = [copy_hand(hand) for hand in hands]
+		if deck is None:
+			self.deck = None
+		elif isinstance(deck, tuple):
+			# The Deck the snapshot was taken from, which may not be the
+			# table's deck anymore
+			self.deck, deck_snapshot = deck
+			self.deck.restore(deck_snapshot)
+		else:
+			self.deck = deck.copy()
+
+	def copy(self):
+		'''
+		Makes a separate table the same as this one, that can be played on
+		without changing this one
+
+		Returns:
+			(TableState): the copy
+
+		Doctests:
+>>> table = TableState([1000, 1000], ['CPU1', 'CPU2'])
+>>> other = table.copy()
+>>> other.money[0] = 0
+>>> table.money, other.money
+([1000, 1000], [0, 1000])
+		'''
+		table = TableState(self.money.copy(), self.names, self.player_index)
+		table.start_money = self.start_money.copy()
+		table.fold_losses = self.fold_losses.copy()
+		table.to_call = self.to_call.copy()
+		table.is_playing = self.is_playing.copy()
+		table.bet_decisions = self.bet_decisions.copy()
+		table.hands = [copy_hand(hand) for hand in self.hands]
+		# The copy needs its own deck, since a Deck snapshot only works on
+		# the deck it was taken from
+		if isinstance(self.deck, poker_functions.Deck):
+			table.deck = poker_functions.Deck(list(self.deck),
+					self.deck.capacity)
+		elif self.deck is not None:
+			table.deck = self.deck.copy()
+		table.bet = self.bet
+		return table
+
+
+def copy_hand(hand):
+	'''
+	Copies a hand, so changing one doesn't change the other
+
+	Parameters:
+		hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand mask
+
+	Returns:
+		(dict{int: list[tuple(int, int)]} | int): the copy
+
+	Doctests:
+>>> hand = {0: [(1, 0)], 1: [], 2: [], 3: [(5, 3)]}
+>>> other = copy_hand(hand)
+>>> other[0].append((2, 0))
+>>> hand[0]
+[(1, 0)]
+	'''
+	# Hand masks are numbers, so they never change
+	if isinstance(hand, int):
+		return hand
+	return { suit: cards.copy() for suit, cards in hand.items() }
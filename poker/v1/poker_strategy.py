@@ -0,0 +1,333 @@
+'''
+A table of the best cards to replace for every hand, built ahead of time
+
+Hands that only differ by their suits have the same best cards to replace
+(see poker_functions.canonical_hand), so the table only needs one entry for
+each of the 134,459 canonical hands. Each entry is found with
+poker_draw.solve_draw against a fresh deck, which takes minutes for all of
+them, so the table is built once and saved to a file:
+
+	python poker_strategy.py build
+
+The file is a header, then every canonical hand mask in order, then the
+cards to replace for each of them as 5 bits, one for each card of the
+canonical hand from the lowest card code up. Hands that haven't been solved
+yet are 0xFF, so a build that was stopped carries on where it left off. The
+file is memory-mapped instead of read, so every process using it shares the
+same copy, and once it's loaded poker_functions.choose_bad_cards looks the
+cards up in it instead of using its rules
+'''
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+from os import cpu_count
+from time import perf_counter
+
+import numpy as np
+
+import poker_draw
+import poker_enumerate
+import poker_functions
+
+
+# Where the table is saved by default
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+	'draw_table.bin')
+
+# The first bytes of a table file, then the number of hands and the most
+# cards replaced
+MAGIC = b'PKDRAW01'
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('count', '<u4'),
+	('max_discards', '<u4')])
+
+# The cards to replace of a hand that hasn't been solved yet
+UNSOLVED = 0xFF
+
+
+def canonical_classes() -> np.ndarray:
+	'''
+	Finds the canonical hand mask of every 5 card hand
+
+	Returns:
+		(ndarray): every different canonical hand mask, sorted
+
+	Doctests:
+>>> classes = canonical_classes()
+>>> len(classes)
+134459
+>>> int(classes[0]) == poker_functions.canonical_hand(0b11111)[0]
+True
+	'''
+	classes = []
+	chunk_size = 500000
+	for start in range(0, poker_enumerate.HAND_COUNT, chunk_size):
+		stop = min(start + chunk_size, poker_enumerate.HAND_COUNT)
+		hands = poker_enumerate.unrank_hands(start, stop).astype(np.int64)
+
+		# The ranks in each suit, as 13 bits, like canonical_hand
+		rows = np.arange(len(hands))
+		suit_masks = np.zeros((len(hands), 4), dtype=np.int64)
+		for position in range(5):
+			suit_masks[rows, hands[:, position] // 13] |= \
+					1 << (hands[:, position] % 13)
+
+		# The suit with the highest ranks becomes the first suit, and so on
+		suit_masks = -np.sort(-suit_masks, axis=1)
+		canonical = suit_masks[:, 0] | (suit_masks[:, 1] << 13) \
+				| (suit_masks[:, 2] << 26) | (suit_masks[:, 3] << 39)
+		classes.append(np.unique(canonical))
+	return np.unique(np.concatenate(classes)).astype(np.uint64)
+
+
+def solve_hands(masks: list, max_discards: int = poker_draw.MAX_DISCARDS) \
+		-> list:
+	'''
+	Finds the best cards to replace for each of the given hands
+
+	Parameters:
+		masks (list[int]): hand masks with 5 cards each
+		max_discards (int): the most cards that can be replaced
+
+	Returns:
+		(list[int]): for each hand, the cards to replace as 5 bits, one for
+			each card of the hand from the lowest card code up
+
+	Doctests:
+>>> royal_flush = poker_functions.hand_to_mask( \
+{0: [(1, 0), (10, 0), (11, 0), (12, 0), (13, 0)], 1: [], 2: [], 3: []})
+>>> pair = poker_functions.hand_to_mask( \
+{0: [(1, 0), (9, 0)], 1: [(1, 1)], 2: [(5, 2)], 3: [(7, 3)]})
+>>> solve_hands([royal_flush, pair])
+[0, 26]
+	'''
+	solved = []
+	for mask in masks:
+		codes = poker_functions.mask_to_codes(mask)
+		discards = poker_draw.solve_draw(mask,
+				max_discards=max_discards)['discards']
+		bits = 0
+		for position, code in enumerate(codes):
+			if code in discards:
+				bits |= 1 << position
+		solved.append(bits)
+	return solved
+
+
+class StrategyTable:
+	'''
+	A table file of the best cards to replace, memory-mapped so it's never
+	read into memory
+	'''
+
+	def __init__(self, path: str = DEFAULT_PATH, mode: str = 'r'):
+		'''
+		Parameters:
+			path (str): the table file
+			mode (str): 'r' to only look things up, 'r+' to build the table
+		'''
+		header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+		if len(header) != 1 or header['magic'][0] != MAGIC:
+			raise ValueError(f"{path} is not a table file")
+		count = int(header['count'][0])
+
+		self.path = path
+		self.max_discards = int(header['max_discards'][0])
+		self.mask_map = np.memmap(path, dtype='<u8', mode=mode,
+				offset=HEADER_DTYPE.itemsize, shape=(count,))
+		self.discard_map = np.memmap(path, dtype=np.uint8, mode=mode,
+				offset=HEADER_DTYPE.itemsize + 8 * count, shape=(count,))
+
+		# Plain arrays over the same memory are much faster to look things up
+		# in than the memory maps themselves
+		self.masks = self.mask_map.view(np.ndarray)
+		self.discards = self.discard_map.view(np.ndarray)
+
+	def __len__(self) -> int:
+		return len(self.masks)
+
+	def solved(self) -> int:
+		'''
+		Gets the number of hands that have been solved
+
+		Returns:
+			(int): the number of hands in the table that have been solved
+		'''
+		return int((self.discards != UNSOLVED).sum())
+
+	def lookup(self, hand) -> list:
+		'''
+		Finds the best cards to replace for the given hand
+
+		Parameters:
+			hand (dict{int: list[tuple(int, int)]} | int): a hand or a hand
+				mask with 5 cards
+
+		Returns:
+			(list): the cards to be replaced, as tuples for a hand or as card
+				codes for a hand mask, in the same order as in the hand
+		'''
+		canonical, suit_map = poker_functions.canonical_hand(hand)
+		entry = int(self.masks.searchsorted(np.uint64(canonical)))
+		if entry == len(self.masks) or int(self.masks[entry]) != canonical:
+			raise ValueError("the hand must have 5 different cards")
+		bits = int(self.discards[entry])
+		if bits == UNSOLVED:
+			raise ValueError("this hand hasn't been solved yet")
+
+		# Turn the suits of the canonical hand back into the suits of the hand
+		old_suits = [0] * 4
+		for old_suit, new_suit in enumerate(suit_map):
+			old_suits[new_suit] = old_suit
+		bad_cards = set()
+		for position, code in enumerate(poker_functions.mask_to_codes(canonical)):
+			if bits & (1 << position):
+				bad_cards.add((code % 13 + 1, old_suits[code // 13]))
+
+		if isinstance(hand, int):
+			return sorted(map(poker_functions.card_to_code, bad_cards))
+
+		# Keep the order the cards have in the hand
+		return [card for suit in hand.values() for card in suit
+				if card in bad_cards]
+
+
+def create_table(path: str = DEFAULT_PATH,
+		max_discards: int = poker_draw.MAX_DISCARDS):
+	'''
+	Creates a table file where no hand has been solved yet
+
+	Parameters:
+		path (str): where to save the table
+		max_discards (int): the most cards that can be replaced
+	'''
+	classes = canonical_classes()
+	header = np.array([(MAGIC, len(classes), max_discards)], dtype=HEADER_DTYPE)
+
+	# Written to a temporary file first, so a half written table is never
+	# mistaken for a real one
+	with open(path + '.tmp', 'wb') as file:
+		file.write(header.tobytes())
+		file.write(classes.astype('<u8').tobytes())
+		file.write(np.full(len(classes), UNSOLVED, dtype=np.uint8).tobytes())
+	os.replace(path + '.tmp', path)
+
+
+def build_table(path: str = DEFAULT_PATH, workers: int = None,
+		chunk_size: int = 1000, max_discards: int = poker_draw.MAX_DISCARDS,
+		progress=None) -> StrategyTable:
+	'''
+	Solves every hand in the table file that hasn't been solved yet, creating
+	the file if it doesn't exist. Every chunk of hands is saved as soon as
+	it's solved, so if the build is stopped, building again carries on where
+	it left off
+
+	Parameters:
+		path (str): where to save the table
+		workers (int): the number of processes to use; 1 solves every hand
+			in this process. Defaults to the number of CPUs
+		chunk_size (int): the number of hands solved at a time
+		max_discards (int): the most cards that can be replaced; only used
+			if the file doesn't exist yet
+		progress (callable): called with the number of solved hands and the
+			number of hands after every chunk, if given
+
+	Returns:
+		(StrategyTable): the finished table
+	'''
+	if not os.path.exists(path):
+		create_table(path, max_discards)
+	if workers is None:
+		workers = cpu_count() or 1
+
+	table = StrategyTable(path, 'r+')
+	unsolved = np.flatnonzero(table.discards == UNSOLVED)
+	entries = [unsolved[start:start + chunk_size]
+			for start in range(0, len(unsolved), chunk_size)]
+	masks = [table.masks[chunk].tolist() for chunk in entries]
+	max_discards = [table.max_discards] * len(masks)
+	solved_num = len(table) - len(unsolved)
+
+	def save(chunk, solved: list):
+		'''
+		Writes one solved chunk to the file
+		'''
+		nonlocal solved_num
+		table.discards[chunk] = solved
+		table.discard_map.flush()
+		solved_num += len(chunk)
+		if progress is not None:
+			progress(solved_num, len(table))
+
+	if workers <= 1:
+		for chunk, solved in zip(entries,
+				map(solve_hands, masks, max_discards)):
+			save(chunk, solved)
+	else:
+		with ProcessPoolExecutor(workers) as pool:
+			for chunk, solved in zip(entries,
+					pool.map(solve_hands, masks, max_discards)):
+				save(chunk, solved)
+
+	del table
+	return StrategyTable(path)
+
+
+def load_table(path: str = DEFAULT_PATH) -> StrategyTable:
+	'''
+	Memory-maps a finished table file and makes
+	poker_functions.choose_bad_cards look cards up in it
+
+	Parameters:
+		path (str): the table file
+
+	Returns:
+		(StrategyTable): the loaded table
+	'''
+	table = StrategyTable(path)
+	if table.solved() != len(table):
+		raise ValueError(f"{path} hasn't been fully built yet")
+	poker_functions.strategy_table = table
+	return table
+
+
+def unload_table():
+	'''
+	Makes poker_functions.choose_bad_cards use its rules again
+	'''
+	poker_functions.strategy_table = None
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+	parser.add_argument('command', choices=('build', 'status'),
+			help='build (or carry on building) the table, or check it')
+	parser.add_argument('--path', default=DEFAULT_PATH,
+			help='the table file')
+	parser.add_argument('--workers', type=int, default=None,
+			help='number of processes (default: number of CPUs)')
+	parser.add_argument('--chunk-size', type=int, default=1000,
+			help='number of hands solved at a time')
+	args = parser.parse_args()
+
+	if args.command == 'status':
+		table = StrategyTable(args.path)
+		print(f"{table.solved()} of {len(table)} hands solved")
+		return
+
+	start_time = perf_counter()
+
+	def progress(solved_num: int, count: int):
+		'''
+		Prints how far along the build is
+		'''
+		print(f"\r{solved_num}/{count} hands solved " +
+				f"({perf_counter() - start_time:.0f}s)", end='', flush=True)
+
+	build_table(args.path, args.workers, args.chunk_size, progress=progress)
+	print()
+
+
+# Main program entry
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,365 @@
+'''
+Plays many tables of CPUs against each other and adds up how each strategy
+did
+
+Every table is played headless (see poker_game.headless_table) by the same
+round functions as a normal game, with its own seed, so any table can be
+played again on its own. Players that can't meet the minimum bet are out of
+the table instead of getting more money, and a table ends when one player is
+left or it runs out of rounds. Tables run in a pool of processes and their
+results are handed back as soon as each one finishes; if a process dies, the
+tables it could have been playing are played again in a new pool, so no
+finished table is lost:
+
+	python poker_tournament.py --tables 1000 --strategies tight default loose
+'''
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from os import cpu_count
+from time import perf_counter
+
+import poker_game
+
+
+# How much of what a CPU would usually bet each strategy is willing to bet
+STRATEGIES = {
+	'tight': 0.5,
+	'default': 1.0,
+	'loose': 1.5,
+	'maniac': 3.0,
+}
+
+# The number of times a table is tried again after it killed its process
+MAX_RETRIES = 2
+
+
+def make_configs(table_num: int, strategies: list, seed=0,
+		player_num: int = poker_game.PLAYER_NUM, max_rounds: int = 500,
+		starting_money: int = poker_game.STARTING_MONEY) -> list:
+	'''
+	Sets up tables that seat the given strategies in turn, so every strategy
+	gets every seat about as often
+
+	Parameters:
+		table_num (int): the number of tables
+		strategies (list[str]): the names of the strategies to play (see
+			STRATEGIES)
+		seed: the seed of the tournament; each table gets its own from it
+		player_num (int): the number of players at each table
+		max_rounds (int): the most rounds a table plays
+		starting_money (int): the betting money each player starts with
+
+	Returns:
+		(list[dict]): the config of each table (see play_table)
+
+	Doctests:
+>>> configs = make_configs(2, ['tight', 'loose'], seed=7, player_num=3)
+>>> [config['strategies'] for config in configs]
+[['tight', 'loose', 'tight'], ['loose', 'tight', 'loose']]
+>>> configs[1]['seed'], configs[1]['table']
+('7-1', 1)
+	'''
+	for strategy in strategies:
+		if strategy not in STRATEGIES:
+			raise ValueError(f"unknown strategy: {strategy}")
+
+	configs = []
+	for table in range(table_num):
+		seats = [strategies[(table + seat) % len(strategies)]
+				for seat in range(player_num)]
+		configs.append({ 'table': table, 'seed': f"{seed}-{table}",
+			'strategies': seats, 'max_rounds': max_rounds,
+			'starting_money': starting_money })
+	return configs
+
+
+def play_table(config: dict) -> dict:
+	'''
+	Plays one table until one player is left or it runs out of rounds
+
+	Parameters:
+		config (dict): the table, with:
+			table: a number to tell the table apart from the others
+			seed: the seed for the table's random number generator
+			strategies: the name of each player's strategy (see STRATEGIES)
+			max_rounds: the most rounds to play
+			starting_money: the betting money each player starts with
+
+	Returns:
+		(dict): the results, with the table and strategies from the config,
+			and:
+			rounds: the number of rounds played
+			money: the betting money each player ended with
+			trajectory: each player's betting money after every round,
+				starting with their starting money
+			bust_round: the round each player ran out of money in, or None
+			rounds_played: the number of rounds each player played
+			wins: the number of rounds each player won (a split pot counts
+				as a win for every winner)
+			seconds: how long it took
+
+	Doctests:
+>>> config = make_configs(1, ['tight', 'default', 'loose'], seed=3)[0]
+>>> result = play_table(config)
+>>> result['money'] == play_table(config)['money']
+True
+>>> len(result['trajectory'][0]) == result['rounds'] + 1
+True
+>>> result['trajectory'][0][0], result['rounds_played'][0] <= result['rounds']
+(1000, True)
+	'''
+	start_time = perf_counter()
+	strategies = config['strategies']
+	player_num = len(strategies)
+	money = [config['starting_money']] * player_num
+	trajectory = [[config['starting_money']] for _ in range(player_num)]
+	bust_round = [None] * player_num
+	rounds_played = [0] * player_num
+	wins = [0] * player_num
+	rounds = 0
+
+	with poker_game.headless_table(player_num, config['seed']):
+		# The players still at the table
+		seated = list(range(player_num))
+		while len(seated) > 1 and rounds < config['max_rounds']:
+			rounds += 1
+
+			# Play the round with only the players still seated
+			poker_game.PLAYER_NUM = len(seated)
+			poker_game.NAMES = [f"CPU{player + 1}" for player in seated]
+			poker_game.BET_SCALES = [STRATEGIES[strategies[player]]
+					for player in seated]
+			seated_money = [money[player] for player in seated]
+			winners = poker_game.play_round(seated_money)
+
+			for seat, player in enumerate(seated):
+				money[player] = seated_money[seat]
+				rounds_played[player] += 1
+			for seat in winners:
+				wins[seated[seat]] += 1
+
+			# Players that can't meet the minimum bet are out
+			for player in seated:
+				if money[player] < poker_game.MINIMUM_BET:
+					bust_round[player] = rounds
+			seated = [player for player in seated if bust_round[player] is None]
+
+			for player in range(player_num):
+				trajectory[player].append(money[player])
+
+	return { 'table': config['table'], 'strategies': strategies,
+		'rounds': rounds, 'money': money, 'trajectory': trajectory,
+		'bust_round': bust_round, 'rounds_played': rounds_played,
+		'wins': wins, 'seconds': perf_counter() - start_time }
+
+
+def run_tournament(configs: list, workers: int = None):
+	'''
+	Plays every table, handing back each result as soon as its table is
+	finished
+
+	Parameters:
+		configs (list[dict]): the config of each table (see play_table)
+		workers (int): the number of processes to use; 1 plays every table in
+			this process. Defaults to the number of CPUs
+
+	Yields:
+		(dict): the result of each table (see play_table), in the order they
+			finish. A table that raised an error, or that killed its process
+			more than MAX_RETRIES times, gives {'table': ..., 'error': ...}
+			instead
+
+	Doctests:
+>>> configs = make_configs(3, ['tight', 'loose'], max_rounds=20)
+>>> sorted(result['table'] for result in run_tournament(configs, 1))
+[0, 1, 2]
+	'''
+	if workers is None:
+		workers = cpu_count() or 1
+
+	if workers <= 1:
+		yield from map(play_table, configs)
+		return
+
+	# Tables that haven't been played yet, tables that were still going when
+	# a process died, and how many times each table was alone when one died
+	waiting = list(reversed(configs))
+	suspects = []
+	crashes = {}
+
+	while waiting or suspects:
+		pool = ProcessPoolExecutor(workers)
+		pending = {}
+		try:
+			while waiting or suspects or pending:
+				if suspects:
+					# Any of them could have killed the process, so they're
+					# played one at a time to find out which one did
+					if not pending:
+						config = suspects.pop()
+						pending[pool.submit(play_table, config)] = config
+				else:
+					# Keep two tables per worker going, handing out a new
+					# table every time one finishes
+					while waiting and len(pending) < 2 * workers:
+						config = waiting.pop()
+						pending[pool.submit(play_table, config)] = config
+
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					error = future.exception()
+					if isinstance(error, BrokenProcessPool):
+						raise error
+					config = pending.pop(future)
+					if error is not None:
+						yield { 'table': config['table'], 'error': repr(error) }
+					else:
+						yield future.result()
+		except BrokenProcessPool as error:
+			alone = len(pending) == 1
+			for future, config in pending.items():
+				# Some tables may have finished before the process died
+				if future.done() and not future.cancelled() \
+						and future.exception() is None:
+					yield future.result()
+				elif not alone:
+					suspects.append(config)
+				else:
+					# This table killed the process on its own
+					table = config['table']
+					crashes[table] = crashes.get(table, 0) + 1
+					if crashes[table] > MAX_RETRIES:
+						yield { 'table': table, 'error': repr(error) }
+					else:
+						suspects.append(config)
+		finally:
+			pool.shutdown(wait=False, cancel_futures=True)
+
+
+def aggregate(results: list) -> dict:
+	'''
+	Adds up the results of every table by strategy
+
+	Parameters:
+		results (list[dict]): the results of play_table
+
+	Returns:
+		(dict{str: dict}): by strategy name:
+			players: the number of players that used it
+			mean_money: their average betting money at the end
+			bust_rate: the share of them that ran out of money
+			mean_bust_round: the average round they ran out of money in, or
+				None if none of them did
+			win_rate: the share of the rounds they played that they won
+			trajectory: their average betting money after every round, where
+				players whose table ended keep their last amount
+
+	Doctests:
+>>> results = [{'strategies': ['a', 'b'], 'money': [30, 0], \
+'trajectory': [[10, 20, 30], [10, 0, 0]], 'bust_round': [None, 1], \
+'rounds_played': [2, 1], 'wins': [2, 0]}, \
+{'strategies': ['b', 'a'], 'money': [20, 0], \
+'trajectory': [[10, 20], [10, 0]], 'bust_round': [None, 1], \
+'rounds_played': [1, 1], 'wins': [1, 0]}]
+>>> stats = aggregate(results)
+>>> stats['a']['mean_money'], stats['a']['bust_rate'], stats['a']['win_rate']
+(15.0, 0.5, 0.6666666666666666)
+>>> stats['b']['trajectory'], stats['b']['mean_bust_round']
+([10.0, 10.0, 10.0], 1.0)
+	'''
+	totals = {}
+	for result in results:
+		# Tables whose process kept dying have nothing to add
+		if 'error' in result:
+			continue
+		for player, strategy in enumerate(result['strategies']):
+			total = totals.setdefault(strategy, { 'players': 0, 'money': 0,
+				'busts': 0, 'bust_rounds': 0, 'rounds': 0, 'wins': 0,
+				'trajectories': [] })
+			total['players'] += 1
+			total['money'] += result['money'][player]
+			if result['bust_round'][player] is not None:
+				total['busts'] += 1
+				total['bust_rounds'] += result['bust_round'][player]
+			total['rounds'] += result['rounds_played'][player]
+			total['wins'] += result['wins'][player]
+			total['trajectories'].append(result['trajectory'][player])
+
+	stats = {}
+	for strategy, total in totals.items():
+		# Tables end at different rounds, so shorter trajectories are padded
+		# with their last amount
+		length = max(map(len, total['trajectories']))
+		trajectory = [0] * length
+		for player_trajectory in total['trajectories']:
+			for index in range(length):
+				trajectory[index] += player_trajectory[
+						min(index, len(player_trajectory) - 1)]
+
+		stats[strategy] = {
+			'players': total['players'],
+			'mean_money': total['money'] / total['players'],
+			'bust_rate': total['busts'] / total['players'],
+			'mean_bust_round': total['bust_rounds'] / total['busts'] \
+					if total['busts'] else None,
+			'win_rate': total['wins'] / total['rounds'] \
+					if total['rounds'] else 0.0,
+			'trajectory': [money / total['players'] for money in trajectory],
+		}
+	return stats
+
+
+def print_stats(stats: dict, seconds: float, table_num: int):
+	'''
+	Prints the stats of each strategy as a table
+
+	Parameters:
+		stats (dict): the results of aggregate
+		seconds (float): how long the tournament took
+		table_num (int): the number of tables played
+	'''
+	print(f"{'Strategy':<10}{'Players':>9}{'Money':>10}{'Busted':>9}" +
+			f"{'Bust rnd':>10}{'Win rate':>10}")
+	for strategy, stat in sorted(stats.items(),
+			key=lambda item: -item[1]['mean_money']):
+		bust_round = stat['mean_bust_round']
+		bust_round = f"{bust_round:.1f}" if bust_round is not None else '-'
+		print(f"{strategy:<10}{stat['players']:>9}" +
+				f"{stat['mean_money']:>10.1f}{stat['bust_rate']:>9.1%}" +
+				f"{bust_round:>10}{stat['win_rate']:>10.1%}")
+	print()
+	print(f"Time: {seconds:.2f}s ({table_num / seconds:,.1f} tables/s)")
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+	parser.add_argument('--tables', type=int, default=1000,
+			help='number of tables to play')
+	parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES),
+			choices=list(STRATEGIES), help='strategies to seat in turn')
+	parser.add_argument('--players', type=int, default=poker_game.PLAYER_NUM,
+			help='number of players at each table')
+	parser.add_argument('--rounds', type=int, default=500,
+			help='most rounds each table plays')
+	parser.add_argument('--seed', default=0, help='seed of the tournament')
+	parser.add_argument('--workers', type=int, default=None,
+			help='number of processes (default: number of CPUs)')
+	args = parser.parse_args()
+
+	start_time = perf_counter()
+	configs = make_configs(args.tables, args.strategies, args.seed,
+			args.players, args.rounds)
+	results = []
+	for result in run_tournament(configs, args.workers):
+		results.append(result)
+		if 'error' in result:
+			print(f"Table {result['table']} failed: {result['error']}")
+
+	print_stats(aggregate(results), perf_counter() - start_time, len(results))
+
+
+# Main program entry
+if __name__ == '__main__':
+	main()